@@ -0,0 +1,26 @@
+from fastapi import Depends, Request
+from app.core.container import ServiceContainer
+from app.services.content_extractor import ContentExtractorService
+from app.services.ai_service import AIService
+from app.services.tts_service import TTSService
+from app.services.ingestion_jobs import IngestionJobManager
+from app.services.speech_pipeline import SpeechPipeline
+
+def get_services(request: Request) -> ServiceContainer:
+    """Return the service container created in the application lifespan"""
+    return request.app.state.services
+
+def get_content_extractor(services: ServiceContainer = Depends(get_services)) -> ContentExtractorService:
+    return services.content_extractor
+
+def get_ai_service(services: ServiceContainer = Depends(get_services)) -> AIService:
+    return services.ai_service
+
+def get_tts_service(services: ServiceContainer = Depends(get_services)) -> TTSService:
+    return services.tts_service
+
+def get_ingestion_jobs(services: ServiceContainer = Depends(get_services)) -> IngestionJobManager:
+    return services.ingestion_jobs
+
+def get_speech_pipeline(services: ServiceContainer = Depends(get_services)) -> SpeechPipeline:
+    return services.speech_pipeline
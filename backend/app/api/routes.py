@@ -1,64 +1,178 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import List
+import asyncio
+import json
 import os
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 from app.models.schemas import (
-    LinkInput, ExtractionResponse, QuestionInput, 
-    AnswerResponse, TTSRequest, TTSResponse, HealthCheck
+    LinkInput, ExtractionResponse, ExtractedContent, QuestionInput, 
+    AnswerResponse, TTSRequest, TTSResponse, HealthCheck, IngestionJobStatus, CrawlInput, SpeakInput
 )
 from app.services.content_extractor import ContentExtractorService
 from app.services.ai_service import AIService
 from app.services.tts_service import TTSService
+from app.services.ingestion_jobs import IngestionJobManager
+from app.services.speech_pipeline import SpeechPipeline
+from app.api.dependencies import (
+    get_services, get_content_extractor, get_ai_service, get_tts_service, get_ingestion_jobs, get_speech_pipeline
+)
+from app.core.container import ServiceContainer
 
 router = APIRouter()
 
 @router.post("/links", response_model=ExtractionResponse)
-async def extract_content(link_input: LinkInput):
+async def extract_content(
+    link_input: LinkInput,
+    extractor: ContentExtractorService = Depends(get_content_extractor),
+    ai_service: AIService = Depends(get_ai_service)
+):
     try:
         logger.info(f"📥 Content Extraction Request: {len(link_input.urls)} URLs")
         for i, url in enumerate(link_input.urls, 1):
             logger.info(f"   - URL {i}: {str(url)}")
         
-        extractor = ContentExtractorService()
         result = await extractor.extract_from_urls(link_input.urls)
+        await _create_session(result, ai_service)
         
-        # Store context for AI service if extraction was successful
-        if result.success and result.extracted_content:
-            ai_service = AIService()
-            # Generate a simple session ID
-            import uuid
-            session_id = str(uuid.uuid4())[:8]  # Short session ID
-            
-            context_data = [
-                {
-                    "url": content.url,
-                    "title": content.title,
-                    "content": content.content
-                }
-                for content in result.extracted_content if content.success
-            ]
-            
-            logger.info(f"📊 Extracted {len(context_data)} successful content items")
-            for item in context_data:
-                logger.info(f"   - {item['title']} ({len(item['content'])} chars)")
-            
-            await ai_service.store_context(session_id, context_data)
-            result.session_id = session_id
-            
-            logger.info(f"✅ Created session {session_id} with {len(context_data)} sources")
-        else:
-            logger.warning("❌ No successful content extraction")
-            
         return result
     except Exception as e:
         logger.error(f"❌ Content extraction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Content extraction failed: {str(e)}")
 
+async def _create_session(result: ExtractionResponse, ai_service: AIService):
+    """Store successfully extracted content under a new session and set result.session_id"""
+    # Store context for AI service if extraction was successful
+    if result.success and result.extracted_content:
+        # Generate a simple session ID
+        session_id = str(uuid.uuid4())[:8]  # Short session ID
+        
+        context_data = [
+            {
+                "url": content.url,
+                "title": content.title,
+                "content": content.content,
+                "blocks": content.blocks
+            }
+            for content in result.extracted_content if content.success
+        ]
+        
+        logger.info(f"📊 Extracted {len(context_data)} successful content items")
+        for item in context_data:
+            logger.info(f"   - {item['title']} ({len(item['content'])} chars)")
+        
+        await ai_service.store_context(session_id, context_data)
+        result.session_id = session_id
+        
+        logger.info(f"✅ Created session {session_id} with {len(context_data)} sources")
+    else:
+        logger.warning("❌ No successful content extraction")
+
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/links/stream")
+async def extract_content_stream(
+    link_input: LinkInput,
+    extractor: ContentExtractorService = Depends(get_content_extractor),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """Stream each URL's outcome as soon as it completes, then a summary with the session_id.
+    
+    A "result" event carries an extracted page; a URL that fails yields an
+    "error" event with its url and the stream goes on with the others.
+    """
+    urls = [str(url) for url in link_input.urls]
+    logger.info(f"📥 Streaming Content Extraction Request: {len(urls)} URLs")
+    
+    async def extract_indexed(index: int, url: str):
+        try:
+            return index, await extractor.extract_url(url)
+        except Exception as e:
+            logger.error(f"Extraction of {url} failed: {e}")
+            return index, ExtractedContent(
+                url=url, title="", content="", success=False,
+                error_message=f"Content extraction failed: {str(e)}", word_count=0
+            )
+    
+    async def events():
+        tasks = [asyncio.ensure_future(extract_indexed(i, url)) for i, url in enumerate(urls)]
+        results = [None] * len(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, content = await next_done
+                results[index] = content
+                if content.success:
+                    yield _sse_event("result", content.model_dump())
+                else:
+                    yield _sse_event("error", {"url": content.url, "detail": content.error_message})
+            
+            result = extractor.build_response([r for r in results if r is not None])
+            await _create_session(result, ai_service)
+            yield _sse_event("summary", {
+                "success": result.success,
+                "total_word_count": result.total_word_count,
+                "failed_urls": result.failed_urls,
+                "session_id": result.session_id
+            })
+        except Exception as e:
+            logger.error(f"❌ Streaming content extraction failed: {str(e)}")
+            yield _sse_event("error", {"detail": f"Content extraction failed: {str(e)}"})
+        finally:
+            # Client went away: don't keep extracting for nobody
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/links/jobs", response_model=IngestionJobStatus, status_code=202)
+async def create_ingestion_job(
+    link_input: LinkInput,
+    ingestion_jobs: IngestionJobManager = Depends(get_ingestion_jobs)
+):
+    """Queue URLs for background ingestion and return the job and session IDs immediately"""
+    try:
+        job = ingestion_jobs.submit([str(url) for url in link_input.urls])
+        return job.to_status()
+    except RuntimeError as e:
+        logger.warning(f"❌ Ingestion job rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/links/crawl", response_model=IngestionJobStatus, status_code=202)
+async def create_crawl_job(
+    crawl_input: CrawlInput,
+    ingestion_jobs: IngestionJobManager = Depends(get_ingestion_jobs)
+):
+    """Ingest a whole site (sitemap or same-domain crawl from a seed URL) in the background"""
+    try:
+        job = ingestion_jobs.submit_crawl(
+            seed_url=str(crawl_input.seed_url) if crawl_input.seed_url else None,
+            sitemap_url=str(crawl_input.sitemap_url) if crawl_input.sitemap_url else None,
+            max_depth=crawl_input.max_depth,
+            max_pages=crawl_input.max_pages
+        )
+        return job.to_status()
+    except RuntimeError as e:
+        logger.warning(f"❌ Crawl job rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/links/jobs/{job_id}", response_model=IngestionJobStatus)
+async def get_ingestion_job(job_id: str, ingestion_jobs: IngestionJobManager = Depends(get_ingestion_jobs)):
+    job = ingestion_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_status()
+
 @router.post("/ask", response_model=AnswerResponse)
-async def ask_question(question_input: QuestionInput):
+async def ask_question(question_input: QuestionInput, ai_service: AIService = Depends(get_ai_service)):
     try:
         logger.info(f"🔍 Ask Question Request: '{question_input.question[:50]}...', session_id: {question_input.session_id}")
         
@@ -68,7 +182,6 @@ async def ask_question(question_input: QuestionInput):
                 detail="session_id is required. Please extract content from URLs first using the /links endpoint."
             )
         
-        ai_service = AIService()
         result = await ai_service.answer_question(
             question_input.question,
             session_id=question_input.session_id
@@ -82,11 +195,98 @@ async def ask_question(question_input: QuestionInput):
         logger.error(f"❌ Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Question processing failed: {str(e)}")
 
+async def _start_answer_stream(ai_service: AIService, question: str, session_id: str):
+    """Start stream_answer and take its first event before the SSE response is committed.
+    
+    The first event needs the session's context, so a session without
+    content fails here with a 400 (like /ask) instead of a 200 stream
+    carrying an error event. Returns the events with the first one replayed.
+    """
+    answer_events = ai_service.stream_answer(question, session_id)
+    try:
+        first = await answer_events.__anext__()
+    except ValueError as e:
+        logger.error(f"❌ Question processing error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Question processing failed: {str(e)}")
+    
+    async def replay():
+        yield first
+        async for event in answer_events:
+            yield event
+    
+    return replay()
+
+@router.post("/ask/stream")
+async def ask_question_stream(question_input: QuestionInput, ai_service: AIService = Depends(get_ai_service)):
+    """Stream the answer over SSE: a sources event, token events as the model generates, then done (or error)"""
+    logger.info(f"🔍 Streaming Ask Request: '{question_input.question[:50]}...', session_id: {question_input.session_id}")
+    
+    if not question_input.session_id:
+        raise HTTPException(
+            status_code=400, 
+            detail="session_id is required. Please extract content from URLs first using the /links endpoint."
+        )
+    
+    answer_events = await _start_answer_stream(ai_service, question_input.question, question_input.session_id)
+    
+    async def events():
+        try:
+            async for event, data in answer_events:
+                yield _sse_event(event, data)
+        except ValueError as e:
+            logger.error(f"❌ Question processing error: {str(e)}")
+            yield _sse_event("error", {"detail": str(e)})
+        except Exception as e:
+            logger.error(f"❌ Unexpected error: {str(e)}")
+            yield _sse_event("error", {"detail": f"Question processing failed: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/ask/speak")
+async def ask_and_speak(
+    speak_input: SpeakInput,
+    ai_service: AIService = Depends(get_ai_service),
+    speech_pipeline: SpeechPipeline = Depends(get_speech_pipeline)
+):
+    """/ask/stream plus "audio" events: each sentence's speech, in order, as soon as it is synthesized"""
+    logger.info(f"🔍 Ask-and-Speak Request: '{speak_input.question[:50]}...', session_id: {speak_input.session_id}")
+    
+    if not speak_input.session_id:
+        raise HTTPException(
+            status_code=400, 
+            detail="session_id is required. Please extract content from URLs first using the /links endpoint."
+        )
+    
+    answer_events = await _start_answer_stream(ai_service, speak_input.question, speak_input.session_id)
+    
+    async def events():
+        try:
+            async for event, data in speech_pipeline.speak(answer_events, voice_id=speak_input.voice_id):
+                yield _sse_event(event, data)
+        except ValueError as e:
+            logger.error(f"❌ Question processing error: {str(e)}")
+            yield _sse_event("error", {"detail": str(e)})
+        except Exception as e:
+            logger.error(f"❌ Unexpected error: {str(e)}")
+            yield _sse_event("error", {"detail": f"Question processing failed: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/tts", response_model=TTSResponse)
-async def text_to_speech(tts_request: TTSRequest):
+async def text_to_speech(tts_request: TTSRequest, tts_service: TTSService = Depends(get_tts_service)):
     try:
         logger.info(f"📨 TTS API Request: text_length={len(tts_request.text)}, voice_id='{tts_request.voice_id}'")
-        tts_service = TTSService()
         result = await tts_service.generate_speech(
             tts_request.text,
             voice_id=tts_request.voice_id
@@ -98,18 +298,16 @@ async def text_to_speech(tts_request: TTSRequest):
         raise HTTPException(status_code=500, detail=f"TTS generation failed: {str(e)}")
 
 @router.post("/upload-audio")
-async def upload_audio(audio: UploadFile = File(...)):
+async def upload_audio(audio: UploadFile = File(...), ai_service: AIService = Depends(get_ai_service)):
     try:
-        ai_service = AIService()
         question = await ai_service.transcribe_audio(audio)
         return {"question": question}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio transcription failed: {str(e)}")
 
 @router.get("/voices")
-async def get_voices():
+async def get_voices(tts_service: TTSService = Depends(get_tts_service)):
     try:
-        tts_service = TTSService()
         voices = await tts_service.get_available_voices()
         return {"voices": voices}
     except Exception as e:
@@ -136,45 +334,50 @@ async def get_audio_file(filename: str):
         raise HTTPException(status_code=404, detail="Audio file not found")
 
 @router.get("/sessions/{session_id}")
-async def get_session_info(session_id: str):
+async def get_session_info(session_id: str, ai_service: AIService = Depends(get_ai_service)):
     try:
-        ai_service = AIService()
+        info = await ai_service.get_session_info(session_id)
         
-        # Check in-memory storage
-        context_data = ai_service._context_storage.get(session_id) if hasattr(ai_service, '_context_storage') else None
-        
-        if context_data:
+        if info:
+            # Pages kept in Redis/memory carry titles; crawled pages may only be in ChromaDB
+            source_info = list(info["sources"])
+            stored_urls = {item["url"] for item in source_info}
+            source_info += [
+                {"url": url, "title": "", "content_length": None}
+                for url in info["vector_urls"] if url not in stored_urls
+            ]
             return {
                 "session_id": session_id,
                 "status": "active",
-                "sources": len(context_data),
-                "source_info": [
-                    {
-                        "url": item.get('url', ''),
-                        "title": item.get('title', ''),
-                        "content_length": len(item.get('content', ''))
-                    }
-                    for item in context_data[:5]  # Show first 5 sources
-                ]
+                "sources": len(source_info),
+                "chunks": info["vector_chunks"],
+                "source_info": source_info[:5]  # Show first 5 sources
             }
         else:
             return {
                 "session_id": session_id,
                 "status": "not_found",
                 "message": "Session not found. Please extract content first.",
-                "available_sessions": list(ai_service._context_storage.keys()) if hasattr(ai_service, '_context_storage') else []
+                "available_sessions": sorted(ai_service.tracked_sessions())
             }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get session info: {str(e)}")
 
 @router.get("/health", response_model=HealthCheck)
-async def health_check():
+async def health_check(services: ServiceContainer = Depends(get_services)):
+    readiness = services.chroma_service.state
     return HealthCheck(
         status="healthy",
         version="1.0.0",
         services={
             "content_extractor": "active",
             "ai_service": "active",
-            "tts_service": "active"
-        }
-    )
\ No newline at end of file
+            "tts_service": "active",
+            "vector_store": readiness
+        },
+        readiness=readiness
+    )
+
+@router.get("/metrics")
+async def get_metrics(services: ServiceContainer = Depends(get_services)):
+    return services.get_metrics()
\ No newline at end of file
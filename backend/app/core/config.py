@@ -25,11 +25,109 @@ class Settings(BaseSettings):
     # TTS Configuration
     ELEVENLABS_API_KEY: str = ""
     USE_BROWSER_TTS: bool = True  # Fallback to browser TTS
+    # /ask/speak: answers are synthesized sentence by sentence while they stream
+    SPEECH_MAX_PARALLEL_SEGMENTS: int = 3  # Concurrent TTS calls per answer
+    SPEECH_MIN_SEGMENT_CHARS: int = 20  # Shorter sentences are merged with the next
+    SPEECH_MAX_SEGMENT_CHARS: int = 300
     
     # Storage Configuration (Optional)
     USE_REDIS: bool = False
     REDIS_URL: str = "redis://localhost:6379"
-    
+
+    # Session lifecycle (applies to ChromaDB, Redis and in-memory storage)
+    SESSION_TTL_SECONDS: int = 86400
+    SESSION_SWEEP_INTERVAL_SECONDS: float = 300.0
+    SESSION_SWEEP_BATCH_SIZE: int = 100
+
+    # HTTP connection pool configuration (shared by all outbound clients)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20  # Pool size for single-host API clients
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Extracted-page cache (revalidated with ETag / Last-Modified)
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_DIR: str = ""  # Defaults to backend/page_cache
+    PAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Page downloads
+    EXTRACTOR_MAX_PAGE_BYTES: int = 5 * 1024 * 1024
+    EXTRACTOR_DOWNLOAD_TIMEOUT_SECONDS: float = 45.0  # Whole request, including a slow-drip body
+
+    # Fetch scheduling (politeness towards origin servers)
+    FETCH_MAX_CONCURRENCY: int = 20
+    FETCH_PER_HOST_CONCURRENCY: int = 4
+    FETCH_PER_HOST_RATE: float = 5.0  # Requests per second per host (0 disables)
+    FETCH_PER_HOST_BURST: int = 5
+    FETCH_MAX_RETRIES: int = 2  # For 429 / 502 / 503 / 504
+    FETCH_BACKOFF_BASE_SECONDS: float = 0.5
+    FETCH_BACKOFF_MAX_SECONDS: float = 10.0  # Longer Retry-After values are not waited for
+
+    # Background ingestion jobs (POST /links/jobs)
+    INGESTION_WORKERS: int = 4
+    INGESTION_QUEUE_MAX_SIZE: int = 1000  # URLs waiting across all jobs
+    INGESTION_MAX_JOBS: int = 1000  # Finished jobs kept for status polling
+
+    # Bulk crawl ingestion (POST /links/crawl)
+    CRAWL_MAX_PAGES: int = 1000  # Upper bound for a request's max_pages
+    CRAWL_CONCURRENCY: int = 8  # Fetch workers per crawl (still subject to per-host fetch limits)
+    CRAWL_EMBED_BATCH_SIZE: int = 16  # Pages stored per ChromaDB append
+    CRAWL_MAX_CONCURRENT_JOBS: int = 2
+    CRAWL_SITEMAP_MAX_BYTES: int = 10 * 1024 * 1024
+    CRAWL_SITEMAP_TIMEOUT_SECONDS: float = 60.0  # Whole download of one sitemap file
+
+    # HTML parsing (0 parses inline on the event loop)
+    EXTRACTOR_PARSE_WORKERS: int = 2
+    HTML_PARSER_BACKEND: str = "html.parser"  # html.parser | lxml | auto (lxml when installed)
+
+    # Vector store
+    CHROMA_PERSIST_DIR: str = ""  # Defaults to backend/chroma_db
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    # Chunks are capped at the embedding model's sequence length when it is lower
+    CHUNK_MAX_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 32  # A trailing sentence up to this size is repeated in the next chunk
+    # "shared" (one collection filtered by session), "sharded" (hashed into
+    # CHROMA_SHARD_COUNT collections) or "per_session" (one collection per session).
+    # per_session is recommended: it is the only mode whose query latency does not
+    # grow with the number of sessions (see tests/benchmarks/bench_partitions.py);
+    # sharded only divides that growth. "shared" stays the default so stores
+    # persisted by earlier versions keep working.
+    CHROMA_PARTITION_MODE: str = "shared"
+    CHROMA_SHARD_COUNT: int = 16
+
+    # Vector store executors (embedding and ChromaDB calls run off the event loop)
+    CHROMA_QUERY_WORKERS: int = 4
+    CHROMA_INGEST_WORKERS: int = 1  # Keeps large ingests from starving queries
+    CHROMA_ADD_BATCH_SIZE: int = 64
+    CHROMA_QUERY_WARMUP_WAIT_SECONDS: float = 2.0  # Then fall back to keyword retrieval
+    CHROMA_INGEST_WARMUP_WAIT_SECONDS: float = 60.0
+
+    # Query embedding micro-batching
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Query embedding cache (keyed by model name and normalized question)
+    QUERY_EMBEDDING_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = 10000
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Answer cache: paraphrased questions over the same retrieved chunks reuse the earlier answer
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92  # Cosine similarity of the question embeddings
+    ANSWER_CACHE_MAX_ENTRIES: int = 5000
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_CROSS_SESSION: bool = True  # Share answers between sessions with identical content
+
+    # LLM provider routing (OpenAI / Groq / Anthropic): latency-ranked, hedged, with circuit breakers
+    ROUTER_WINDOW_SIZE: int = 50  # Recent calls per provider used for latency percentiles and error rate
+    ROUTER_HEDGE_ENABLED: bool = True
+    ROUTER_HEDGE_MIN_DELAY_SECONDS: float = 1.0  # Hedge after the provider's p95, clamped to these bounds
+    ROUTER_HEDGE_MAX_DELAY_SECONDS: float = 10.0
+    ROUTER_ATTEMPT_TIMEOUT_SECONDS: float = 30.0
+    ROUTER_BREAKER_FAILURE_THRESHOLD: int = 3  # Consecutive failures that open a provider's breaker
+    ROUTER_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
     @property
     def ALLOWED_ORIGINS(self) -> List[str]:
         if self.ENVIRONMENT == "development":
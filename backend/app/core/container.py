@@ -0,0 +1,89 @@
+from typing import Dict
+from app.services.content_extractor import ContentExtractorService
+from app.services.ai_service import AIService
+from app.services.tts_service import TTSService
+from app.services.speech_pipeline import SpeechPipeline
+from app.services.chroma_service import chroma_service
+from app.services.session_sweeper import SessionSweeper
+from app.services.crawler import SiteCrawler
+from app.services.ingestion_jobs import IngestionJobManager
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Application-lifetime services shared by every request handler.
+
+    Created once in the FastAPI lifespan so that HTTP connection pools and
+    provider SDK clients are reused across requests, and closed on shutdown.
+    """
+
+    def __init__(self):
+        self.content_extractor = ContentExtractorService()
+        self.ai_service = AIService()
+        self.tts_service = TTSService()
+        self.speech_pipeline = SpeechPipeline(
+            self.tts_service,
+            max_parallel=settings.SPEECH_MAX_PARALLEL_SEGMENTS,
+            min_sentence_chars=settings.SPEECH_MIN_SEGMENT_CHARS,
+            max_sentence_chars=settings.SPEECH_MAX_SEGMENT_CHARS
+        )
+        self.chroma_service = chroma_service
+        self.session_sweeper = SessionSweeper(self.ai_service, self.chroma_service)
+        self.ingestion_jobs = IngestionJobManager(
+            self.content_extractor,
+            self.ai_service,
+            workers=settings.INGESTION_WORKERS,
+            max_queue_size=settings.INGESTION_QUEUE_MAX_SIZE,
+            max_jobs=settings.INGESTION_MAX_JOBS,
+            crawler=SiteCrawler(
+                self.content_extractor,
+                self.ai_service,
+                concurrency=settings.CRAWL_CONCURRENCY,
+                embed_batch_size=settings.CRAWL_EMBED_BATCH_SIZE,
+                sitemap_max_bytes=settings.CRAWL_SITEMAP_MAX_BYTES,
+                sitemap_timeout=settings.CRAWL_SITEMAP_TIMEOUT_SECONDS
+            ),
+            max_concurrent_crawls=settings.CRAWL_MAX_CONCURRENT_JOBS,
+            max_crawl_pages=settings.CRAWL_MAX_PAGES
+        )
+        logger.info("✅ Service container initialized")
+
+    async def start(self):
+        """Start background work that must not block application startup"""
+        self.chroma_service.start_warmup()
+        self.session_sweeper.start()
+        self.ingestion_jobs.start()
+
+    async def close(self):
+        """Close all services and their HTTP clients"""
+        await self.ingestion_jobs.stop()
+        await self.session_sweeper.stop()
+        for service in (self.content_extractor, self.ai_service, self.tts_service):
+            try:
+                await service.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {type(service).__name__}: {e}")
+        self.chroma_service.shutdown()
+        logger.info("Service container closed")
+
+    def get_metrics(self) -> Dict:
+        """Runtime metrics for the shared services"""
+        return {
+            "page_cache": self.content_extractor.page_cache.get_stats() if self.content_extractor.page_cache else {},
+            "html_parse": self.content_extractor.get_parse_stats(),
+            "fetch_scheduler": self.content_extractor.fetch_scheduler.get_stats(),
+            "extraction_inflight": self.content_extractor.get_inflight_stats(),
+            "vector_store": self.chroma_service.get_readiness(),
+            "vector_partitions": self.chroma_service.get_partition_stats(),
+            "chunk_dedup": self.chroma_service.get_dedup_stats(),
+            "chroma_executors": self.chroma_service.get_executor_stats(),
+            "embedding_batcher": self.chroma_service.get_batcher_stats(),
+            "query_embedding_cache": self.chroma_service.get_query_cache_stats(),
+            "session_gc": self.session_sweeper.get_stats(),
+            "ingestion_jobs": self.ingestion_jobs.get_stats(),
+            "speech_pipeline": self.speech_pipeline.get_stats(),
+            "answer_cache": self.ai_service.answer_cache.get_stats() if self.ai_service.answer_cache else {},
+            "provider_router": self.ai_service.provider_router.get_stats()
+        }
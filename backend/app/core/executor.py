@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BoundedExecutor:
+    """Thread (or process) pool with its own concurrency limit and queue-depth metrics.
+
+    Used to keep blocking work (embedding, vector store I/O, HTML parsing) off
+    the event loop. Work that cannot start immediately waits in an async queue
+    instead of piling up inside the pool, so the current depth is observable.
+    With use_processes=True, callables and arguments must be picklable.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: Optional[int] = None,
+                 use_processes: bool = False):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_concurrency = max(1, max_concurrency or self.max_workers)
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # spawn: forking a process that already runs executor threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking callable in the pool once a concurrency slot is free"""
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        waiting = True
+        try:
+            async with self._get_semaphore():
+                waiting = False
+                self.queued -= 1
+                started_at = time.perf_counter()
+                self.total_wait_time += started_at - enqueued_at
+                self.active += 1
+                try:
+                    result = await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+                    self.completed += 1
+                    return result
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.active -= 1
+                    self.total_run_time += time.perf_counter() - started_at
+        finally:
+            if waiting:
+                # Cancelled while still queued
+                self.queued -= 1
+
+    def get_stats(self) -> Dict:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_time / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(self.total_run_time / finished * 1000, 2) if finished else 0.0
+        }
+
+    def reset(self):
+        """Discard a broken pool so the next call starts a fresh one"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the pool; it is recreated lazily on next use"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._semaphore = None
@@ -0,0 +1,32 @@
+import httpx
+from typing import Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+def create_http_client(max_connections: Optional[int] = None, **kwargs) -> httpx.AsyncClient:
+    """Create an AsyncClient using the shared keep-alive pool configuration.
+
+    Clients are meant to live for the whole application lifetime so that
+    TCP/TLS connections are reused across requests. Pass ``max_connections``
+    to cap the pool of a client that only ever talks to a single host.
+    """
+    max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(settings.HTTP_MAX_KEEPALIVE_CONNECTIONS, max_connections),
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+    http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+    if settings.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+        logger.debug("HTTP/2 requested but h2 is not installed - using HTTP/1.1")
+
+    return httpx.AsyncClient(limits=limits, http2=http2, **kwargs)
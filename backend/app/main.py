@@ -1,12 +1,25 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.container import ServiceContainer
 from app.api.routes import router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Services (and their HTTP connection pools) live for the whole application
+    app.state.services = ServiceContainer()
+    await app.state.services.start()
+    try:
+        yield
+    finally:
+        await app.state.services.close()
+
 app = FastAPI(
     title="Voice-Driven Q&A API",
     description="API for voice-driven question answering from web content",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -24,5 +37,9 @@ async def root():
     return {"message": "Voice-Driven Q&A API", "version": "1.0.0"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+async def health_check(request: Request):
+    # readiness is "warming" until the embedding model is loaded, then "ready" or "degraded"
+    return {
+        "status": "healthy",
+        "readiness": request.app.state.services.chroma_service.state
+    }
\ No newline at end of file
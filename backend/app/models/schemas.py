@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, HttpUrl, validator
+from pydantic import BaseModel, Field, HttpUrl, validator
 
 class LinkInput(BaseModel):
     urls: List[HttpUrl]
@@ -19,6 +19,10 @@ class ExtractedContent(BaseModel):
     success: bool
     error_message: Optional[str] = None
     word_count: int = 0
+    # Outgoing links, only collected for crawls (None = not collected); not part of API responses
+    links: Optional[List[str]] = Field(default=None, exclude=True)
+    # Headings and paragraphs as extracted, before cleaning; used for chunking, not part of API responses
+    blocks: Optional[List[str]] = Field(default=None, exclude=True)
 
 class ExtractionResponse(BaseModel):
     success: bool
@@ -27,6 +31,51 @@ class ExtractionResponse(BaseModel):
     failed_urls: List[str] = []
     session_id: Optional[str] = None
 
+class UrlProgress(BaseModel):
+    url: str
+    stage: str  # queued | fetched | parsed | embedded | failed
+    title: Optional[str] = None
+    word_count: int = 0
+    error_message: Optional[str] = None
+
+class IngestionJobStatus(BaseModel):
+    job_id: str
+    session_id: str
+    status: str  # queued | running | completed | failed
+    total: int
+    embedded: int = 0
+    failed: int = 0
+    urls: List[UrlProgress]
+    error_message: Optional[str] = None
+    pages_per_minute: Optional[float] = None
+    created_at: float
+    finished_at: Optional[float] = None
+
+class CrawlInput(BaseModel):
+    """Bulk ingestion: every page listed in a sitemap, or a same-domain crawl from a seed URL"""
+    seed_url: Optional[HttpUrl] = None
+    sitemap_url: Optional[HttpUrl] = None
+    max_depth: int = 2
+    max_pages: int = 200
+    
+    @validator('sitemap_url', always=True)
+    def validate_source(cls, v, values):
+        if (v is None) == (values.get('seed_url') is None):
+            raise ValueError('Provide exactly one of seed_url or sitemap_url')
+        return v
+    
+    @validator('max_depth')
+    def validate_max_depth(cls, v):
+        if v < 0 or v > 5:
+            raise ValueError('max_depth must be between 0 and 5')
+        return v
+    
+    @validator('max_pages')
+    def validate_max_pages(cls, v):
+        if v < 1:
+            raise ValueError('max_pages must be at least 1')
+        return v
+
 class QuestionInput(BaseModel):
     question: str
     session_id: Optional[str] = None
@@ -37,6 +86,9 @@ class QuestionInput(BaseModel):
             raise ValueError('Question cannot be empty')
         return v.strip()
 
+class SpeakInput(QuestionInput):
+    voice_id: Optional[str] = None
+
 class AnswerResponse(BaseModel):
     answer: str
     sources: List[str]
@@ -62,4 +114,5 @@ class TTSResponse(BaseModel):
 class HealthCheck(BaseModel):
     status: str
     version: str
-    services: dict
\ No newline at end of file
+    services: dict
+    readiness: Optional[str] = None
\ No newline at end of file
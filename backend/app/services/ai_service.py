@@ -1,12 +1,16 @@
 import asyncio
 import json
+import time
 import uuid
 import re
-from typing import Optional, List, Dict
+from typing import AsyncIterator, Optional, List, Dict, Tuple
 from fastapi import UploadFile
 from app.models.schemas import AnswerResponse
 from app.core.config import settings
+from app.core.http import create_http_client
 from app.services.free_ai_service import FreeAIService
+from app.services.answer_cache import AnswerCache, context_fingerprint
+from app.services.provider_router import ProviderRouter
 from app.services.chroma_service import chroma_service
 import logging
 
@@ -44,16 +48,40 @@ class AIService:
         self.groq_client = None
         self.redis_client = None
         self.free_ai_service = FreeAIService()
-        
-        # Initialize paid services if available and configured
+        self.answer_cache = AnswerCache(
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+            cross_session=settings.ANSWER_CACHE_CROSS_SESSION
+        ) if settings.ANSWER_CACHE_ENABLED else None
+        
+        # Initialize paid services if available and configured. Each SDK client gets
+        # its own pooled keep-alive client (one API host each), closed with the SDK client.
         if OPENAI_AVAILABLE and settings.USE_OPENAI and settings.OPENAI_API_KEY:
-            self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY, http_client=self._provider_http_client()
+            )
         
         if ANTHROPIC_AVAILABLE and settings.USE_ANTHROPIC and settings.ANTHROPIC_API_KEY:
-            self.anthropic_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self.anthropic_client = anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY, http_client=self._provider_http_client()
+            )
         
         if GROQ_AVAILABLE and settings.USE_GROQ_SERVICE and settings.GROQ_API_KEY:
-            self.groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+            self.groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY, http_client=self._provider_http_client())
+        
+        # Configured paid providers in fixed preference order; the router re-ranks them by measured latency and health
+        self.provider_router = ProviderRouter(
+            [name for name, client in (("openai", self.openai_client), ("groq", self.groq_client),
+                                       ("anthropic", self.anthropic_client)) if client],
+            window_size=settings.ROUTER_WINDOW_SIZE,
+            failure_threshold=settings.ROUTER_BREAKER_FAILURE_THRESHOLD,
+            cooldown_seconds=settings.ROUTER_BREAKER_COOLDOWN_SECONDS,
+            hedge_enabled=settings.ROUTER_HEDGE_ENABLED,
+            hedge_min_delay=settings.ROUTER_HEDGE_MIN_DELAY_SECONDS,
+            hedge_max_delay=settings.ROUTER_HEDGE_MAX_DELAY_SECONDS,
+            attempt_timeout=settings.ROUTER_ATTEMPT_TIMEOUT_SECONDS
+        )
         
         # Initialize Redis if available and configured
         if REDIS_AVAILABLE and settings.USE_REDIS:
@@ -62,6 +90,10 @@ class AIService:
             except Exception as e:
                 logger.warning(f"Redis connection failed: {e}")
     
+    def _provider_http_client(self):
+        """Pooled keep-alive client for one provider API host (the SDKs set their own timeouts)"""
+        return create_http_client(max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+    
     async def answer_question(self, question: str, session_id: Optional[str] = None) -> AnswerResponse:
         logger.info(f"📝 AI Service: Answering question for session {session_id}")
         logger.info(f"   - Question: {question[:100]}...")
@@ -78,31 +110,35 @@ class AIService:
             logger.info("Available sessions in memory:", list(self._context_storage.keys()) if hasattr(self, '_context_storage') else "No storage")
             raise ValueError("No content available. Please extract content from URLs first. Make sure to use the session_id returned from the /links endpoint.")
         
+        # A paraphrase of an earlier question over the same retrieved chunks needs no LLM call
+        fingerprint, question_embedding, cached = await self._lookup_answer(session_id, question, context)
+        if cached is not None:
+            await self._store_qa(session_id, question, cached)
+            return AnswerResponse(
+                answer=cached,
+                sources=[item["url"] for item in context],
+                session_id=session_id,
+                confidence=0.8
+            )
+        
         # Log which services are available
         logger.info(f"   - OpenAI available: {self.openai_client is not None}")
         logger.info(f"   - Anthropic available: {self.anthropic_client is not None}")
         logger.info(f"   - Groq available: {self.groq_client is not None}")
         
-        # Try different AI services in order of preference
+        # Paid services through the router (fastest healthy one, hedged), then the free service
+        origin = {"cacheable": True}
         try:
-            # Try paid services first if available
-            if self.openai_client:
-                logger.info("🤖 Trying OpenAI GPT service")
-                answer, sources = await self._answer_with_openai(question, context)
-                logger.info("✅ OpenAI service succeeded")
-            elif self.groq_client:
-                logger.info("⚡ Trying Groq service (FAST)")
-                answer, sources = await self._answer_with_groq(question, context)
-                logger.info("✅ Groq service succeeded")
-            elif self.anthropic_client:
-                logger.info("🤖 Trying Anthropic Claude service")
-                answer, sources = await self._answer_with_anthropic(question, context)
-                logger.info("✅ Anthropic service succeeded")
+            attempts = self._provider_attempts(question, context)
+            if attempts:
+                logger.info(f"🤖 Routing across providers: {', '.join(attempts)}")
+                provider, (answer, sources) = await self.provider_router.call(attempts)
+                logger.info(f"✅ {provider} service succeeded")
             else:
                 # Use free AI service as fallback
                 logger.info("🆓 No paid AI services available, using free AI service")
                 logger.info(f"🔧 Ollama settings - USE_OLLAMA: {settings.USE_OLLAMA}, Model: {settings.OLLAMA_MODEL}, URL: {settings.OLLAMA_BASE_URL}")
-                result = await self.free_ai_service.answer_question(question, context, session_id)
+                result = await self.free_ai_service.answer_question(question, context, session_id, origin=origin)
                 answer, sources = result.answer, result.sources
                 logger.info(f"✅ Free AI service returned answer: {len(answer)} characters")
         
@@ -110,7 +146,7 @@ class AIService:
             logger.error(f"❌ Primary AI service failed: {e}")
             logger.info("🆓 Falling back to free AI service")
             try:
-                result = await self.free_ai_service.answer_question(question, context, session_id)
+                result = await self.free_ai_service.answer_question(question, context, session_id, origin=origin)
                 answer, sources = result.answer, result.sources
             except Exception as e2:
                 logger.error(f"❌ Free AI service also failed: {e2}")
@@ -120,6 +156,9 @@ class AIService:
         
         # Store the Q&A in session
         await self._store_qa(session_id, question, answer)
+        # Keyword-fallback answers (no LLM available) are not worth reusing
+        if self.answer_cache and origin["cacheable"]:
+            self.answer_cache.put(session_id, fingerprint, question, question_embedding, answer)
         
         return AnswerResponse(
             answer=answer,
@@ -128,35 +167,131 @@ class AIService:
             confidence=0.8
         )
     
+    async def stream_answer(self, question: str, session_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Answer as a stream of (event, data): "sources" first, then "token"s as the provider emits them, then "done".
+        
+        Falls back to the free AI service if the provider fails before its
+        first token; a failure after that is raised (the client already has
+        part of the answer). The final answer is stored like /ask stores it.
+        """
+        logger.info(f"📝 AI Service: Streaming answer for session {session_id}")
+        
+        context = await self._get_context(session_id, query=question)
+        if not context:
+            raise ValueError("No content available. Please extract content from URLs first. Make sure to use the session_id returned from the /links endpoint.")
+        
+        sources = [item["url"] for item in context]
+        yield "sources", {"sources": sources, "session_id": session_id}
+        
+        started_at = time.perf_counter()
+        fingerprint, question_embedding, cached = await self._lookup_answer(session_id, question, context)
+        if cached is not None:
+            await self._store_qa(session_id, question, cached)
+            yield "token", {"text": cached}
+            yield "done", {
+                "answer": cached,
+                "sources": sources,
+                "session_id": session_id,
+                "confidence": 0.8,
+                "time_to_first_token_ms": round((time.perf_counter() - started_at) * 1000, 1),
+                "cached": True
+            }
+            return
+        
+        first_token_ms = None
+        parts = []
+        origin = {"confidence": 0.8, "cacheable": True}
+        async for text in self._stream_with_fallback(question, context, session_id, origin):
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - started_at) * 1000, 1)
+                logger.info(f"⚡ First token after {first_token_ms}ms")
+            parts.append(text)
+            yield "token", {"text": text}
+        
+        answer = "".join(parts).strip()
+        logger.info(f"✅ Streamed answer (length: {len(answer)} chars) in {time.perf_counter() - started_at:.2f}s")
+        await self._store_qa(session_id, question, answer)
+        # Keyword-fallback answers (no LLM available) are not worth reusing
+        if self.answer_cache and origin["cacheable"]:
+            self.answer_cache.put(session_id, fingerprint, question, question_embedding, answer)
+        
+        yield "done", {
+            "answer": answer,
+            "sources": sources,
+            "session_id": session_id,
+            "confidence": origin["confidence"],
+            "time_to_first_token_ms": first_token_ms,
+            "cached": False
+        }
+    
+    async def _stream_with_fallback(self, question: str, context: List[Dict], session_id: str,
+                                    origin: Dict) -> AsyncIterator[str]:
+        """Text deltas from the preferred provider, same priority as answer_question; origin gets the answer's confidence and cacheability"""
+        streams = {}
+        if self.openai_client:
+            streams["openai"] = self._stream_with_openai
+        if self.groq_client:
+            streams["groq"] = self._stream_with_groq
+        if self.anthropic_client:
+            streams["anthropic"] = self._stream_with_anthropic
+        
+        # Streams aren't hedged (the client would get two answers), but use the router's ranking and breakers
+        for provider in self.provider_router.ranked(list(streams)):
+            health = self.provider_router.health[provider]
+            # Re-checked here: a half-open provider's single probe may have been taken meanwhile
+            admission = health.admit()
+            if admission is None:
+                continue
+            emitted = False
+            try:
+                async for text in streams[provider](question, context):
+                    emitted = True
+                    yield text
+                health.record_success()
+                return
+            except Exception as e:
+                health.record_failure()
+                if emitted:
+                    raise ValueError(f"{provider} stream failed: {str(e)}")
+                logger.error(f"❌ {provider} stream failed before the first token: {e}")
+            finally:
+                if admission == "probe":
+                    health.end_probe()
+        
+        if streams:
+            logger.info("🆓 Falling back to free AI service")
+        async for text in self.free_ai_service.stream_answer(question, context, session_id, origin):
+            yield text
+    
+    def _provider_attempts(self, question: str, context: List[Dict]) -> Dict:
+        """Router attempts for the configured paid providers"""
+        attempts = {}
+        if self.openai_client:
+            attempts["openai"] = lambda: self._answer_with_openai(question, context)
+        if self.groq_client:
+            attempts["groq"] = lambda: self._answer_with_groq(question, context)
+        if self.anthropic_client:
+            attempts["anthropic"] = lambda: self._answer_with_anthropic(question, context)
+        return attempts
+    
+    async def _lookup_answer(self, session_id: str, question: str,
+                             context: List[Dict]) -> Tuple[str, Optional[List[float]], Optional[str]]:
+        """(context fingerprint, question embedding, cached answer or None)"""
+        if not self.answer_cache:
+            return "", None, None
+        fingerprint = context_fingerprint(context)
+        question_embedding = None
+        if chroma_service.is_ready:
+            try:
+                # Already computed (and cached) by the semantic search for this question
+                question_embedding = await chroma_service.embed_query(question)
+            except Exception as e:
+                logger.warning(f"Question embedding for the answer cache failed: {e}")
+        return fingerprint, question_embedding, self.answer_cache.get(session_id, fingerprint, question, question_embedding)
+    
     async def _answer_with_openai(self, question: str, context: List[Dict]) -> tuple[str, List[str]]:
         try:
-            # Prepare context for the model
-            context_text = self._prepare_context(context)
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a helpful AI assistant who provides answers based on the provided web content context from multiple sources.
-
-                    GUIDELINES:
-                    1. For greetings (hi, hello, etc.) and basic conversational responses, respond naturally
-                    2. For factual questions, use ONLY information from the provided web content context
-                    3. When multiple sources are available, synthesize information from ALL relevant sources
-                    4. If factual information is available in the context, provide a comprehensive answer drawing from all sources
-                    5. If factual information is not in the context, state "I don't have that specific information in the provided content"
-                    6. Do NOT use general knowledge for factual questions - stick to the extracted content only
-                    7. Keep answers informative but concise, combining insights from different sources when relevant
-                    8. Avoid including raw HTML, navigation text, or website formatting
-                    9. When answering factual questions, you may reference which source(s) the information comes from
-                    10. If sources provide contradictory information, acknowledge the differences
-                    
-                    FORMAT: Respond naturally to greetings. For factual questions, provide comprehensive answers that utilize information from all relevant sources in the context."""
-                },
-                {
-                    "role": "user",
-                    "content": f"Context:\n{context_text}\n\nQuestion: {question}"
-                }
-            ]
+            messages = self._chat_messages(question, context)
             
             response = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -176,32 +311,7 @@ class AIService:
     
     async def _answer_with_groq(self, question: str, context: List[Dict]) -> tuple[str, List[str]]:
         try:
-            context_text = self._prepare_context(context)
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a helpful AI assistant who provides answers based on the provided web content context from multiple sources.
-
-                    GUIDELINES:
-                    1. For greetings (hi, hello, etc.) and basic conversational responses, respond naturally
-                    2. For factual questions, use ONLY information from the provided web content context
-                    3. When multiple sources are available, synthesize information from ALL relevant sources
-                    4. If factual information is available in the context, provide a comprehensive answer drawing from all sources
-                    5. If factual information is not in the context, state "I don't have that specific information in the provided content"
-                    6. Do NOT use general knowledge for factual questions - stick to the extracted content only
-                    7. Keep answers informative but concise, combining insights from different sources when relevant
-                    8. Avoid including raw HTML, navigation text, or website formatting
-                    9. When answering factual questions, you may reference which source(s) the information comes from
-                    10. If sources provide contradictory information, acknowledge the differences
-                    
-                    FORMAT: Respond naturally to greetings. For factual questions, provide comprehensive answers that utilize information from all relevant sources in the context."""
-                },
-                {
-                    "role": "user",
-                    "content": f"Context:\n{context_text}\n\nQuestion: {question}"
-                }
-            ]
+            messages = self._chat_messages(question, context)
             
             response = await self.groq_client.chat.completions.create(
                 model="llama-3.1-8b-instant",  # Fast Groq model
@@ -221,9 +331,90 @@ class AIService:
 
     async def _answer_with_anthropic(self, question: str, context: List[Dict]) -> tuple[str, List[str]]:
         try:
-            context_text = self._prepare_context(context)
+            prompt = self._anthropic_prompt(question, context)
+            
+            response = await self.anthropic_client.messages.create(
+                model="claude-3-sonnet-20240229",
+                max_tokens=1500,  # Increased for fuller answers
+                messages=[{"role": "user", "content": prompt}]
+            )
             
-            prompt = f"""You are a helpful AI assistant who provides answers based on the provided web content context from multiple sources.
+            answer = response.content[0].text.strip()
+            sources = [item["url"] for item in context]
+            
+            return answer, sources
+            
+        except Exception as e:
+            logger.error(f"Anthropic API error: {e}")
+            raise ValueError(f"Failed to generate answer: {str(e)}")
+    
+    async def _stream_with_openai(self, question: str, context: List[Dict]) -> AsyncIterator[str]:
+        stream = await self.openai_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=self._chat_messages(question, context),
+            max_tokens=1500,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_with_groq(self, question: str, context: List[Dict]) -> AsyncIterator[str]:
+        stream = await self.groq_client.chat.completions.create(
+            model="llama-3.1-8b-instant",
+            messages=self._chat_messages(question, context),
+            max_tokens=1000,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_with_anthropic(self, question: str, context: List[Dict]) -> AsyncIterator[str]:
+        stream = await self.anthropic_client.messages.create(
+            model="claude-3-sonnet-20240229",
+            max_tokens=1500,
+            messages=[{"role": "user", "content": self._anthropic_prompt(question, context)}],
+            stream=True
+        )
+        async for event in stream:
+            if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield event.delta.text
+    
+    def _chat_messages(self, question: str, context: List[Dict]) -> List[Dict]:
+        """OpenAI-style chat messages (OpenAI and Groq) for answering from the context"""
+        context_text = self._prepare_context(context)
+        return [
+            {
+                "role": "system",
+                "content": """You are a helpful AI assistant who provides answers based on the provided web content context from multiple sources.
+
+                    GUIDELINES:
+                    1. For greetings (hi, hello, etc.) and basic conversational responses, respond naturally
+                    2. For factual questions, use ONLY information from the provided web content context
+                    3. When multiple sources are available, synthesize information from ALL relevant sources
+                    4. If factual information is available in the context, provide a comprehensive answer drawing from all sources
+                    5. If factual information is not in the context, state "I don't have that specific information in the provided content"
+                    6. Do NOT use general knowledge for factual questions - stick to the extracted content only
+                    7. Keep answers informative but concise, combining insights from different sources when relevant
+                    8. Avoid including raw HTML, navigation text, or website formatting
+                    9. When answering factual questions, you may reference which source(s) the information comes from
+                    10. If sources provide contradictory information, acknowledge the differences
+                    
+                    FORMAT: Respond naturally to greetings. For factual questions, provide comprehensive answers that utilize information from all relevant sources in the context."""
+            },
+            {
+                "role": "user",
+                "content": f"Context:\n{context_text}\n\nQuestion: {question}"
+            }
+        ]
+    
+    def _anthropic_prompt(self, question: str, context: List[Dict]) -> str:
+        context_text = self._prepare_context(context)
+        
+        return f"""You are a helpful AI assistant who provides answers based on the provided web content context from multiple sources.
 
             GUIDELINES:
             1. For greetings (hi, hello, etc.) and basic conversational responses, respond naturally
@@ -243,21 +434,6 @@ class AIService:
             Question: {question}
 
             Please respond naturally to greetings, or analyze the context carefully for factual questions, utilizing information from all available sources."""
-            
-            response = await self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=1500,  # Increased for fuller answers
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            answer = response.content[0].text.strip()
-            sources = [item["url"] for item in context]
-            
-            return answer, sources
-            
-        except Exception as e:
-            logger.error(f"Anthropic API error: {e}")
-            raise ValueError(f"Failed to generate answer: {str(e)}")
     
     def _prepare_context(self, context: List[Dict]) -> str:
         # Group context by URL to organize by source
@@ -320,14 +496,113 @@ class AIService:
     # Simple in-memory storage as fallback when Redis is not available
     _context_storage = {}
     _qa_storage = {}
+    # Last access time per session, used by the session sweeper to expire idle sessions
+    _last_access = {}
+    
+    def mark_session_active(self, session_id: str):
+        """Record session activity for the session sweeper"""
+        self._last_access[session_id] = time.time()
+    
+    async def touch_session(self, session_id: str):
+        """Record session activity, extend its Redis TTL and persist its last access in ChromaDB"""
+        self.mark_session_active(session_id)
+        
+        if self.redis_client:
+            try:
+                await self.redis_client.expire(f"context:{session_id}", settings.SESSION_TTL_SECONDS)
+                await self.redis_client.expire(f"qa:{session_id}", settings.SESSION_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Failed to refresh Redis TTL for session {session_id}: {e}")
+        
+        if chroma_service.is_ready:
+            await chroma_service.atouch_session(session_id)
+    
+    def tracked_sessions(self) -> set:
+        """Ids of every session with recorded activity"""
+        return set(self._last_access)
+    
+    def get_session_stats(self) -> Dict:
+        return {
+            "tracked_sessions": len(self._last_access),
+            "memory_context_sessions": len(self._context_storage),
+            "memory_qa_sessions": len(self._qa_storage)
+        }
+    
+    async def get_session_info(self, session_id: str) -> Optional[Dict]:
+        """What is stored for a session in ChromaDB, Redis and memory; None when it is unknown everywhere.
+        
+        Crawled sessions (stored with fallback_only) only have ChromaDB
+        chunks, so those are looked up too. Does not count as activity.
+        """
+        stored = self._context_storage.get(session_id)
+        if stored is None and self.redis_client:
+            try:
+                context_data = await self.redis_client.get(f"context:{session_id}")
+                stored = json.loads(context_data) if context_data else None
+            except Exception as e:
+                logger.warning(f"Failed to read Redis context for session {session_id}: {e}")
+        
+        vector_stats = {"total_chunks": 0, "urls": []}
+        if chroma_service.is_ready:
+            vector_stats = await chroma_service.aget_collection_stats(session_id)
+        
+        tracked = session_id in self._last_access
+        if not stored and not vector_stats["urls"] and not tracked:
+            return None
+        return {
+            "tracked": tracked,
+            "sources": [
+                {"url": item.get('url', ''), "title": item.get('title', ''), "content_length": len(item.get('content', ''))}
+                for item in stored or []
+            ],
+            "vector_urls": vector_stats["urls"],
+            "vector_chunks": vector_stats["total_chunks"]
+        }
+    
+    def get_expired_sessions(self, cutoff: float, limit: int) -> List[str]:
+        """Sessions whose last access is older than cutoff (oldest first)"""
+        # Sessions stored without a recorded access are adopted as active now
+        now = time.time()
+        for session_id in list(self._context_storage) + list(self._qa_storage):
+            self._last_access.setdefault(session_id, now)
+        
+        expired = [(ts, sid) for sid, ts in list(self._last_access.items()) if ts < cutoff]
+        expired.sort()
+        return [sid for _, sid in expired[:limit]]
+    
+    async def evict_session(self, session_id: str):
+        """Remove a session from ChromaDB, Redis and in-memory storage"""
+        self._context_storage.pop(session_id, None)
+        self._qa_storage.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        if self.answer_cache:
+            self.answer_cache.evict_session(session_id)
+        
+        if self.redis_client:
+            try:
+                await self.redis_client.delete(f"context:{session_id}", f"qa:{session_id}")
+            except Exception as e:
+                logger.warning(f"Failed to delete Redis keys for session {session_id}: {e}")
+        
+        if chroma_service.is_ready:
+            await chroma_service.aclear_session_content(session_id)
     
     async def _get_context(self, session_id: str, query: str = "") -> Optional[List[Dict]]:
+        """Get a session's context; only a session that has some counts as active"""
+        context = await self._find_context(session_id, query)
+        if context:
+            await self.touch_session(session_id)
+        return context
+    
+    async def _find_context(self, session_id: str, query: str = "") -> Optional[List[Dict]]:
         """Get context using semantic search from ChromaDB for better relevance"""
-        
-        # Try ChromaDB first for semantic search (if query provided)
-        if query and chroma_service.collection:
+        # Try ChromaDB first for semantic search (if query provided). While the
+        # embedding model is still warming up, wait briefly and otherwise fall
+        # back to keyword retrieval below.
+        chroma_ready = bool(query) and await chroma_service.wait_until_ready(settings.CHROMA_QUERY_WARMUP_WAIT_SECONDS)
+        if chroma_ready:
             try:
-                relevant_content = chroma_service.search_relevant_content(
+                relevant_content = await chroma_service.asearch_relevant_content(
                     session_id=session_id, 
                     query=query, 
                     max_results=10  # Increased to ensure multiple sources are included
@@ -338,8 +613,8 @@ class AIService:
                     return relevant_content
             except Exception as e:
                 logger.error(f"ChromaDB search failed: {e}")
-        elif chroma_service.collection is None:
-            logger.info("ChromaDB not available, using enhanced fallback")
+        elif query:
+            logger.info(f"ChromaDB not available (state: {chroma_service.state}), using enhanced fallback")
         
         # Fallback to Redis/in-memory storage
         if self.redis_client:
@@ -368,12 +643,23 @@ class AIService:
             logger.info(f"Available sessions: {list(self._context_storage.keys())}")
             return None
     
-    async def store_context(self, session_id: str, extracted_content: List[Dict]):
+    async def store_context(self, session_id: str, extracted_content: List[Dict], replace: bool = True,
+                            fallback_only: bool = False) -> bool:
+        """Store extracted content for a session; replace=False appends to what is already stored.
+        
+        With fallback_only the Redis/in-memory copy is only written when
+        ChromaDB could not store the content (keeps large crawls out of memory).
+        Returns whether ChromaDB stored it.
+        """
+        self.mark_session_active(session_id)
+        stored_in_chroma = False
+        
         # Store in ChromaDB for semantic search (primary)
-        if chroma_service.collection:
+        if await chroma_service.wait_until_ready(settings.CHROMA_INGEST_WARMUP_WAIT_SECONDS):
             try:
-                success = chroma_service.add_content(session_id, extracted_content)
+                success = await chroma_service.aadd_content(session_id, extracted_content, replace=replace)
                 if success:
+                    stored_in_chroma = True
                     logger.info(f"✅ ChromaDB: Stored content for session {session_id}")
                 else:
                     logger.warning("ChromaDB storage failed, using fallback")
@@ -382,19 +668,32 @@ class AIService:
         else:
             logger.info(f"ChromaDB not available, using fallback storage for session {session_id}")
         
-        # Also store in Redis/memory for backwards compatibility
+        if fallback_only and stored_in_chroma:
+            return True
+        
+        # Also store in Redis/memory for backwards compatibility (blocks are only needed for chunking)
+        extracted_content = [{k: v for k, v in item.items() if k != "blocks"} for item in extracted_content]
         if self.redis_client:
             try:
                 context_key = f"context:{session_id}"
-                context_data = json.dumps(extracted_content, default=str)
-                await self.redis_client.setex(context_key, 86400, context_data)
-                return
+                items = extracted_content
+                if not replace:
+                    existing = await self.redis_client.get(context_key)
+                    if existing:
+                        items = json.loads(existing) + extracted_content
+                context_data = json.dumps(items, default=str)
+                await self.redis_client.setex(context_key, settings.SESSION_TTL_SECONDS, context_data)
+                return stored_in_chroma
             except Exception as e:
                 logger.error(f"Failed to store context in Redis: {e}")
         
         # Fallback to in-memory storage
-        self._context_storage[session_id] = extracted_content
+        if replace:
+            self._context_storage[session_id] = extracted_content
+        else:
+            self._context_storage.setdefault(session_id, []).extend(extracted_content)
         logger.info(f"Stored context in memory for session {session_id}")
+        return stored_in_chroma
     
     async def _store_qa(self, session_id: str, question: str, answer: str):
         from datetime import datetime
@@ -409,7 +708,7 @@ class AIService:
             try:
                 qa_key = f"qa:{session_id}"
                 await self.redis_client.lpush(qa_key, json.dumps(qa_entry))
-                await self.redis_client.expire(qa_key, 86400)
+                await self.redis_client.expire(qa_key, settings.SESSION_TTL_SECONDS)
                 return
             except Exception as e:
                 logger.error(f"Failed to store Q&A in Redis: {e}")
@@ -516,4 +815,21 @@ class AIService:
                 logger.error(f"Failed to retrieve session history from Redis: {e}")
         
         # Fallback to in-memory storage
-        return self._qa_storage.get(session_id, [])
\ No newline at end of file
+        return self._qa_storage.get(session_id, [])
+
+    async def close(self):
+        """Close provider clients and their connection pools"""
+        for client in (self.openai_client, self.anthropic_client, self.groq_client):
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close AI client: {e}")
+
+        if self.redis_client:
+            try:
+                await self.redis_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Redis client: {e}")
+
+        await self.free_ai_service.close()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import hashlib
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.services.embeddings import Embedding
+import logging
+
+logger = logging.getLogger(__name__)
+
+def context_fingerprint(context: List[Dict]) -> str:
+    """Identity of a retrieved chunk set: its (url, content hash) pairs, order-independent"""
+    pairs = sorted(
+        f"{item.get('url', '')}\0{hashlib.sha256(item.get('content', '').encode()).hexdigest()}"
+        for item in context
+    )
+    return hashlib.sha256("\n".join(pairs).encode()).hexdigest()
+
+def question_key(question: str) -> str:
+    """Exact-match form of a question: casefolded with whitespace collapsed, symbols kept"""
+    return " ".join(question.casefold().split())
+
+class CachedAnswer:
+    __slots__ = ("session_id", "question", "vector", "norm", "answer", "expires_at")
+
+    def __init__(self, session_id: str, question: str, vector: Optional[array], answer: str, expires_at: float):
+        self.session_id = session_id
+        self.question = question_key(question)
+        self.vector = vector
+        self.norm = math.sqrt(sum(x * x for x in vector)) if vector is not None else 0.0
+        self.answer = answer
+        self.expires_at = expires_at
+
+class AnswerCache:
+    """Reuses answers to paraphrased questions asked against the same retrieved context.
+
+    Entries are grouped by the fingerprint of the chunks retrieved for the
+    question, so a hit is only possible when the LLM would see exactly the
+    same context; within that group the question embeddings must be at least
+    ``similarity_threshold`` cosine-similar, unless the questions are worded
+    identically (up to case and whitespace). Because fingerprints hash
+    content, sessions built from identical pages share entries unless
+    ``cross_session`` is off. Bounded by entry count (LRU by fingerprint
+    group) and TTL.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries: int = 5000,
+                 ttl_seconds: float = 3600.0, max_per_context: int = 20, cross_session: bool = True):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_per_context = max(1, max_per_context)
+        self.cross_session = cross_session
+        self._groups: "OrderedDict[str, List[CachedAnswer]]" = OrderedDict()
+        self._size = 0
+
+        # Metrics
+        self.hits = 0
+        self.cross_session_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str, fingerprint: str, question: str,
+            embedding: Optional[Embedding]) -> Optional[str]:
+        best, best_score = None, 0.0
+        group = self._live_group(fingerprint)
+        if group:
+            normalized = question_key(question)
+            query_norm = math.sqrt(sum(x * x for x in embedding)) if embedding is not None else 0.0
+            for entry in group:
+                if not self.cross_session and entry.session_id != session_id:
+                    continue
+                score = self._similarity(entry, normalized, embedding, query_norm)
+                if score >= self.similarity_threshold and score > best_score:
+                    best, best_score = entry, score
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        self._groups.move_to_end(fingerprint)
+        self.hits += 1
+        if best.session_id != session_id:
+            self.cross_session_hits += 1
+        logger.info(f"💾 Answer cache hit (similarity {best_score:.3f}) for '{question[:50]}'")
+        return best.answer
+
+    def _similarity(self, entry: CachedAnswer, normalized: str, embedding: Optional[Embedding],
+                    query_norm: float) -> float:
+        if entry.question == normalized:
+            return 1.0
+        if embedding is None or entry.vector is None or len(embedding) != len(entry.vector):
+            return 0.0
+        if not query_norm or not entry.norm:
+            return 0.0
+        dot = sum(a * b for a, b in zip(embedding, entry.vector))
+        return dot / (query_norm * entry.norm)
+
+    def put(self, session_id: str, fingerprint: str, question: str, embedding: Optional[Embedding], answer: str):
+        if not answer:
+            return
+        entry = CachedAnswer(
+            session_id, question, array('f', embedding) if embedding is not None else None,
+            answer, time.monotonic() + self.ttl_seconds
+        )
+        group = self._groups.setdefault(fingerprint, [])
+        self._groups.move_to_end(fingerprint)
+        # Replace an earlier answer to the same question rather than keeping both
+        for existing in group:
+            if existing.question == entry.question and existing.session_id == session_id:
+                group.remove(existing)
+                self._size -= 1
+                break
+        group.append(entry)
+        self._size += 1
+        self.stores += 1
+
+        if len(group) > self.max_per_context:
+            group.pop(0)
+            self._size -= 1
+            self.evictions += 1
+        while self._size > self.max_entries and self._groups:
+            _, oldest = self._groups.popitem(last=False)
+            self._size -= len(oldest)
+            self.evictions += len(oldest)
+
+    def _live_group(self, fingerprint: str) -> List[CachedAnswer]:
+        """A context's unexpired entries, dropping the expired ones"""
+        group = self._groups.get(fingerprint)
+        if not group:
+            return []
+        now = time.monotonic()
+        live = [entry for entry in group if entry.expires_at >= now]
+        if len(live) != len(group):
+            self.expirations += len(group) - len(live)
+            self._size -= len(group) - len(live)
+            if live:
+                self._groups[fingerprint] = live
+            else:
+                del self._groups[fingerprint]
+        return live
+
+    def evict_session(self, session_id: str) -> int:
+        """Drop the answers a session contributed (called when the session expires or is deleted)"""
+        removed = 0
+        for fingerprint in list(self._groups):
+            group = self._groups[fingerprint]
+            live = [entry for entry in group if entry.session_id != session_id]
+            if len(live) != len(group):
+                removed += len(group) - len(live)
+                if live:
+                    self._groups[fingerprint] = live
+                else:
+                    del self._groups[fingerprint]
+        self._size -= removed
+        return removed
+
+    def clear(self):
+        self._groups.clear()
+        self._size = 0
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "contexts": len(self._groups),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.similarity_threshold,
+            "cross_session": self.cross_session,
+            "hits": self.hits,
+            "cross_session_hits": self.cross_session_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -1,26 +1,145 @@
 try:
     import chromadb
+    from chromadb.config import Settings as ChromaSettings
+    from chromadb.telemetry.product import ProductTelemetryClient
     from chromadb.utils import embedding_functions
+    from overrides import override
     CHROMADB_AVAILABLE = True
+    
+    class NoopTelemetryClient(ProductTelemetryClient):
+        """Drops telemetry events; Chroma's event batching is not thread-safe under concurrent queries"""
+        @override
+        def capture(self, event) -> None:
+            pass
 except ImportError:
     CHROMADB_AVAILABLE = False
     
-import uuid
+import asyncio
+import hashlib
+import re
+import threading
+import time
 import logging
 from typing import List, Dict, Optional
 import os
+from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.services.embeddings import EmbeddingBatcher, QueryEmbeddingCache
+from app.services.chunker import Chunker, tokenizer_counter
 
 # Disable CoreML and other problematic ONNX providers on macOS
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_COLLECTION_NAME = "content_embeddings"
+CHUNK_STORE_COLLECTION_NAME = "chunk_store"
+PARTITION_MODES = ("shared", "sharded", "per_session")
+
+# Chroma collection names: 3-63 chars of [a-zA-Z0-9._-], alphanumeric at both ends
+_COLLECTION_NAME_INVALID_RE = re.compile(r'[^a-zA-Z0-9_-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def chunk_hash(text: str, model_name: str) -> str:
+    """Content address of a chunk: hash of the embedding model and normalized text"""
+    normalized = _WHITESPACE_RE.sub(' ', text).strip()
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode()).hexdigest()
+
 class ChromaService:
-    def __init__(self):
+    def __init__(self, embedding_function=None):
         self.client = None
         self.collection = None
+        self.chunk_store = None
         self.embedding_function = None
-        self._initialize()
+        # Used instead of the SentenceTransformer model when given (any Chroma embedding function)
+        self._embedding_function_override = embedding_function
+        self.chunker = Chunker(settings.CHUNK_MAX_TOKENS, settings.CHUNK_OVERLAP_TOKENS)
+        
+        # Content-addressed chunk deduplication metrics
+        self.chunks_embedded = 0
+        self.chunks_reused = 0
+        # Separate lanes so a large ingest cannot starve concurrent queries
+        self.query_executor = BoundedExecutor("chroma-query", settings.CHROMA_QUERY_WORKERS)
+        self.ingest_executor = BoundedExecutor("chroma-ingest", settings.CHROMA_INGEST_WORKERS)
+        self.query_batcher: Optional[EmbeddingBatcher] = None
+        
+        # Per-session source manifest: session_id -> {url: [chunk ids]}. Kept up to
+        # date by add_content/clear_session_content so retrieval needs one query.
+        self._session_sources: Dict[str, Dict[str, List[str]]] = {}
+        self._manifest_lock = threading.Lock()
+        # When each session's last access was last written to its rows (see touch_session)
+        self._access_recorded: Dict[str, float] = {}
+        
+        # Partitioning: one shared collection, N hashed shards, or a collection per session
+        self.partition_mode = settings.CHROMA_PARTITION_MODE
+        if self.partition_mode not in PARTITION_MODES:
+            logger.warning(f"Unknown CHROMA_PARTITION_MODE '{self.partition_mode}', using 'shared'")
+            self.partition_mode = "shared"
+        self._collections: Dict[str, object] = {}
+        self._collections_lock = threading.Lock()
+        self.query_cache = QueryEmbeddingCache(
+            max_bytes=settings.QUERY_EMBEDDING_CACHE_MAX_BYTES,
+            max_entries=settings.QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
+        
+        # Initialization is deferred to a background warmup task (see start_warmup)
+        self.state = "warming"
+        self.warmup_seconds: Optional[float] = None
+        self._ready_event: Optional[asyncio.Event] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready" and self.collection is not None
+    
+    def start_warmup(self) -> asyncio.Task:
+        """Start loading the client and embedding model in the background"""
+        if self._warmup_task is None:
+            self.state = "warming"
+            self._ready_event = asyncio.Event()
+            self._warmup_task = asyncio.create_task(self._warmup())
+        return self._warmup_task
+    
+    async def _warmup(self):
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._initialize)
+            if self.collection is not None:
+                # Run one embedding so the first real query doesn't pay for lazy model setup
+                await loop.run_in_executor(None, self.embedding_function, ["warmup"])
+                self.query_batcher = EmbeddingBatcher(
+                    self.embedding_function,
+                    self.query_executor,
+                    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+                )
+        except Exception as e:
+            logger.error(f"ChromaDB warmup failed: {e}")
+            self.client = None
+            self.collection = None
+        
+        self.warmup_seconds = time.perf_counter() - started_at
+        self.state = "ready" if self.collection is not None else "degraded"
+        self._ready_event.set()
+        logger.info(f"ChromaDB warmup finished in {self.warmup_seconds:.2f}s (state: {self.state})")
+    
+    async def wait_until_ready(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for warmup; returns whether the store is usable"""
+        if self.state == "warming" and self._ready_event is not None:
+            try:
+                await asyncio.wait_for(self._ready_event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return False
+        return self.is_ready
+    
+    def _client_settings(self) -> "ChromaSettings":
+        # Collections are queried from several executor threads at once
+        return ChromaSettings(
+            anonymized_telemetry=False,
+            chroma_product_telemetry_impl=f"{__name__}.NoopTelemetryClient"
+        )
     
     def _initialize(self):
         """Initialize ChromaDB client with Hugging Face embedding function"""
@@ -32,22 +151,18 @@ class ChromaService:
             
         try:
             # Initialize ChromaDB client (persistent storage)
-            persist_directory = os.path.join(os.path.dirname(__file__), "../../chroma_db")
+            persist_directory = settings.CHROMA_PERSIST_DIR or os.path.join(os.path.dirname(__file__), "../../chroma_db")
             os.makedirs(persist_directory, exist_ok=True)
-            self.client = chromadb.PersistentClient(path=persist_directory)
+            self.client = chromadb.PersistentClient(path=persist_directory, settings=self._client_settings())
             
-            # Initialize SentenceTransformer embedding function (local, no API key needed)
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="all-MiniLM-L6-v2"
-            )
+            self.embedding_function = self._create_embedding_function()
+            self.chunker = self._create_chunker()
             
             # Get or create collection with HF embeddings
-            self.collection = self.client.get_or_create_collection(
-                name="content_embeddings",
-                embedding_function=self.embedding_function,
-                metadata={"description": "Web content embeddings for Q&A via Hugging Face"}
-            )
+            self.collection = self._create_collection(DEFAULT_COLLECTION_NAME)
+            self.chunk_store = self._create_collection(CHUNK_STORE_COLLECTION_NAME)
             
+            logger.info(f"Partition mode: {self.partition_mode}")
             logger.info("✅ ChromaDB service initialized successfully with Hugging Face embeddings")
             
         except Exception as e:
@@ -55,50 +170,132 @@ class ChromaService:
             # Fallback to in-memory storage
             self._initialize_fallback()
     
+    def _create_embedding_function(self):
+        """SentenceTransformer embedding function (local, no API key needed)"""
+        if self._embedding_function_override is not None:
+            return self._embedding_function_override
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=settings.EMBEDDING_MODEL_NAME
+        )
+    
+    def _create_chunker(self) -> Chunker:
+        """Chunker sized to the embedding model, counting tokens with its own tokenizer when loaded"""
+        max_tokens = settings.CHUNK_MAX_TOKENS
+        model = getattr(self.embedding_function, "_model", None)
+        max_seq_length = getattr(model, "max_seq_length", None)
+        if max_seq_length:
+            # Room for the [CLS]/[SEP] tokens the model adds
+            max_tokens = min(max_tokens, max_seq_length - 2)
+        return Chunker(max_tokens, settings.CHUNK_OVERLAP_TOKENS, tokenizer_counter(model))
+    
     def _initialize_fallback(self):
         """Fallback to in-memory ChromaDB if persistent fails"""
         try:
-            self.client = chromadb.Client()
+            self.client = chromadb.Client(self._client_settings())
             
-            # Initialize SentenceTransformer embedding function for fallback (local, no API key needed)
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="all-MiniLM-L6-v2"
-            )
+            self.embedding_function = self._create_embedding_function()
+            self.chunker = self._create_chunker()
             
-            self.collection = self.client.get_or_create_collection(
-                name="content_embeddings",
-                embedding_function=self.embedding_function,
-                metadata={"description": "Web content embeddings for Q&A via Hugging Face"}
-            )
+            self.collection = self._create_collection(DEFAULT_COLLECTION_NAME)
+            self.chunk_store = self._create_collection(CHUNK_STORE_COLLECTION_NAME)
             logger.info("ChromaDB fallback (in-memory) initialized with Hugging Face embeddings")
         except Exception as e:
             logger.error(f"ChromaDB fallback failed: {e}")
             self.client = None
             self.collection = None
     
-    def add_content(self, session_id: str, content_items: List[Dict]) -> bool:
-        """Add content items to ChromaDB with chunking for large content"""
+    def _create_collection(self, name: str, session_id: Optional[str] = None):
+        metadata = {"description": "Web content embeddings for Q&A via Hugging Face"}
+        if session_id is not None:
+            # Lets the session sweeper find expired per-session collections
+            metadata.update({"session_id": session_id, "created_at": time.time()})
+        
+        collection = self.client.get_or_create_collection(
+            name=name,
+            embedding_function=self.embedding_function,
+            metadata=metadata
+        )
+        with self._collections_lock:
+            self._collections[name] = collection
+        return collection
+    
+    def _collection_name(self, session_id: str) -> str:
+        """Name of the collection that holds a session's chunks"""
+        if self.partition_mode == "sharded":
+            shard = int(hashlib.md5(session_id.encode()).hexdigest()[:8], 16) % max(1, settings.CHROMA_SHARD_COUNT)
+            return f"{DEFAULT_COLLECTION_NAME}_{shard:03d}"
+        if self.partition_mode == "per_session":
+            name = f"session_{_COLLECTION_NAME_INVALID_RE.sub('-', session_id)}"
+            if len(name) > 63 or not name[-1].isalnum():
+                name = f"session_{hashlib.sha1(session_id.encode()).hexdigest()}"
+            return name
+        return DEFAULT_COLLECTION_NAME
+    
+    def _get_collection(self, session_id: str, create: bool = False):
+        """Collection for a session; None if it doesn't exist and create is False"""
+        name = self._collection_name(session_id)
+        with self._collections_lock:
+            collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+        if create:
+            return self._create_collection(name, session_id if self.partition_mode == "per_session" else None)
+        
+        try:
+            collection = self.client.get_collection(name=name, embedding_function=self.embedding_function)
+        except ValueError:
+            return None
+        with self._collections_lock:
+            self._collections[name] = collection
+        return collection
+    
+    def _session_filter(self, session_id: str) -> Dict:
+        # A per-session collection only ever contains that session's chunks
+        if self.partition_mode == "per_session":
+            return {}
+        return {"where": {"session_id": session_id}}
+    
+    def add_content(self, session_id: str, content_items: List[Dict], replace: bool = True) -> bool:
+        """Add content items to ChromaDB with chunking for large content.
+        
+        With replace=False the items are appended to what the session already
+        has (used by incremental ingestion jobs).
+        """
         if not self.collection:
             return False
         
         try:
-            # Clear existing content for this session
-            self.clear_session_content(session_id)
+            if replace:
+                # Clear existing content for this session
+                self.clear_session_content(session_id)
+            else:
+                # Make sure a persisted manifest is loaded before merging into it
+                self._get_session_sources(session_id)
             
             documents = []
             metadatas = []
             ids = []
+            hashes = []
+            seen_ids = set()
+            sources: Dict[str, List[str]] = {}
+            ingested_at = time.time()
             
             for item in content_items:
                 content = item.get('content', '')
                 title = item.get('title', '')
                 url = item.get('url', '')
                 
-                # Chunk large content into smaller pieces (1000 chars each)
-                chunks = self._chunk_content(content, chunk_size=1000)
+                # Token-bounded chunks along the page's headings and paragraphs (when the extractor kept them)
+                chunks = self.chunker.chunk(item.get('blocks') or [content])
                 
-                for i, chunk in enumerate(chunks):
-                    doc_id = f"{session_id}_{url}_{i}_{uuid.uuid4().hex[:8]}"
+                for i, piece in enumerate(chunks):
+                    chunk = piece.text
+                    # Content-addressed IDs: the same chunk text is only stored once per session
+                    digest = chunk_hash(chunk, settings.EMBEDDING_MODEL_NAME)
+                    doc_id = f"{session_id}_{digest}"
+                    if not chunk.strip() or doc_id in seen_ids:
+                        continue
+                    seen_ids.add(doc_id)
                     
                     documents.append(chunk)
                     metadatas.append({
@@ -106,17 +303,41 @@ class ChromaService:
                         "url": url,
                         "title": title,
                         "chunk_index": i,
-                        "total_chunks": len(chunks)
+                        "total_chunks": len(chunks),
+                        "char_start": piece.char_start,
+                        "char_end": piece.char_end,
+                        "chunk_hash": digest,
+                        "ingested_at": ingested_at,
+                        "last_access_at": ingested_at
                     })
                     ids.append(doc_id)
+                    hashes.append(digest)
+                    sources.setdefault(url, []).append(doc_id)
             
-            # Add to ChromaDB
+            # Add to ChromaDB in bounded batches so each embedding call stays short
             if documents:
-                self.collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
+                collection = self._get_collection(session_id, create=True)
+                batch_size = max(1, settings.CHROMA_ADD_BATCH_SIZE)
+                for start in range(0, len(documents), batch_size):
+                    end = start + batch_size
+                    embeddings = self._store_chunks(hashes[start:end], documents[start:end])
+                    # Appends may repeat a chunk the session already has
+                    write = collection.add if replace else collection.upsert
+                    # Session rows reference the chunk store by chunk_hash instead of repeating its text
+                    write(
+                        embeddings=embeddings,
+                        metadatas=metadatas[start:end],
+                        ids=ids[start:end]
+                    )
+                
+                self._access_recorded[session_id] = ingested_at
+                with self._manifest_lock:
+                    if replace:
+                        self._session_sources[session_id] = sources
+                    else:
+                        manifest = self._session_sources.setdefault(session_id, {})
+                        for url, doc_ids in sources.items():
+                            manifest[url] = list(dict.fromkeys(manifest.get(url, []) + doc_ids))
                 
                 logger.info(f"Added {len(documents)} content chunks for session {session_id}")
                 return True
@@ -126,45 +347,118 @@ class ChromaService:
         
         return False
     
-    def search_relevant_content(self, session_id: str, query: str, max_results: int = 10) -> List[Dict]:
+    def _store_chunks(self, hashes: List[str], documents: List[str]) -> List[List[float]]:
+        """Store chunks once in the shared chunk store and return their embeddings.
+        
+        Only unseen text is embedded. The chunk store holds each chunk's text
+        and vector; session rows keep a copy of the vector (so a session's
+        partition is searched with one query) and the chunk_hash, and their
+        text is read back from here (see _chunk_texts).
+        """
+        now = time.time()
+        known = {}
+        last_used = {}
+        try:
+            stored = self.chunk_store.get(ids=hashes, include=["embeddings", "metadatas", "documents"])
+            # Entries written before the chunk store kept text are treated as unseen
+            known = {digest: vector for digest, vector, doc in zip(stored['ids'], stored['embeddings'], stored['documents']) if doc}
+            last_used = {digest: (meta or {}).get('last_used_at', 0) for digest, meta in zip(stored['ids'], stored['metadatas'])}
+        except Exception as e:
+            logger.warning(f"Chunk store lookup failed: {e}")
+        
+        missing = [(digest, doc) for digest, doc in dict(zip(hashes, documents)).items() if digest not in known]
+        missing_hashes = {digest for digest, _ in missing}
+        if missing:
+            vectors = self.embedding_function([doc for _, doc in missing])
+            for (digest, _), vector in zip(missing, vectors):
+                known[digest] = list(vector)
+            # Session rows have no text of their own, so a failed write here fails the ingest
+            self.chunk_store.upsert(
+                ids=[digest for digest, _ in missing],
+                documents=[doc for _, doc in missing],
+                embeddings=vectors,
+                metadatas=[{"model": settings.EMBEDDING_MODEL_NAME, "last_used_at": now} for _ in missing]
+            )
+        
+        reused = [digest for digest in dict.fromkeys(hashes) if digest not in missing_hashes]
+        # Refresh last use so the sweeper keeps chunks that sessions still reference; a
+        # timestamp well inside the session TTL is left alone to spare the metadata writes
+        refresh_before = now - settings.SESSION_TTL_SECONDS / 10
+        stale = [digest for digest in reused if last_used.get(digest, 0) < refresh_before]
+        if stale:
+            self._touch_chunks(stale, now)
+        
+        self.chunks_embedded += len(missing)
+        self.chunks_reused += len(reused)
+        return [known[digest] for digest in hashes]
+    
+    def _touch_chunks(self, hashes: List[str], now: float):
+        try:
+            self.chunk_store.update(
+                ids=hashes,
+                metadatas=[{"model": settings.EMBEDDING_MODEL_NAME, "last_used_at": now} for _ in hashes]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to refresh chunk store entries: {e}")
+    
+    def _chunk_texts(self, hashes: List[str]) -> Dict[str, str]:
+        """Text of chunks in the chunk store, by chunk_hash"""
+        hashes = [digest for digest in dict.fromkeys(hashes) if digest]
+        if not hashes:
+            return {}
+        stored = self.chunk_store.get(ids=hashes, include=["documents"])
+        return {digest: doc for digest, doc in zip(stored['ids'], stored['documents']) if doc}
+    
+    def search_relevant_content(self, session_id: str, query: str, max_results: int = 10,
+                                query_embedding: Optional[List[float]] = None) -> List[Dict]:
         """Search for relevant content chunks using semantic similarity with balanced representation from multiple sources"""
         if not self.collection:
             return []
         
+        # Use a precomputed query embedding when available (see embed_query)
+        if query_embedding is not None:
+            query_args = {"query_embeddings": [query_embedding]}
+        else:
+            query_args = {"query_texts": [query]}
+        
         try:
-            # First, get all unique URLs for this session
-            session_results = self.collection.get(
-                where={"session_id": session_id}
-            )
-            
-            unique_urls = list(set([meta.get('url', '') for meta in session_results['metadatas']]))
+            # Unique URLs for this session come from the manifest, not a full session scan
+            unique_urls = list(self._get_session_sources(session_id))
             logger.info(f"Found {len(unique_urls)} unique sources for session {session_id}")
+            collection = self._get_collection(session_id)
+            if not unique_urls or collection is None:
+                return []
             
             if len(unique_urls) == 1:
                 # Single source - use normal search
-                results = self.collection.query(
-                    query_texts=[query],
+                results = collection.query(
+                    **query_args,
                     n_results=max_results,
-                    where={"session_id": session_id}
+                    **self._session_filter(session_id)
                 )
             else:
                 # Multiple sources - ensure balanced representation
                 results_per_source = max(2, max_results // len(unique_urls))  # At least 2 results per source
                 total_results = min(max_results * 2, 20)  # Search more results initially
                 
-                results = self.collection.query(
-                    query_texts=[query],
+                results = collection.query(
+                    **query_args,
                     n_results=total_results,
-                    where={"session_id": session_id}
+                    **self._session_filter(session_id)
                 )
             
             relevant_content = []
-            if results['documents'] and results['documents'][0]:
+            if results['ids'] and results['ids'][0]:
                 # Group results by URL for balanced selection
                 url_groups = {}
+                # Rows written before session rows referenced the chunk store carry their own text
+                texts = self._chunk_texts([meta.get('chunk_hash') for meta in results['metadatas'][0]])
                 
-                for i, doc in enumerate(results['documents'][0]):
+                for i, row_text in enumerate(results['documents'][0]):
                     metadata = results['metadatas'][0][i]
+                    doc = texts.get(metadata.get('chunk_hash')) or row_text
+                    if not doc:
+                        continue
                     url = metadata.get('url', '')
                     distance = results['distances'][0][i] if 'distances' in results else 0
                     
@@ -225,14 +519,28 @@ class ChromaService:
             return False
         
         try:
-            # Get all IDs for this session
-            results = self.collection.get(
-                where={"session_id": session_id}
-            )
+            with self._manifest_lock:
+                sources = self._session_sources.pop(session_id, None)
+            self._access_recorded.pop(session_id, None)
             
-            if results['ids']:
-                self.collection.delete(ids=results['ids'])
-                logger.info(f"Cleared {len(results['ids'])} items for session {session_id}")
+            if self.partition_mode == "per_session":
+                # The whole collection belongs to this session
+                self._drop_collection(self._collection_name(session_id))
+                return True
+            
+            collection = self._get_collection(session_id)
+            if collection is None:
+                return True
+            
+            if sources is not None:
+                ids = [doc_id for doc_ids in sources.values() for doc_id in doc_ids]
+            else:
+                # Unknown to this process (e.g. persisted before a restart) - look the IDs up
+                ids = collection.get(where={"session_id": session_id}, include=[])['ids']
+            
+            if ids:
+                collection.delete(ids=ids)
+                logger.info(f"Cleared {len(ids)} items for session {session_id}")
             
             return True
             
@@ -240,32 +548,180 @@ class ChromaService:
             logger.error(f"Failed to clear session content: {e}")
             return False
     
-    def _chunk_content(self, content: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
-        """Split large content into overlapping chunks"""
-        if len(content) <= chunk_size:
-            return [content]
+    def _get_session_sources(self, session_id: str) -> Dict[str, List[str]]:
+        """Return the {url: [chunk ids]} manifest for a session, loading it once if needed"""
+        with self._manifest_lock:
+            sources = self._session_sources.get(session_id)
+        if sources is not None:
+            return sources
         
-        chunks = []
-        start = 0
+        # Sessions persisted before this process started: rebuild from metadata only
+        collection = self._get_collection(session_id)
+        if collection is None:
+            return {}
+        results = collection.get(include=["metadatas"], **self._session_filter(session_id))
+        sources = {}
+        for doc_id, meta in zip(results['ids'], results['metadatas']):
+            sources.setdefault(meta.get('url', ''), []).append(doc_id)
         
-        while start < len(content):
-            end = start + chunk_size
-            
-            # Try to break at sentence boundary
-            if end < len(content):
-                # Look for sentence endings within the last 200 chars
-                sentence_end = content.rfind('.', start + chunk_size - 200, end)
-                if sentence_end > start:
-                    end = sentence_end + 1
+        if sources:
+            with self._manifest_lock:
+                sources = self._session_sources.setdefault(session_id, sources)
+        return sources
+    
+    def touch_session(self, session_id: str) -> bool:
+        """Write the session's last access to its rows, so purge_stale_sessions keeps it after a restart"""
+        if not self.collection:
+            return False
+        
+        now = time.time()
+        try:
+            collection = self._get_collection(session_id)
+            if collection is None:
+                return False
+            if self.partition_mode == "per_session":
+                # Collection metadata is replaced, not merged
+                collection.modify(metadata={**(collection.metadata or {}), "last_access_at": now})
+            else:
+                ids = [doc_id for doc_ids in self._get_session_sources(session_id).values() for doc_id in doc_ids]
+                if not ids:
+                    return False
+                collection.update(ids=ids, metadatas=[{"last_access_at": now} for _ in ids])
+            self._access_recorded[session_id] = now
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to record last access of session {session_id}: {e}")
+            return False
+    
+    def purge_stale_sessions(self, cutoff: float, live_sessions: set, limit: int) -> List[str]:
+        """Delete up to limit sessions last accessed before cutoff that are not live.
+        
+        Catches sessions that outlived their process (e.g. persisted before a
+        restart) and so are unknown to the in-memory session tracking. Last
+        access is what touch_session wrote, or the ingest time for rows
+        stored before it was recorded.
+        """
+        if not self.collection:
+            return []
+        
+        stale = []
+        try:
+            if self.partition_mode == "per_session":
+                for collection in self.client.list_collections():
+                    metadata = collection.metadata or {}
+                    session_id = metadata.get("session_id")
+                    last_access = metadata.get("last_access_at", metadata.get("created_at", cutoff))
+                    if session_id and session_id not in live_sessions and last_access < cutoff:
+                        stale.append(session_id)
+                        if len(stale) >= limit:
+                            break
+            else:
+                for collection in self._session_collections():
+                    results = collection.get(
+                        where={"ingested_at": {"$lt": cutoff}},
+                        include=["metadatas"],
+                        limit=limit * 50
+                    )
+                    for meta in results['metadatas']:
+                        session_id = meta.get('session_id')
+                        if meta.get('last_access_at', meta['ingested_at']) >= cutoff:
+                            continue  # Ingested long ago but still in use
+                        if session_id and session_id not in live_sessions and session_id not in stale:
+                            stale.append(session_id)
+                    if len(stale) >= limit:
+                        break
+        except Exception as e:
+            logger.error(f"Failed to scan for stale sessions: {e}")
+        
+        stale = stale[:limit]
+        for session_id in stale:
+            self.clear_session_content(session_id)
+        if stale:
+            logger.info(f"🧹 Purged {len(stale)} stale sessions from ChromaDB")
+        return stale
+    
+    def purge_stale_chunks(self, cutoff: float, limit: int) -> int:
+        """Delete up to limit chunk store entries no session has used since cutoff.
+        
+        Session rows read their text from the chunk store, so entries a session
+        row still references are kept (and marked used) however old they are.
+        """
+        if not self.chunk_store:
+            return 0
+        
+        try:
+            candidates = self.chunk_store.get(where={"last_used_at": {"$lt": cutoff}}, include=[], limit=limit)['ids']
+            if not candidates:
+                return 0
             
-            chunk = content[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+            referenced = set()
+            for collection in self._session_collections():
+                rows = collection.get(where={"chunk_hash": {"$in": candidates}}, include=["metadatas"])
+                referenced.update(meta.get('chunk_hash') for meta in rows['metadatas'])
+            if referenced:
+                # So the next sweep doesn't check them again
+                self._touch_chunks(list(referenced), time.time())
             
-            # Move start position with overlap
-            start = end - overlap if end < len(content) else end
+            unused = [digest for digest in candidates if digest not in referenced]
+            if unused:
+                self.chunk_store.delete(ids=unused)
+                logger.info(f"🧹 Purged {len(unused)} unused chunks from the chunk store")
+            return len(unused)
+        except Exception as e:
+            logger.error(f"Failed to purge chunk store: {e}")
+            return 0
+    
+    async def apurge_stale_chunks(self, cutoff: float, limit: int) -> int:
+        """Run purge_stale_chunks on the ingest executor"""
+        return await self.ingest_executor.run(self.purge_stale_chunks, cutoff, limit)
+    
+    async def apurge_stale_sessions(self, cutoff: float, live_sessions: set, limit: int) -> List[str]:
+        """Run purge_stale_sessions on the ingest executor"""
+        return await self.ingest_executor.run(self.purge_stale_sessions, cutoff, live_sessions, limit)
+    
+    def _session_collections(self) -> List:
+        """Every existing collection that holds session rows"""
+        if self.partition_mode == "per_session":
+            return [collection for collection in self.client.list_collections()
+                    if (collection.metadata or {}).get("session_id")]
         
-        return chunks
+        if self.partition_mode == "sharded":
+            names = [f"{DEFAULT_COLLECTION_NAME}_{i:03d}" for i in range(max(1, settings.CHROMA_SHARD_COUNT))]
+        else:
+            names = [DEFAULT_COLLECTION_NAME]
+        collections = []
+        for name in names:
+            try:
+                collections.append(self.client.get_collection(name=name, embedding_function=self.embedding_function))
+            except ValueError:
+                continue
+        return collections
+    
+    def _drop_collection(self, name: str):
+        with self._collections_lock:
+            self._collections.pop(name, None)
+        try:
+            self.client.delete_collection(name=name)
+        except ValueError:
+            pass  # Already gone
+    
+    def get_dedup_stats(self) -> Dict:
+        total = self.chunks_embedded + self.chunks_reused
+        return {
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_reused": self.chunks_reused,
+            "reuse_rate": round(self.chunks_reused / total, 3) if total else 0.0
+        }
+    
+    def get_partition_stats(self) -> Dict:
+        """Partitioning mode and number of open collection handles"""
+        with self._collections_lock:
+            open_collections = len(self._collections)
+        return {
+            "mode": self.partition_mode,
+            "shard_count": settings.CHROMA_SHARD_COUNT if self.partition_mode == "sharded" else None,
+            "open_collections": open_collections
+        }
     
     def get_collection_stats(self, session_id: str) -> Dict:
         """Get statistics about stored content for a session"""
@@ -273,20 +729,84 @@ class ChromaService:
             return {"total_chunks": 0, "urls": []}
         
         try:
-            results = self.collection.get(
-                where={"session_id": session_id}
-            )
-            
-            urls = list(set([meta.get('url', '') for meta in results['metadatas']]))
+            sources = self._get_session_sources(session_id)
             
             return {
-                "total_chunks": len(results['ids']),
-                "urls": urls
+                "total_chunks": sum(len(doc_ids) for doc_ids in sources.values()),
+                "urls": list(sources)
             }
             
         except Exception as e:
             logger.error(f"Failed to get collection stats: {e}")
             return {"total_chunks": 0, "urls": []}
 
-# Global instance
+    async def aadd_content(self, session_id: str, content_items: List[Dict], replace: bool = True) -> bool:
+        """Run add_content on the ingest executor"""
+        return await self.ingest_executor.run(self.add_content, session_id, content_items, replace)
+    
+    async def embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query via the cache, then the micro-batcher so concurrent askers share one model call"""
+        if self.query_batcher is None:
+            return None
+        
+        model_name = settings.EMBEDDING_MODEL_NAME
+        embedding = self.query_cache.get(model_name, query)
+        if embedding is None:
+            embedding = await self.query_batcher.embed(query)
+            self.query_cache.put(model_name, query, embedding)
+        return embedding
+    
+    async def asearch_relevant_content(self, session_id: str, query: str, max_results: int = 10) -> List[Dict]:
+        """Embed the query (batched) and run search_relevant_content on the query executor"""
+        try:
+            query_embedding = await self.embed_query(query)
+        except Exception as e:
+            logger.warning(f"Batched query embedding failed, embedding inline: {e}")
+            query_embedding = None
+        return await self.query_executor.run(
+            self.search_relevant_content, session_id, query, max_results, query_embedding
+        )
+    
+    async def atouch_session(self, session_id: str) -> bool:
+        """Run touch_session on the ingest executor, at most once per tenth of the session TTL"""
+        if time.time() - self._access_recorded.get(session_id, 0) < settings.SESSION_TTL_SECONDS / 10:
+            return False
+        return await self.ingest_executor.run(self.touch_session, session_id)
+    
+    async def aclear_session_content(self, session_id: str) -> bool:
+        """Run clear_session_content on the ingest executor"""
+        return await self.ingest_executor.run(self.clear_session_content, session_id)
+    
+    async def aget_collection_stats(self, session_id: str) -> Dict:
+        """Run get_collection_stats on the query executor"""
+        return await self.query_executor.run(self.get_collection_stats, session_id)
+    
+    def get_executor_stats(self) -> Dict:
+        """Queue depth and timing metrics for the query and ingest executors"""
+        return {
+            "query": self.query_executor.get_stats(),
+            "ingest": self.ingest_executor.get_stats()
+        }
+    
+    def get_batcher_stats(self) -> Dict:
+        return self.query_batcher.get_stats() if self.query_batcher else {}
+    
+    def get_query_cache_stats(self) -> Dict:
+        return self.query_cache.get_stats()
+    
+    def get_readiness(self) -> Dict:
+        return {
+            "state": self.state,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None
+        }
+    
+    def shutdown(self):
+        """Stop the executors (they are recreated lazily if used again)"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        self._warmup_task = None
+        self.query_executor.shutdown(wait=False)
+        self.ingest_executor.shutdown(wait=False)
+
+# Global instance (cheap to construct; the model is loaded by start_warmup)
 chroma_service = ChromaService()
\ No newline at end of file
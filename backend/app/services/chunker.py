@@ -0,0 +1,143 @@
+import math
+import re
+from typing import Callable, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A sentence runs up to terminal punctuation followed by whitespace (or the end of the block)
+_SENTENCE_RE = re.compile(r'\S.*?(?:[.!?]+["\')\]]*(?=\s|$)|$)', re.S)
+_WORD_RE = re.compile(r'\S+')
+
+BLOCK_SEPARATOR = "\n\n"
+
+def estimate_tokens(texts: Sequence[str]) -> List[int]:
+    """Rough word-piece count (about 4 characters per token) when no tokenizer is available"""
+    return [max(1, math.ceil(len(text) / 4)) for text in texts]
+
+class Chunk:
+    def __init__(self, text: str, char_start: int, char_end: int, tokens: int):
+        self.text = text
+        self.char_start = char_start
+        self.char_end = char_end
+        self.tokens = tokens
+
+class _Unit:
+    """A sentence (or a piece of an overlong one) with its span in the source text"""
+    __slots__ = ("start", "end", "tokens", "block_start", "heading")
+
+    def __init__(self, start: int, end: int, block_start: bool, heading: bool):
+        self.start = start
+        self.end = end
+        self.tokens = 0
+        self.block_start = block_start
+        self.heading = heading
+
+class Chunker:
+    """Packs a page's structural blocks (headings, paragraphs) into token-bounded chunks.
+
+    Blocks are split into sentences and every sentence is measured with one
+    batched tokenizer call. Sentences are packed greedily up to
+    ``max_tokens``; a heading starts a new chunk once the current one is at
+    least half full, so chunks follow the page's sections. Offsets refer to
+    the blocks joined with blank lines.
+    """
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32,
+                 count_tokens: Optional[Callable[[Sequence[str]], List[int]]] = None):
+        self.max_tokens = max(16, max_tokens)
+        self.overlap_tokens = max(0, overlap_tokens)
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def chunk(self, blocks: List[str]) -> List[Chunk]:
+        source = BLOCK_SEPARATOR.join(blocks)
+        units = self._split_units(blocks)
+        if not units:
+            return []
+
+        counts = self.count_tokens([source[unit.start:unit.end] for unit in units])
+        for unit, count in zip(units, counts):
+            unit.tokens = count
+        units = self._split_overlong(source, units)
+
+        chunks: List[Chunk] = []
+        current: List[_Unit] = []
+        current_tokens = 0
+        for unit in units:
+            section_break = unit.heading and current_tokens >= self.max_tokens // 2
+            if current and (current_tokens + unit.tokens > self.max_tokens or section_break):
+                chunks.append(self._make_chunk(source, current, current_tokens))
+                # Carry a short trailing sentence over for context, unless a new section starts
+                tail = current[-1]
+                carry = (not section_break and not tail.heading and tail.tokens <= self.overlap_tokens
+                         and tail.tokens + unit.tokens <= self.max_tokens)
+                current = [tail] if carry else []
+                current_tokens = tail.tokens if carry else 0
+            current.append(unit)
+            current_tokens += unit.tokens
+
+        if current:
+            chunks.append(self._make_chunk(source, current, current_tokens))
+        return chunks
+
+    def _make_chunk(self, source: str, units: List[_Unit], tokens: int) -> Chunk:
+        start, end = units[0].start, units[-1].end
+        return Chunk(source[start:end], start, end, tokens)
+
+    def _split_units(self, blocks: List[str]) -> List[_Unit]:
+        units = []
+        offset = 0
+        for block in blocks:
+            heading = len(block) <= 80 and not block.rstrip().endswith(('.', '!', '?', ':'))
+            first = True
+            for match in _SENTENCE_RE.finditer(block):
+                end = match.end()
+                while end > match.start() and block[end - 1].isspace():
+                    end -= 1
+                if end > match.start():
+                    units.append(_Unit(offset + match.start(), offset + end, first, heading))
+                    first = False
+            offset += len(block) + len(BLOCK_SEPARATOR)
+        return units
+
+    def _split_overlong(self, source: str, units: List[_Unit]) -> List[_Unit]:
+        """Break sentences longer than the budget into word runs that fit"""
+        if all(unit.tokens <= self.max_tokens for unit in units):
+            return units
+
+        result = []
+        for unit in units:
+            if unit.tokens <= self.max_tokens:
+                result.append(unit)
+                continue
+            # Match positions are already offsets into source
+            words = [m.span() for m in _WORD_RE.finditer(source, unit.start, unit.end)]
+            # Tokens per character of this sentence, to size the pieces without re-tokenizing each word
+            density = unit.tokens / max(1, unit.end - unit.start)
+            budget_chars = max(1, int(self.max_tokens / density * 0.9))
+            piece_start = words[0][0]
+            piece_end = words[0][1]
+            for word_start, word_end in words[1:]:
+                if word_end - piece_start > budget_chars:
+                    result.append(self._piece(unit, piece_start, piece_end, density, first=piece_start == unit.start))
+                    piece_start = word_start
+                piece_end = word_end
+            result.append(self._piece(unit, piece_start, piece_end, density, first=piece_start == unit.start))
+        return result
+
+    def _piece(self, unit: _Unit, start: int, end: int, density: float, first: bool) -> _Unit:
+        piece = _Unit(start, end, unit.block_start and first, unit.heading and first)
+        piece.tokens = min(self.max_tokens, max(1, math.ceil((end - start) * density)))
+        return piece
+
+def tokenizer_counter(model) -> Optional[Callable[[Sequence[str]], List[int]]]:
+    """Token counter backed by a SentenceTransformer's tokenizer (batched), if it exposes one"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return None
+
+    def count(texts: Sequence[str]) -> List[int]:
+        encoded = tokenizer(list(texts), add_special_tokens=False, truncation=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    return count
@@ -1,28 +1,119 @@
 import asyncio
+import codecs
 import httpx
-from bs4 import BeautifulSoup
 import html2text
-from typing import List
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
 from app.models.schemas import ExtractedContent, ExtractionResponse
 from app.core.config import settings
-import re
+from app.core.executor import BoundedExecutor
+from app.core.http import create_http_client
+from app.services.fetch_scheduler import FetchScheduler
+from app.services.page_cache import PageCache
+from app.services.page_parser import PageParser, parse_page
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-class ContentExtractorService:
+# Media types worth downloading and parsing; pages without a Content-Type are tried too
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+class DownloadRejected(Exception):
+    """The response is not something we should download (wrong type, too large)"""
+    pass
+
+def normalize_url(url: str) -> str:
+    """Key for in-flight deduplication: case-insensitive scheme/host, no default port or fragment"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+ProgressCallback = Callable[[str], None]
+
+class InFlightExtraction:
+    """One shared fetch-and-parse task, the callers awaiting it and their progress listeners"""
+
     def __init__(self):
-        self.session = httpx.AsyncClient(
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.stage: Optional[str] = None
+        self.listeners: List[ProgressCallback] = []
+
+    def add_listener(self, callback: ProgressCallback):
+        self.listeners.append(callback)
+        if self.stage:
+            # Joined late: catch up on the stage already reached
+            callback(self.stage)
+
+    def remove_listener(self, callback: ProgressCallback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self, stage: str):
+        self.stage = stage
+        for callback in list(self.listeners):
+            try:
+                callback(stage)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+class ContentExtractorService:
+    def __init__(self, fetch_scheduler: Optional[FetchScheduler] = None):
+        self.session = create_http_client(
             timeout=30.0,
             headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
         )
+        
+        # Per-host rate limits, concurrency caps and retries for page fetches
+        self.fetch_scheduler = fetch_scheduler or FetchScheduler(
+            max_concurrency=settings.FETCH_MAX_CONCURRENCY,
+            per_host_concurrency=settings.FETCH_PER_HOST_CONCURRENCY,
+            per_host_rate=settings.FETCH_PER_HOST_RATE,
+            per_host_burst=settings.FETCH_PER_HOST_BURST,
+            max_retries=settings.FETCH_MAX_RETRIES,
+            backoff_base=settings.FETCH_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.FETCH_BACKOFF_MAX_SECONDS
+        )
+        
+        self.page_cache = None
+        if settings.PAGE_CACHE_ENABLED:
+            try:
+                cache_dir = settings.PAGE_CACHE_DIR or os.path.join(os.path.dirname(__file__), "../../page_cache")
+                self.page_cache = PageCache(cache_dir, settings.PAGE_CACHE_MAX_BYTES)
+            except Exception as e:
+                logger.warning(f"Page cache disabled: {e}")
+        
+        # Concurrent extractions of the same URL share one fetch and parse
+        self._inflight: Dict[str, InFlightExtraction] = {}
+        self.extractions_started = 0
+        self.extractions_coalesced = 0
+        
+        # Parsing and cleaning is CPU bound; run it in worker processes so it
+        # neither blocks the event loop nor serializes across URLs
+        self.parser = PageParser()
+        self.parse_executor = None
+        if settings.EXTRACTOR_PARSE_WORKERS > 0:
+            self.parse_executor = BoundedExecutor(
+                "html-parse",
+                settings.EXTRACTOR_PARSE_WORKERS,
+                max_concurrency=settings.EXTRACTOR_PARSE_WORKERS * 2,
+                use_processes=True
+            )
     
     async def extract_from_urls(self, urls: List[str]) -> ExtractionResponse:
         tasks = [self._extract_single_url(str(url)) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
-        
+        return self.build_response(results)
+    
+    def build_response(self, results: List) -> ExtractionResponse:
+        """Aggregate per-URL results (or exceptions) into an ExtractionResponse"""
         extracted_content = []
         failed_urls = []
         total_word_count = 0
@@ -47,14 +138,79 @@ class ContentExtractorService:
             failed_urls=failed_urls
         )
     
-    async def _extract_single_url(self, url: str) -> ExtractedContent:
+    async def extract_url(self, url: str, on_progress: Optional[ProgressCallback] = None,
+                          collect_links: bool = False) -> ExtractedContent:
+        """Extract a single URL; on_progress is called with "fetched" once the page body has arrived.
+        
+        With collect_links the result's ``links`` lists the page's outgoing links (for crawling).
+        """
+        return await self._extract_single_url(url, on_progress, collect_links)
+    
+    async def _extract_single_url(self, url: str, on_progress: Optional[ProgressCallback] = None,
+                                  collect_links: bool = False) -> ExtractedContent:
+        """Extract a URL, joining an identical extraction that is already in flight"""
+        key = normalize_url(url) + (" +links" if collect_links else "")
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = InFlightExtraction()
+            entry.task = asyncio.ensure_future(self._fetch_and_parse(url, entry.notify, collect_links))
+            self._inflight[key] = entry
+            entry.task.add_done_callback(lambda _: self._forget_inflight(key, entry))
+            self.extractions_started += 1
+        else:
+            self.extractions_coalesced += 1
+            logger.info(f"🔗 Joining in-flight extraction of {url}")
+        
+        entry.waiters += 1
+        if on_progress:
+            entry.add_listener(on_progress)
+        try:
+            # Shielded so one caller's cancellation doesn't cancel the others' extraction
+            result = await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if on_progress:
+                entry.remove_listener(on_progress)
+            if entry.waiters == 0 and not entry.task.done():
+                # Every caller has gone away; stop the work and don't let new callers join it
+                self._forget_inflight(key, entry)
+                entry.task.cancel()
+        
+        if result.url != url:
+            result = result.model_copy(update={"url": url})
+        return result
+    
+    def _forget_inflight(self, key: str, entry: InFlightExtraction):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+    
+    async def _fetch_and_parse(self, url: str, on_progress: Optional[ProgressCallback] = None,
+                               collect_links: bool = False) -> ExtractedContent:
         try:
             logger.info(f"🌐 Starting extraction from: {url}")
             
-            # Use simple HTTP extraction with BeautifulSoup
-            response = await self.session.get(url)
+            # Revalidate a cached copy with a conditional request when we have one
+            cached = await self.page_cache.aget(url) if self.page_cache else None
+            if cached and collect_links and cached.content.links is None:
+                cached = None  # Cached without links; a crawl needs a full fetch
+            headers = cached.conditional_headers() if cached else {}
+            
+            # Stream the body with a size cap and an overall deadline; parsing happens in the parse pool
+            response, html_content = await self.fetch_scheduler.fetch(
+                url,
+                lambda: asyncio.wait_for(self._download(url, headers), timeout=settings.EXTRACTOR_DOWNLOAD_TIMEOUT_SECONDS)
+            )
             logger.info(f"📡 HTTP response: {response.status_code}")
             
+            if cached:
+                if response.status_code == 304:
+                    logger.info(f"♻️ Page not modified, using cached extraction for {url}")
+                    self.page_cache.record_revalidated()
+                    if on_progress:
+                        on_progress("fetched")
+                    return cached.content
+                self.page_cache.record_stale()
+            
             if response.status_code == 404:
                 return ExtractedContent(
                     url=url,
@@ -83,7 +239,6 @@ class ContentExtractorService:
                     word_count=0
                 )
             
-            html_content = response.text
             if not html_content:
                 logger.warning(f"Empty HTML content from {url}")
                 return ExtractedContent(
@@ -91,59 +246,26 @@ class ContentExtractorService:
                     error_message="No HTML content received", word_count=0
                 )
                 
-            soup = BeautifulSoup(html_content, 'html.parser')
-            if soup is None:
-                logger.warning(f"Failed to parse HTML from {url}")
-                return ExtractedContent(
-                    url=url, title="", content="", success=False,
-                    error_message="Failed to parse HTML content", word_count=0
-                )
-            
-            # Remove script and style elements with null checks
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                if script is not None:
-                    script.decompose()
-            
-            # Try to find the main content
-            title = self._extract_title(soup)
-            content = self._extract_content(soup)
-            
-            # Be much more lenient with content length requirements
-            if not content or len(content.strip()) < 50:  # Reduced from 100 to 50
-                logger.warning(f"Insufficient content from {url}: {len(content.strip()) if content else 0} chars")
-                return ExtractedContent(
-                    url=url,
-                    title=title,
-                    content="",
-                    success=False,
-                    error_message="This page doesn't contain enough readable content. It might be a JavaScript-heavy site or require authentication.",
-                    word_count=0
-                )
-            
-            logger.info(f"Raw content extracted: {len(content)} chars")
-            
-            cleaned_content = self._clean_text(content)
-            word_count = len(cleaned_content.split())
+            if on_progress:
+                on_progress("fetched")
+            result = await self._parse(url, html_content, collect_links)
             
-            logger.info(f"✅ Final content: {len(cleaned_content)} chars, {word_count} words")
+            if self.page_cache and result.success:
+                await self.page_cache.aput(url, result, response.headers.get('etag'), response.headers.get('last-modified'))
             
-            # Make sure we still have content after cleaning
-            if len(cleaned_content.strip()) < 20:
-                logger.warning(f"Content lost during cleaning. Original: {len(content)}, Cleaned: {len(cleaned_content)}")
-                # Use original content if cleaning removed too much
-                cleaned_content = content[:2000]  # Use first 2000 chars of original content
-                word_count = len(cleaned_content.split())
-                logger.info(f"Using original content: {len(cleaned_content)} chars")
+            return result
             
+        except DownloadRejected as e:
+            logger.warning(f"Skipping {url}: {e}")
             return ExtractedContent(
                 url=url,
-                title=title,
-                content=cleaned_content,
-                success=True,
-                word_count=word_count
+                title="",
+                content="",
+                success=False,
+                error_message=str(e),
+                word_count=0
             )
-            
-        except httpx.TimeoutException:
+        except (httpx.TimeoutException, asyncio.TimeoutError):
             logger.error(f"Timeout extracting from {url}")
             return ExtractedContent(
                 url=url,
@@ -174,243 +296,73 @@ class ContentExtractorService:
                 word_count=0
             )
     
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        # Try different title sources
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text().strip()
-        
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            return h1_tag.get_text().strip()
-        
-        return "Untitled"
-    
-    def _extract_content(self, soup: BeautifulSoup) -> str:
-        # Check if this is a Wikipedia page - check the URL properly
-        page_source = str(soup)[:1000]  # Check first 1000 chars for efficiency
-        is_wikipedia = ('wikipedia.org' in page_source or 
-                       soup.find(attrs={'class': 'mw-parser-output'}) is not None or
-                       soup.find(attrs={'id': 'mw-content-text'}) is not None)
-        
-        if is_wikipedia:
-            logger.info("Detected Wikipedia page - using specialized extraction")
-            content = self._extract_wikipedia_content(soup)
-            if content and len(content.strip()) > 50:
-                logger.info(f"Wikipedia extraction successful: {len(content)} chars")
-                return content
-            else:
-                logger.warning("Wikipedia specialized extraction failed, trying generic extraction")
-        
-        # Remove unwanted elements that create noise
-        for unwanted in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'menu', 
-                             'noscript', 'iframe', 'object', 'embed', 'form', 'input', 'button']):
-            unwanted.decompose()
-        
-        # Remove common clutter classes/ids
-        for clutter in soup.find_all(attrs={'class': re.compile(r'(nav|menu|sidebar|footer|header|ad|advertisement|social|share|comment|related)', re.I)}):
-            clutter.decompose()
-        
-        for clutter in soup.find_all(attrs={'id': re.compile(r'(nav|menu|sidebar|footer|header|ad|advertisement|social|share|comment|related)', re.I)}):
-            clutter.decompose()
-        
-        # Try to find main content areas (in order of preference)
-        content_selectors = [
-            'article',
-            'main', 
-            '[role="main"]',
-            '.content',
-            '.post-content', 
-            '.entry-content',
-            '.article-content',
-            '.story-body',
-            '.post-body',
-            '.article-text'
-        ]
-        
-        extracted_content = []
-        
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                for element in elements:
-                    # Extract text with better structure preservation
-                    text = self._extract_structured_text(element)
-                    if text and len(text.strip()) > 100:
-                        extracted_content.append(text)
-                
-                if extracted_content:
-                    return '\n\n'.join(extracted_content)
-        
-        # Fallback: Get text from paragraphs in body
-        body = soup.find('body')
-        if body:
-            paragraphs = body.find_all('p')
-            if len(paragraphs) > 3:  # Ensure we have substantial paragraph content
-                paragraph_texts = []
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if len(text) > 30:  # Only keep substantial paragraphs
-                        paragraph_texts.append(text)
-                
-                if paragraph_texts:
-                    return '\n\n'.join(paragraph_texts)
+    async def _download(self, url: str, headers: dict) -> Tuple[httpx.Response, Optional[str]]:
+        """Stream a page body, decoding incrementally, without buffering more than the byte cap.
+        
+        Returns the (closed) response and the decoded text; the text is None
+        when the status is not 200 and the body was never read. Raises
+        DownloadRejected as soon as the body turns out to exceed the cap.
+        """
+        max_bytes = settings.EXTRACTOR_MAX_PAGE_BYTES
+        async with self.session.stream('GET', url, headers=headers) as response:
+            if response.status_code != 200:
+                return response, None
             
-            # Last resort: body text
-            return body.get_text()
-        
-        return soup.get_text()
-    
-    def _extract_wikipedia_content(self, soup: BeautifulSoup) -> str:
-        """Simplified and robust extraction for Wikipedia pages"""
-        logger.info("Extracting Wikipedia content with simplified method")
-        
-        # Simple approach: get all paragraphs from the page
-        all_paragraphs = soup.find_all('p')
-        logger.info(f"Found {len(all_paragraphs)} total paragraphs")
-        
-        paragraph_texts = []
-        
-        for p in all_paragraphs:
-            if p is None:
-                continue
-                
-            # Remove reference markers and edit links
-            try:
-                unwanted_elements = p.find_all(['sup', 'a'])
-                for unwanted in unwanted_elements:
-                    if unwanted is None:
-                        continue
-                        
-                    # Safe null checks for attributes
-                    try:
-                        unwanted_class = unwanted.get('class') if hasattr(unwanted, 'get') else None
-                        unwanted_title = unwanted.get('title') if hasattr(unwanted, 'get') else None
-                        
-                        if unwanted_class and 'reference' in ' '.join(unwanted_class):
-                            unwanted.decompose()
-                        elif unwanted_title and 'edit' in unwanted_title.lower():
-                            unwanted.decompose()
-                    except Exception:
-                        # Silently skip problematic elements
-                        continue
-            except Exception as e:
-                logger.warning(f"Error processing paragraph unwanted elements: {e}")
-                continue
+            media_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+            if media_type and media_type not in HTML_CONTENT_TYPES:
+                raise DownloadRejected(f"Unsupported content type '{media_type}'. Only web pages can be extracted.")
             
-            try:
-                text = p.get_text().strip() if p else ""
-            except Exception as e:
-                logger.warning(f"Error extracting text from paragraph: {e}")
-                continue
+            declared_length = response.headers.get('content-length', '')
+            if declared_length.isdigit() and int(declared_length) > max_bytes:
+                raise DownloadRejected(
+                    f"Page is too large ({int(declared_length) // 1024 // 1024} MB). "
+                    f"The limit is {max_bytes // 1024 // 1024} MB."
+                )
             
-            # Very lenient filtering - keep almost everything that looks like content
-            if (text and len(text) > 10 and 
-                not re.match(r'^[\d\s\-\.]+$', text) and  # Skip numeric-only
-                not text.lower().startswith(('edit', 'view', 'from wikipedia', 'jump to'))):
-                
-                paragraph_texts.append(text)
-        
-        if paragraph_texts:
-            content = '\n\n'.join(paragraph_texts)
-            logger.info(f"Wikipedia simple extraction: {len(content)} characters from {len(paragraph_texts)} paragraphs")
-            return content
-        
-        # Ultimate fallback: just get all text content
-        logger.info("Using ultimate Wikipedia fallback - all text")
-        body = soup.find('body')
-        if body is not None:
             try:
-                # Remove obviously unwanted elements
-                for unwanted in body.find_all(['script', 'style', 'nav', 'footer']):
-                    if unwanted is not None:
-                        unwanted.decompose()
-                
-                text = body.get_text()
-                # Clean up excessive whitespace
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                if len(text) > 100:
-                    logger.info(f"Wikipedia ultimate fallback: {len(text)} characters")
-                    return text
-            except Exception as e:
-                logger.error(f"Error in ultimate fallback: {e}")
-        
-        logger.error("All Wikipedia extraction methods failed")
-        return ""
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            
+            parts = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > max_bytes:
+                    # No (or a lying) Content-Length: stop reading rather than index half a document
+                    raise DownloadRejected(f"Page is too large. The limit is {max_bytes // 1024 // 1024} MB.")
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b'', final=True))
+            return response, ''.join(parts)
     
-    def _extract_structured_text(self, element) -> str:
-        """Extract text while preserving paragraph structure"""
-        texts = []
-        
-        # Process paragraphs and headings separately to maintain structure
-        for child in element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div']):
-            text = child.get_text().strip()
-            if len(text) > 20:  # Only keep substantial text blocks
-                texts.append(text)
-        
-        if not texts:
-            # Fallback to all text if no structured elements found
-            text = element.get_text().strip()
-            if text:
-                texts.append(text)
-        
-        return '\n\n'.join(texts)
+    async def _parse(self, url: str, html_content: str, collect_links: bool = False) -> ExtractedContent:
+        if self.parse_executor is None:
+            return self.parser.parse(url, html_content, collect_links)
+        try:
+            return await self.parse_executor.run(parse_page, url, html_content, collect_links)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); start a fresh pool next time
+            logger.error(f"Parse worker pool broke while parsing {url}, parsing inline")
+            self.parse_executor.reset()
+            return self.parser.parse(url, html_content, collect_links)
     
-    def _clean_text(self, text: str) -> str:
-        # Remove navigation elements, menus, and common website clutter
-        text = re.sub(r'(Menu|Navigation|Skip to|Home|About|Contact|Privacy|Terms|Edit|View history)', ' ', text, flags=re.IGNORECASE)
-        
-        # Remove duplicate words that appear consecutively (like "MammoottyMammootty")
-        text = re.sub(r'\b(\w+)\1+\b', r'\1', text)
-        
-        # For non-Wikipedia content, remove table-like data (be more selective for Wikipedia)
-        if 'wikipedia.org' not in text.lower():
-            text = re.sub(r'\b(Born|Died|Age|Occupation|Years active|Spouse|Children|Education|Alma mater)\s*[:\-]?\s*[^\n]*', '', text)
-        
-        # Remove excessive whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep essential punctuation and parentheses
-        text = re.sub(r'[^\w\s.,!?;:()\-\'""\n]', ' ', text)
-        
-        # Remove excessive punctuation
-        text = re.sub(r'\.{3,}', '...', text)
-        text = re.sub(r'[.,!?]{2,}', '.', text)
-        
-        # Remove lines that are too short (likely fragments) - be more lenient
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            line = line.strip()
-            # Be more lenient for line length, especially for Wikipedia
-            if len(line) > 10 and not re.match(r'^[\d\s\-\.]+$', line):  # Skip numeric-only lines
-                cleaned_lines.append(line)
-        
-        # Join lines and remove duplicate sentences
-        text = ' '.join(cleaned_lines)
-        
-        # Split into sentences and remove duplicates (be more lenient)
-        sentences = re.split(r'[.!?]+', text)
-        unique_sentences = []
-        seen = set()
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 10:  # More lenient sentence length
-                # Normalize for duplicate detection
-                normalized = re.sub(r'\s+', ' ', sentence.lower())
-                # Only remove exact duplicates, not similar sentences
-                if normalized not in seen:
-                    seen.add(normalized)
-                    unique_sentences.append(sentence)
-        
-        # Rejoin sentences
-        cleaned_text = '. '.join(unique_sentences)
-        if cleaned_text and not cleaned_text.endswith(('.', '!', '?')):
-            cleaned_text += '.'
-            
-        return cleaned_text.strip()
+    def get_parse_stats(self) -> dict:
+        if self.parse_executor is None:
+            return {"mode": "inline", "backend": self.parser.backend}
+        return {"mode": "process", "backend": self.parser.backend, **self.parse_executor.get_stats()}
+    
+    def get_inflight_stats(self) -> dict:
+        total = self.extractions_started + self.extractions_coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "started": self.extractions_started,
+            "coalesced": self.extractions_coalesced,
+            "coalesce_rate": round(self.extractions_coalesced / total, 3) if total else 0.0
+        }
     
     async def close(self):
-        await self.session.aclose()
\ No newline at end of file
+        await self.session.aclose()
+        if self.parse_executor:
+            self.parse_executor.shutdown(wait=False)
+        if self.page_cache:
+            self.page_cache.shutdown()
\ No newline at end of file
@@ -0,0 +1,220 @@
+import asyncio
+import time
+import zlib
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+import httpx
+from app.core.executor import BoundedExecutor
+from app.models.schemas import ExtractedContent
+from app.services.content_extractor import ContentExtractorService, normalize_url
+from app.services.ai_service import AIService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Links to files we can't extract anyway; skipped without a request
+SKIPPED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.zip', '.gz',
+                      '.tar', '.mp3', '.mp4', '.avi', '.mov', '.css', '.js', '.json', '.xml', '.rss')
+MAX_SITEMAP_FILES = 20
+
+def parse_sitemap(body: bytes) -> Tuple[bool, List[str]]:
+    """(is a sitemap index, <loc> URLs) of a sitemap document"""
+    root = ElementTree.fromstring(body)
+    locations = [element.text.strip() for element in root.iter()
+                 if element.tag.rsplit('}', 1)[-1] == 'loc' and element.text]
+    return root.tag.rsplit('}', 1)[-1] == 'sitemapindex', locations
+
+class SiteCrawler:
+    """Bounded same-domain crawler that streams pages into a session.
+
+    Fetch workers pull URLs from a deduplicated frontier (capped at
+    max_pages, so it stays small) and push extracted pages into a bounded
+    queue drained by one embedder in batches. When embedding falls behind,
+    the fetchers block on that queue, so at most a few batches of page text
+    are held in memory however large the site is.
+    """
+
+    def __init__(self, extractor: ContentExtractorService, ai_service: AIService,
+                 concurrency: int = 8, embed_batch_size: int = 16, sitemap_max_bytes: int = 10 * 1024 * 1024,
+                 sitemap_timeout: float = 60.0):
+        self.extractor = extractor
+        self.ai_service = ai_service
+        self.concurrency = max(1, concurrency)
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.sitemap_max_bytes = sitemap_max_bytes
+        self.sitemap_timeout = sitemap_timeout
+        # A 10 MB sitemap takes a while to parse; keep it off the event loop
+        self.sitemap_executor = BoundedExecutor("sitemap-parse", 1)
+
+    async def crawl(self, job, seed_url: Optional[str] = None, sitemap_url: Optional[str] = None,
+                    max_depth: int = 1, max_pages: int = 100):
+        """Crawl into job.session_id, reporting per-URL progress on the job; closes the job when done"""
+        started_at = time.perf_counter()
+        seen = set()
+        frontier: asyncio.Queue = asyncio.Queue()
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.embed_batch_size * 2)
+        allowed_host = self._site_host(sitemap_url or seed_url)
+
+        def enqueue(url: str, depth: int):
+            key = normalize_url(url)
+            if key in seen or len(seen) >= max_pages:
+                return
+            if self._site_host(url) != allowed_host or urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+                return
+            seen.add(key)
+            job.add_url(url)
+            frontier.put_nowait((url, depth))
+
+        workers: List[asyncio.Task] = []
+        try:
+            if sitemap_url:
+                # Sitemaps list the pages to ingest; their links are not followed
+                max_depth = 0
+                for url in await self._read_sitemap(sitemap_url, max_pages):
+                    enqueue(url, 0)
+            else:
+                enqueue(seed_url, 0)
+
+            workers = [asyncio.create_task(self._fetch_worker(job, frontier, pages, enqueue, max_depth))
+                       for _ in range(self.concurrency)]
+            embedder = asyncio.create_task(self._embed_worker(job, pages))
+            workers.append(embedder)
+
+            # The embedder only exits early if it crashes; don't wait on a frontier that can no longer drain
+            drained = asyncio.create_task(frontier.join())
+            await asyncio.wait([drained, embedder], return_when=asyncio.FIRST_COMPLETED)
+            if not drained.done():
+                drained.cancel()
+                embedder.result()  # Re-raise the embedder's error
+            await pages.put(None)
+            await embedder
+
+            elapsed = time.perf_counter() - started_at
+            logger.info(f"🕸️ Crawl {job.job_id} finished: {len(seen)} pages in {elapsed:.1f}s "
+                        f"({len(seen) / elapsed * 60:.0f} pages/min)")
+        except Exception as e:
+            logger.error(f"Crawl {job.job_id} failed: {e}")
+            job.close(error_message=f"Crawl failed: {str(e)[:200]}")
+        finally:
+            for task in workers:
+                task.cancel()
+            job.close()
+
+    def _site_host(self, url: str) -> str:
+        host = (urlsplit(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    async def _fetch_worker(self, job, frontier: asyncio.Queue, pages: asyncio.Queue, enqueue, max_depth: int):
+        while True:
+            url, depth = await frontier.get()
+            try:
+                result = await self.extractor.extract_url(
+                    url,
+                    on_progress=lambda stage: job.set_stage(url, stage),
+                    collect_links=depth < max_depth
+                )
+                # Expand the frontier before (possibly) blocking on the page queue
+                for link in result.links or []:
+                    enqueue(link, depth + 1)
+
+                if result.success:
+                    job.set_stage(url, "parsed", title=result.title, word_count=result.word_count)
+                    # Backpressure: waits here while the embedder is behind
+                    await pages.put(result.model_copy(update={"links": None}))
+                else:
+                    job.set_stage(url, "failed", title=result.title, error_message=result.error_message)
+            except Exception as e:
+                logger.error(f"Crawl fetch of {url} failed: {e}")
+                job.set_stage(url, "failed", error_message=str(e)[:200])
+            finally:
+                frontier.task_done()
+
+    async def _embed_worker(self, job, pages: asyncio.Queue):
+        while True:
+            first = await pages.get()
+            if first is None:
+                return
+            batch = [first]
+            finished = False
+            # Take whatever else is ready, up to a batch; never wait for a full one
+            while len(batch) < self.embed_batch_size and not pages.empty():
+                page = pages.get_nowait()
+                if page is None:
+                    finished = True
+                    break
+                batch.append(page)
+
+            await self._store_batch(job, batch)
+            if finished:
+                return
+
+    async def _store_batch(self, job, batch: List[ExtractedContent]):
+        try:
+            async with job.store_lock:
+                await self.ai_service.store_context(
+                    job.session_id,
+                    [{"url": page.url, "title": page.title, "content": page.content, "blocks": page.blocks}
+                     for page in batch],
+                    replace=False,
+                    fallback_only=True
+                )
+            for page in batch:
+                job.set_stage(page.url, "embedded")
+        except Exception as e:
+            logger.error(f"Failed to store crawl batch of {len(batch)} pages: {e}")
+            for page in batch:
+                job.set_stage(page.url, "failed", error_message=f"Storing content failed: {str(e)[:100]}")
+
+    async def _read_sitemap(self, sitemap_url: str, max_pages: int) -> List[str]:
+        """Page URLs from a sitemap, following sitemap indexes (bounded number of files)"""
+        urls: List[str] = []
+        allowed_host = self._site_host(sitemap_url)
+        pending = [sitemap_url]
+        visited = set()
+        while pending and len(urls) < max_pages and len(visited) < MAX_SITEMAP_FILES:
+            current = pending.pop(0)
+            if current in visited:
+                continue
+            visited.add(current)
+
+            is_index, locations = await self.sitemap_executor.run(parse_sitemap, await self._fetch_sitemap(current))
+            if is_index:
+                # Only child sitemaps on the same site, like the pages they list
+                pending.extend(location for location in locations if self._site_host(location) == allowed_host)
+            else:
+                urls.extend(locations)
+        return urls[:max_pages]
+
+    async def _fetch_sitemap(self, url: str) -> bytes:
+        try:
+            response, body = await self.extractor.fetch_scheduler.fetch(
+                url,
+                lambda: asyncio.wait_for(self._download_sitemap(url), timeout=self.sitemap_timeout)
+            )
+        except asyncio.TimeoutError:
+            raise ValueError(f"Sitemap {url} did not download within {self.sitemap_timeout:g}s")
+        if response.status_code != 200:
+            raise ValueError(f"Sitemap {url} returned {response.status_code}")
+        if body[:2] == b'\x1f\x8b':
+            # sitemap.xml.gz; bounded so a small file can't expand without limit
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = decompressor.decompress(body, self.sitemap_max_bytes + 1)
+            if len(body) > self.sitemap_max_bytes:
+                raise ValueError(f"Sitemap {url} is larger than {self.sitemap_max_bytes} bytes")
+        return body
+
+    async def _download_sitemap(self, url: str) -> Tuple[httpx.Response, bytes]:
+        parts = []
+        received = 0
+        async with self.extractor.session.stream('GET', url) as response:
+            if response.status_code == 200:
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    if received > self.sitemap_max_bytes:
+                        raise ValueError(f"Sitemap {url} is larger than {self.sitemap_max_bytes} bytes")
+                    parts.append(chunk)
+        return response, b''.join(parts)
+    
+    def close(self):
+        self.sitemap_executor.shutdown(wait=False)
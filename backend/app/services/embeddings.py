@@ -0,0 +1,192 @@
+import asyncio
+import re
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.executor import BoundedExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+Embedding = List[float]
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple, array header)
+_ENTRY_OVERHEAD_BYTES = 200
+
+def normalize_query(text: str) -> str:
+    """Normalize a question for cache lookups (case, whitespace, trailing ?.!).
+
+    Symbols inside the question are kept: "What is C++?" and "What is C?"
+    must not share a key, or one would be answered with the other's vector.
+    """
+    text = _WHITESPACE_RE.sub(' ', text.casefold()).strip()
+    return text.rstrip('?.! ').strip()
+
+class QueryEmbeddingCache:
+    """LRU/TTL cache of query embeddings bounded by entries and by bytes.
+
+    Keys are (model name, normalized question) so repeated voice questions
+    such as "summarize" skip the embedding model entirely. Vectors are stored
+    as float32 arrays to keep the byte accounting honest and compact.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, array, int]]" = OrderedDict()
+        self.current_bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, model_name: str, query: str) -> Optional[Embedding]:
+        key = (model_name, normalize_query(query))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, vector, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector.tolist()
+
+    def put(self, model_name: str, query: str, embedding: Embedding):
+        key = (model_name, normalize_query(query))
+        vector = array('f', embedding)
+        size = (len(vector) * vector.itemsize + sys.getsizeof(key[0]) + sys.getsizeof(key[1])
+                + _ENTRY_OVERHEAD_BYTES)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, vector, size)
+        self.current_bytes += size
+
+        while self._entries and (self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class EmbeddingBatcher:
+    """Micro-batches concurrent query embeddings into one vectorized call.
+
+    Callers await ``embed(text)``; texts are collected for up to
+    ``max_wait_ms`` or until ``max_batch_size`` items are pending, embedded
+    together on the executor, and the vectors are fanned back out.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[Embedding]], executor: BoundedExecutor,
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.embed_fn = embed_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.max_observed_batch = 0
+        self.failed_batches = 0
+
+    async def embed(self, text: str) -> Embedding:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the batch task isn't garbage collected mid-flight
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Skip callers that were cancelled while waiting and embed each distinct text once
+        live = [(text, future) for text, future in batch if not future.done()]
+        if not live:
+            return
+        texts = list(dict.fromkeys(text for text, _ in live))
+
+        self.batches += 1
+        self.items += len(live)
+        self.max_observed_batch = max(self.max_observed_batch, len(texts))
+
+        try:
+            vectors = await self.executor.run(self.embed_fn, texts)
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Embedding batch of {len(texts)} failed: {e}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in live:
+            if not future.done():
+                future.set_result(list(by_text[text]))
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_observed_batch": self.max_observed_batch,
+            "failed_batches": self.failed_batches,
+            "pending": len(self._pending)
+        }
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Responses that mean "slow down / try again later"
+RETRYABLE_STATUSES = frozenset([429, 502, 503, 504])
+
+class TokenBucket:
+    """Classic token bucket: `rate` requests per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the time waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+class HostState:
+    def __init__(self, per_host_concurrency: int, rate: float, burst: int):
+        self.semaphore = asyncio.Semaphore(per_host_concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.blocked_until = 0.0  # Set from Retry-After; pauses every request to the host
+        self.active = 0
+
+        # Metrics
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_rate_wait = 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "active": self.active,
+            "error_rate": round(self.errors / self.requests, 3) if self.requests else 0.0,
+            "avg_latency_ms": round(self.total_latency / self.requests * 1000, 2) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 2),
+            "avg_rate_wait_ms": round(self.total_rate_wait / self.requests * 1000, 2) if self.requests else 0.0
+        }
+
+class FetchScheduler:
+    """Politeness layer for outbound page fetches.
+
+    Every fetch takes a token from the host's bucket, a per-host slot and a
+    global concurrency slot, so concurrent /links calls cannot hammer a single
+    origin. 429/5xx responses are retried with jittered exponential backoff,
+    honouring Retry-After (which also pauses other requests to that host).
+    """
+
+    def __init__(self, max_concurrency: int = 20, per_host_concurrency: int = 4,
+                 per_host_rate: float = 5.0, per_host_burst: int = 5, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0, max_hosts: int = 1000):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_hosts = max_hosts
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_host(self, url: str) -> HostState:
+        host = (urlsplit(url).hostname or "").lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(self.per_host_concurrency, self.per_host_rate, self.per_host_burst)
+            self._hosts[host] = state
+            self._prune_hosts()
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _prune_hosts(self):
+        # Forget the least recently used idle hosts so the table stays bounded
+        for host in list(self._hosts):
+            if len(self._hosts) <= self.max_hosts:
+                return
+            if self._hosts[host].active == 0:
+                del self._hosts[host]
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None when Retry-After asks for longer than we wait"""
+        retry_after = self._parse_retry_after(response.headers.get('retry-after')) if response is not None else None
+        if retry_after is not None:
+            if retry_after > self.backoff_max:
+                return None
+            return retry_after + random.uniform(0, self.backoff_base)
+        # Full jitter exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def fetch(self, url: str, send: Callable[[], Awaitable[Tuple[httpx.Response, T]]]) -> Tuple[httpx.Response, T]:
+        """Run `send` (which performs the request and returns (response, payload)) under the limits, retrying throttled responses"""
+        state = self._get_host(url)
+        attempt = 0
+        while True:
+            response, payload = await self._attempt(state, send)
+            if response.status_code not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                return response, payload
+
+            delay = self._retry_delay(attempt, response)
+            if delay is None:
+                logger.warning(f"Not retrying {url}: Retry-After exceeds {self.backoff_max}s")
+                return response, payload
+
+            state.throttled += 1
+            state.retries += 1
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            attempt += 1
+            logger.info(f"⏳ {url} returned {response.status_code}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+
+    async def _attempt(self, state: HostState, send: Callable[[], Awaitable[Tuple[httpx.Response, T]]]) -> Tuple[httpx.Response, T]:
+        # Honour a Retry-After pause set by any request to this host, and its
+        # rate limit, before taking any slot: a throttled host must not hold
+        # slots that requests to other hosts are waiting for
+        pause = state.blocked_until - time.monotonic()
+        while pause > 0:
+            await asyncio.sleep(pause)
+            pause = state.blocked_until - time.monotonic()
+        state.total_rate_wait += await state.bucket.acquire()
+
+        # Host slot first, so requests queued behind a busy host never sit on a global slot
+        async with state.semaphore:
+            async with self._get_semaphore():
+                state.active += 1
+                state.requests += 1
+                started_at = time.perf_counter()
+                try:
+                    response, payload = await send()
+                    if response.status_code >= 400:
+                        state.errors += 1
+                    return response, payload
+                except BaseException:
+                    state.errors += 1
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - started_at
+                    state.total_latency += elapsed
+                    state.max_latency = max(state.max_latency, elapsed)
+                    state.active -= 1
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_host_concurrency": self.per_host_concurrency,
+            "per_host_rate": self.per_host_rate,
+            "hosts": {host: state.get_stats() for host, state in self._hosts.items()}
+        }
@@ -1,20 +1,32 @@
-import httpx
 import asyncio
-from typing import Optional, List, Dict, Tuple
+from typing import AsyncIterator, Optional, List, Dict, Tuple
 from app.models.schemas import AnswerResponse
 from app.core.config import settings
+from app.core.http import create_http_client
 import logging
 import json
 import re
 
 logger = logging.getLogger(__name__)
 
+# Confidence of the keyword-based fallback answer (no model involved)
+KEYWORD_ANSWER_CONFIDENCE = 0.6
+
 class FreeAIService:
     def __init__(self):
-        self.session = httpx.AsyncClient(timeout=20.0)  # Reasonable timeout for fast responses
+        self.session = create_http_client(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            timeout=20.0  # Reasonable timeout for fast responses
+        )
         
-    async def answer_question(self, question: str, context: List[Dict], session_id: Optional[str] = None) -> AnswerResponse:
-        """Answer questions using free AI alternatives"""
+    async def answer_question(self, question: str, context: List[Dict], session_id: Optional[str] = None,
+                              use_ollama: bool = True, origin: Optional[Dict] = None) -> AnswerResponse:
+        """Answer questions using free AI alternatives
+        
+        origin, if given, receives "cacheable": True for a model's answer,
+        False for the keyword fallback (not worth reusing once a model is back).
+        """
+        origin = origin if origin is not None else {}
         
         if not session_id:
             import uuid
@@ -25,12 +37,13 @@ class FreeAIService:
         sources = [item["url"] for item in context]
         
         # Method 1: Try Ollama (if running locally)
-        if settings.USE_OLLAMA:
+        if settings.USE_OLLAMA and use_ollama:
             logger.info(f"🔥 Attempting Ollama with model: {settings.OLLAMA_MODEL}")
             try:
                 answer = await self._answer_with_ollama(question, context)
                 if answer:
                     logger.info(f"🎉 Ollama SUCCESS! Generated {len(answer)} character response")
+                    origin["cacheable"] = True
                     return AnswerResponse(
                         answer=answer,
                         sources=sources,
@@ -41,7 +54,7 @@ class FreeAIService:
                     logger.warning("❌ Ollama returned empty response")
             except Exception as e:
                 logger.error(f"❌ Ollama failed with error: {e}")
-        else:
+        elif not settings.USE_OLLAMA:
             logger.info("⚠️ Ollama is disabled in settings")
         
         # Method 2: Try HuggingFace Inference API (free tier)
@@ -51,6 +64,7 @@ class FreeAIService:
                 answer = await self._answer_with_huggingface(question, context)
                 if answer:
                     logger.info(f"🎉 HuggingFace SUCCESS! Generated {len(answer)} character response")
+                    origin["cacheable"] = True
                     return AnswerResponse(
                         answer=answer,
                         sources=sources,
@@ -67,14 +81,76 @@ class FreeAIService:
         # Method 3: Simple keyword-based answering (always works)
         logger.info("📝 Falling back to keyword-based analysis")
         answer = self._simple_keyword_answer(question, context)
+        origin["cacheable"] = False
         
         return AnswerResponse(
             answer=answer,
             sources=sources,
             session_id=session_id,
-            confidence=0.6
+            confidence=KEYWORD_ANSWER_CONFIDENCE
         )
     
+    async def stream_answer(self, question: str, context: List[Dict], session_id: Optional[str] = None,
+                            origin: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Answer as text deltas: streamed from Ollama when it is running, otherwise the whole answer at once.
+        
+        origin, if given, receives the answer's "confidence" and "cacheable" (as answer_question reports them).
+        """
+        origin = origin if origin is not None else {}
+        if settings.USE_OLLAMA:
+            emitted = False
+            try:
+                async for text in self._stream_with_ollama(question, context):
+                    emitted = True
+                    yield text
+            except Exception as e:
+                if emitted:
+                    raise
+                logger.error(f"❌ Ollama stream failed with error: {e}")
+            if emitted:
+                origin.update(confidence=0.8, cacheable=True)
+                return
+        
+        # Non-streaming methods (HuggingFace, keyword analysis); Ollama already failed, so skip it
+        result = await self.answer_question(question, context, session_id, use_ollama=False, origin=origin)
+        origin["confidence"] = result.confidence
+        yield result.answer
+    
+    async def _stream_with_ollama(self, question: str, context: List[Dict]) -> AsyncIterator[str]:
+        """Relay Ollama's NDJSON stream ("stream": true), one chunk per generated token"""
+        logger.info(f"🌐 Streaming from Ollama at {settings.OLLAMA_BASE_URL}")
+        payload = {
+            "model": settings.OLLAMA_MODEL,
+            "prompt": self._ollama_prompt(question, context),
+            "stream": True
+        }
+        
+        async with self.session.stream('POST', f"{settings.OLLAMA_BASE_URL}/api/generate", json=payload) as response:
+            if response.status_code != 200:
+                raise ValueError(f"Ollama returned {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise ValueError(message["error"])
+                if message.get("response"):
+                    yield message["response"]
+                if message.get("done"):
+                    return
+    
+    def _ollama_prompt(self, question: str, context: List[Dict]) -> str:
+        context_text = self._prepare_context(context)
+        logger.info(f"📄 Context prepared: {len(context_text)} characters")
+        
+        return f"""Based on this information, answer the question in natural language:
+
+{context_text}
+
+Question: {question}
+
+Answer briefly and naturally:"""
+    
     async def _answer_with_ollama(self, question: str, context: List[Dict]) -> Optional[str]:
         """Try to answer using local Ollama installation"""
         try:
@@ -88,20 +164,9 @@ class FreeAIService:
                 logger.error(f"🚫 Cannot connect to Ollama: {conn_error}")
                 return None
                 
-            context_text = self._prepare_context(context)
-            logger.info(f"📄 Context prepared: {len(context_text)} characters")
-            
-            prompt = f"""Based on this information, answer the question in natural language:
-
-{context_text}
-
-Question: {question}
-
-Answer briefly and naturally:"""
-
             payload = {
                 "model": settings.OLLAMA_MODEL,
-                "prompt": prompt,
+                "prompt": self._ollama_prompt(question, context),
                 "stream": False
             }
             
@@ -0,0 +1,236 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.models.schemas import IngestionJobStatus, UrlProgress
+from app.services.content_extractor import ContentExtractorService
+from app.services.ai_service import AIService
+from app.services.crawler import SiteCrawler
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-URL stages, in order; "failed" can follow any of them
+STAGES = ("queued", "fetched", "parsed", "embedded")
+
+class IngestionJob:
+    def __init__(self, job_id: str, session_id: str, urls: List[str], open_ended: bool = False):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.progress: Dict[str, UrlProgress] = {url: UrlProgress(url=url, stage="queued") for url in urls}
+        # Crawl jobs keep discovering URLs until close() is called
+        self.discovering = open_ended
+        self.error_message: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Serializes appends so concurrent URLs of one job never race on the session's stored context
+        self.store_lock = asyncio.Lock()
+
+    @property
+    def status(self) -> str:
+        if self.discovering:
+            return "running"
+        stages = [item.stage for item in self.progress.values()]
+        if all(stage in ("embedded", "failed") for stage in stages):
+            return "failed" if all(stage == "failed" for stage in stages) else "completed"
+        if all(stage == "queued" for stage in stages):
+            return "queued"
+        return "running"
+
+    def set_stage(self, url: str, stage: str, **fields):
+        item = self.progress[url]
+        # "embedded" and "failed" are final, and other stages only move forward: a late
+        # "fetched" from a shared extraction must not undo "parsed" or a failure
+        if item.stage in ("embedded", "failed"):
+            return
+        if stage != "failed" and STAGES.index(stage) <= STAGES.index(item.stage):
+            return
+        self.progress[url] = item.model_copy(update={"stage": stage, **fields})
+        self._check_finished()
+
+    def add_url(self, url: str):
+        self.progress.setdefault(url, UrlProgress(url=url, stage="queued"))
+
+    def close(self, error_message: Optional[str] = None):
+        """No more URLs will be added"""
+        self.discovering = False
+        self.error_message = self.error_message or error_message
+        self._check_finished()
+
+    def _check_finished(self):
+        if self.finished_at is None and self.status in ("completed", "failed"):
+            self.finished_at = time.time()
+
+    def to_status(self) -> IngestionJobStatus:
+        items = list(self.progress.values())
+        embedded = sum(1 for item in items if item.stage == "embedded")
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        return IngestionJobStatus(
+            job_id=self.job_id,
+            session_id=self.session_id,
+            status=self.status,
+            total=len(items),
+            embedded=embedded,
+            failed=sum(1 for item in items if item.stage == "failed"),
+            urls=items,
+            error_message=self.error_message,
+            pages_per_minute=round(embedded / elapsed * 60, 1) if elapsed > 0 else None,
+            created_at=self.created_at,
+            finished_at=self.finished_at
+        )
+
+class IngestionJobManager:
+    """Background queue that ingests /links submissions without holding the request open.
+
+    Each URL of a job is a separate work item, so a slow site only occupies
+    one worker and sources become searchable one by one as they are embedded
+    (appended to the session rather than replacing it).
+    """
+
+    def __init__(self, extractor: ContentExtractorService, ai_service: AIService,
+                 workers: int = 4, max_queue_size: int = 1000, max_jobs: int = 1000,
+                 crawler: Optional[SiteCrawler] = None, max_concurrent_crawls: int = 2, max_crawl_pages: int = 1000):
+        self.extractor = extractor
+        self.ai_service = ai_service
+        self.crawler = crawler or SiteCrawler(extractor, ai_service)
+        self.max_concurrent_crawls = max(1, max_concurrent_crawls)
+        self.max_crawl_pages = max_crawl_pages
+        self._crawl_semaphore: Optional[asyncio.Semaphore] = None
+        self._crawl_tasks: set = set()
+        self.worker_count = max(1, workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        # Metrics
+        self.jobs_submitted = 0
+        self.jobs_rejected = 0
+        self.crawls_submitted = 0
+        self.urls_embedded = 0
+        self.urls_failed = 0
+
+    def start(self):
+        if not self._workers:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._crawl_semaphore = asyncio.Semaphore(self.max_concurrent_crawls)
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+
+    async def stop(self):
+        tasks = self._workers + list(self._crawl_tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self.crawler.close()
+
+    def submit(self, urls: List[str], session_id: Optional[str] = None) -> IngestionJob:
+        """Queue a job; raises RuntimeError when the queue cannot take every URL"""
+        if self._queue is None:
+            raise RuntimeError("Ingestion workers are not running")
+        urls = list(dict.fromkeys(urls))
+        if self._queue.qsize() + len(urls) > self.max_queue_size:
+            self.jobs_rejected += 1
+            raise RuntimeError("Ingestion queue is full, please retry shortly")
+
+        job = IngestionJob(str(uuid.uuid4()), session_id or str(uuid.uuid4())[:8], urls)
+        self.jobs[job.job_id] = job
+        self._prune_jobs()
+        self.jobs_submitted += 1
+        # Known to the session sweeper from the start, even before anything is stored
+        self.ai_service.mark_session_active(job.session_id)
+
+        for url in urls:
+            self._queue.put_nowait((job, url))
+        logger.info(f"📥 Queued ingestion job {job.job_id} for session {job.session_id} ({len(urls)} URLs)")
+        return job
+
+    def submit_crawl(self, seed_url: Optional[str] = None, sitemap_url: Optional[str] = None,
+                     max_depth: int = 1, max_pages: int = 100) -> IngestionJob:
+        """Start a crawl job into a new session; crawls beyond the concurrency limit wait their turn"""
+        if self._crawl_semaphore is None:
+            raise RuntimeError("Ingestion workers are not running")
+
+        job = IngestionJob(str(uuid.uuid4()), str(uuid.uuid4())[:8], [], open_ended=True)
+        self.jobs[job.job_id] = job
+        self._prune_jobs()
+        self.crawls_submitted += 1
+        self.ai_service.mark_session_active(job.session_id)
+
+        task = asyncio.create_task(self._run_crawl(job, seed_url, sitemap_url, max_depth,
+                                                   min(max_pages, self.max_crawl_pages)))
+        self._crawl_tasks.add(task)
+        task.add_done_callback(self._crawl_tasks.discard)
+        logger.info(f"🕸️ Queued crawl job {job.job_id} for session {job.session_id} ({sitemap_url or seed_url})")
+        return job
+    
+    async def _run_crawl(self, job: IngestionJob, seed_url: Optional[str], sitemap_url: Optional[str],
+                         max_depth: int, max_pages: int):
+        async with self._crawl_semaphore:
+            await self.crawler.crawl(job, seed_url=seed_url, sitemap_url=sitemap_url,
+                                     max_depth=max_depth, max_pages=max_pages)
+        self.urls_embedded += sum(1 for item in job.progress.values() if item.stage == "embedded")
+        self.urls_failed += sum(1 for item in job.progress.values() if item.stage == "failed")
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def _prune_jobs(self):
+        # Forget the oldest finished jobs once the history is full
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                return
+            if self.jobs[job_id].finished_at is not None:
+                del self.jobs[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job, url = await self._queue.get()
+            try:
+                await self._process(job, url)
+            except Exception as e:
+                logger.error(f"Ingestion of {url} (job {job.job_id}) failed: {e}")
+                job.set_stage(url, "failed", error_message=str(e)[:200])
+                self.urls_failed += 1
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: IngestionJob, url: str):
+        result = await self.extractor.extract_url(url, on_progress=lambda stage: job.set_stage(url, stage))
+        if not result.success:
+            job.set_stage(url, "failed", title=result.title, error_message=result.error_message)
+            self.urls_failed += 1
+            return
+
+        job.set_stage(url, "parsed", title=result.title, word_count=result.word_count)
+        async with job.store_lock:
+            await self.ai_service.store_context(
+                job.session_id,
+                [{"url": result.url, "title": result.title, "content": result.content, "blocks": result.blocks}],
+                replace=False
+            )
+        job.set_stage(url, "embedded")
+        self.urls_embedded += 1
+        logger.info(f"✅ Job {job.job_id}: {url} is searchable in session {job.session_id}")
+
+    def get_stats(self) -> Dict:
+        statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "jobs_tracked": len(self.jobs),
+            "jobs_running": statuses.count("running") + statuses.count("queued"),
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_rejected": self.jobs_rejected,
+            "crawls_submitted": self.crawls_submitted,
+            "crawls_running": len(self._crawl_tasks),
+            "urls_embedded": self.urls_embedded,
+            "urls_failed": self.urls_failed
+        }
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.core.executor import BoundedExecutor
+from app.models.schemas import ExtractedContent
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CachedPage:
+    def __init__(self, content: ExtractedContent, etag: Optional[str], last_modified: Optional[str]):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for an HTTP conditional request against the cached validators"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class PageCache:
+    """Persistent on-disk cache of extracted pages keyed by URL.
+
+    Each entry stores the cleaned ExtractedContent together with the
+    response's ETag/Last-Modified so later extractions can revalidate with a
+    conditional GET and skip parsing on a 304. The cache is bounded in bytes
+    and evicts least recently used entries. Async callers use aget/aput,
+    which keep the JSON (de)serialization and file I/O off the event loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self.current_bytes = 0
+        self.io_executor = BoundedExecutor("page-cache", 2)
+
+        # Metrics
+        self.lookups = 0
+        self.misses = 0
+        self.revalidated = 0  # 304 Not Modified - served from cache
+        self.stale = 0  # Cached but the page changed
+        self.stores = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+            except OSError:
+                continue
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.current_bytes += size
+        self._evict()
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        key = self._key(url)
+        with self._lock:
+            self.lookups += 1
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('url') != url:
+                raise ValueError("URL mismatch")
+            os.utime(self._path(key))  # Keeps LRU order across restarts
+            return CachedPage(ExtractedContent(**data['content']), data.get('etag'), data.get('last_modified'))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable page cache entry for {url}: {e}")
+            self._remove(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+    def put(self, url: str, content: ExtractedContent, etag: Optional[str], last_modified: Optional[str]):
+        """Store a successfully extracted page; pages without validators are not cached"""
+        if not etag and not last_modified:
+            return
+
+        key = self._key(url)
+        payload = json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "content": {**content.model_dump(), "links": content.links, "blocks": content.blocks}
+        })
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        try:
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write page cache entry for {url}: {e}")
+            return
+
+        with self._lock:
+            self.current_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self.stores += 1
+        self._evict()
+
+    async def aget(self, url: str) -> Optional[CachedPage]:
+        """Run get on the cache's I/O threads"""
+        return await self.io_executor.run(self.get, url)
+
+    async def aput(self, url: str, content: ExtractedContent, etag: Optional[str], last_modified: Optional[str]):
+        """Run put on the cache's I/O threads"""
+        await self.io_executor.run(self.put, url, content, etag, last_modified)
+
+    def record_revalidated(self):
+        with self._lock:
+            self.revalidated += 1
+
+    def record_stale(self):
+        with self._lock:
+            self.stale += 1
+
+    def _remove(self, key: str):
+        with self._lock:
+            self.current_bytes -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self.current_bytes <= self.max_bytes or not self._index:
+                    return
+                key = next(iter(self._index))
+                self.evictions += 1
+            self._remove(key)
+
+    def get_stats(self) -> Dict:
+        return {
+            "entries": len(self._index),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stale": self.stale,
+            "hit_rate": round(self.revalidated / self.lookups, 3) if self.lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "io": self.io_executor.get_stats()
+        }
+
+    def shutdown(self):
+        self.io_executor.shutdown(wait=False)
@@ -0,0 +1,507 @@
+from bs4 import BeautifulSoup, Tag
+from typing import List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from app.models.schemas import ExtractedContent
+from app.core.config import settings
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional faster tree builder for BeautifulSoup
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+PARSER_BACKENDS = ("auto", "lxml", "html.parser")
+
+# Elements and class/id patterns pruned before looking for main content
+NOISE_TAGS = frozenset(['script', 'style', 'nav', 'footer', 'header', 'aside', 'menu',
+                        'noscript', 'iframe', 'object', 'embed', 'form', 'input', 'button'])
+CLUTTER_RE = re.compile(r'(nav|menu|sidebar|footer|header|ad|advertisement|social|share|comment|related)', re.I)
+
+# Crawl link discovery
+MAX_LINKS_PER_PAGE = 1000
+SKIPPED_LINK_PREFIXES = ('#', 'mailto:', 'javascript:', 'tel:', 'data:')
+
+# Text cleaning
+NAV_CLUTTER_RE = re.compile(r'(Menu|Navigation|Skip to|Home|About|Contact|Privacy|Terms|Edit|View history)', re.IGNORECASE)
+# Only a word whose first character recurs can be a repeated unit; the rest skip the Python callback
+REPEAT_CANDIDATE_RE = re.compile(r'\b(\w)\w*?\1\w*')
+INFOBOX_FIELD_RE = re.compile(r'\b(Born|Died|Age|Occupation|Years active|Spouse|Children|Education|Alma mater)\s*[:\-]?\s*[^\n]*')
+WHITESPACE_RE = re.compile(r'\s+')
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s.,!?;:()\-\'""\n]')
+PUNCTUATION_RUN_RE = re.compile(r'[.,!?]{2,}')
+NUMERIC_ONLY_RE = re.compile(r'[\d\s\-\.]+')
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+BLOCK_SPLIT_RE = re.compile(r'\n\s*\n')
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+
+# Main content selectors after article / main / [role="main"], in order of preference
+CONTENT_CLASS_PRIORITY = {
+    name: rank for rank, name in enumerate(
+        ['content', 'post-content', 'entry-content', 'article-content',
+         'story-body', 'post-body', 'article-text'], start=3)
+}
+FALLBACK_BACKEND = "html.parser"
+
+def resolve_parser_backend(name: str) -> str:
+    """Map a configured backend name to an installed BeautifulSoup tree builder"""
+    name = (name or FALLBACK_BACKEND).lower()
+    if name not in PARSER_BACKENDS:
+        logger.warning(f"Unknown HTML parser backend '{name}', using {FALLBACK_BACKEND}")
+        name = FALLBACK_BACKEND
+    if name == "auto":
+        return "lxml" if LXML_AVAILABLE else FALLBACK_BACKEND
+    if name == "lxml" and not LXML_AVAILABLE:
+        logger.warning("lxml is not installed, falling back to html.parser")
+        return FALLBACK_BACKEND
+    return name
+
+class PageParser:
+    """Turns raw HTML into cleaned ExtractedContent.
+
+    Pure CPU work with no I/O, so it can run inside a process pool worker
+    without blocking the event loop. The tree builder is chosen by
+    HTML_PARSER_BACKEND; all extraction works on the BeautifulSoup API, so
+    every backend feeds the same extraction code.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = resolve_parser_backend(backend or settings.HTML_PARSER_BACKEND)
+
+    def _make_soup(self, html_content: str) -> BeautifulSoup:
+        if self.backend != FALLBACK_BACKEND:
+            try:
+                return BeautifulSoup(html_content, self.backend)
+            except Exception as e:
+                logger.warning(f"{self.backend} failed to parse page, retrying with {FALLBACK_BACKEND}: {e}")
+        return BeautifulSoup(html_content, FALLBACK_BACKEND)
+
+    def parse(self, url: str, html_content: str, collect_links: bool = False) -> ExtractedContent:
+        soup = self._make_soup(html_content)
+        if soup is None:
+            logger.warning(f"Failed to parse HTML from {url}")
+            return ExtractedContent(
+                url=url, title="", content="", success=False,
+                error_message="Failed to parse HTML content", word_count=0
+            )
+        
+        # Links come from the full page, before navigation and clutter are pruned
+        links = self._extract_links(soup, url) if collect_links else None
+        
+        # Remove script and style elements with null checks
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            if script is not None:
+                script.decompose()
+        
+        # Try to find the main content
+        title = self._extract_title(soup)
+        content, outline = self._extract_content_parts(soup, url)
+        
+        # Be much more lenient with content length requirements
+        if not content or len(content.strip()) < 50:  # Reduced from 100 to 50
+            logger.warning(f"Insufficient content from {url}: {len(content.strip()) if content else 0} chars")
+            return ExtractedContent(
+                url=url,
+                title=title,
+                content="",
+                success=False,
+                error_message="This page doesn't contain enough readable content. It might be a JavaScript-heavy site or require authentication.",
+                word_count=0,
+                links=links
+            )
+        
+        logger.info(f"Raw content extracted: {len(content)} chars")
+        
+        cleaned_content = self._clean_text(content)
+        word_count = len(cleaned_content.split())
+        
+        logger.info(f"✅ Final content: {len(cleaned_content)} chars, {word_count} words")
+        
+        # Make sure we still have content after cleaning
+        if len(cleaned_content.strip()) < 20:
+            logger.warning(f"Content lost during cleaning. Original: {len(content)}, Cleaned: {len(cleaned_content)}")
+            # Use original content if cleaning removed too much
+            cleaned_content = content[:2000]  # Use first 2000 chars of original content
+            word_count = len(cleaned_content.split())
+            logger.info(f"Using original content: {len(cleaned_content)} chars")
+        
+        return ExtractedContent(
+            url=url,
+            title=title,
+            content=cleaned_content,
+            success=True,
+            word_count=word_count,
+            links=links,
+            blocks=self._split_blocks(outline, keep_infobox='wikipedia.org' in content.lower())
+        )
+    
+    def _split_blocks(self, content: str, keep_infobox: bool = False) -> List[str]:
+        """Cleaned headings and paragraphs of the content, without container blocks their children repeat.
+        
+        Each block gets the same cleaning as the page text except the
+        newline-removing whitespace collapse, the fragment check and the
+        sentence rejoin, which would drop or rewrite the short headings the
+        chunker uses as section breaks. Structured extraction emits a
+        wrapper <div> followed by the <p>s inside it; a block is dropped
+        when the blocks nested in it (those it contains as substrings)
+        cover most of its text.
+        """
+        blocks = []
+        covered = []
+        ancestors = []  # Indexes of the blocks that contain the current one
+        for raw in BLOCK_SPLIT_RE.split(content):
+            text = WHITESPACE_RE.sub(' ', self._clean_steps(raw, keep_infobox, collapse_whitespace=False)).strip()
+            if not text or NUMERIC_ONLY_RE.fullmatch(text):
+                continue
+            while ancestors and text not in blocks[ancestors[-1]]:
+                ancestors.pop()
+            if ancestors:
+                if text == blocks[ancestors[-1]]:
+                    continue
+                covered[ancestors[-1]] += len(text)
+            blocks.append(text)
+            covered.append(0)
+            ancestors.append(len(blocks) - 1)
+        return [block for block, length in zip(blocks, covered) if length < 0.8 * len(block)]
+    
+    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+        """Absolute http(s) links on the page, fragments removed, in document order"""
+        links = []
+        seen = set()
+        for anchor in soup.find_all('a', href=True):
+            href = anchor['href'].strip()
+            if not href or href.lower().startswith(SKIPPED_LINK_PREFIXES):
+                continue
+            link = urldefrag(urljoin(base_url, href))[0]
+            if urlsplit(link).scheme not in ('http', 'https') or link in seen:
+                continue
+            seen.add(link)
+            links.append(link)
+            if len(links) >= MAX_LINKS_PER_PAGE:
+                break
+        return links
+    
+    def _extract_title(self, soup: BeautifulSoup) -> str:
+        # Try different title sources
+        title_tag = soup.find('title')
+        if title_tag:
+            return title_tag.get_text().strip()
+        
+        h1_tag = soup.find('h1')
+        if h1_tag:
+            return h1_tag.get_text().strip()
+        
+        return "Untitled"
+    
+    def _extract_content(self, soup: BeautifulSoup, url: str = "") -> str:
+        return self._extract_content_parts(soup, url)[0]
+    
+    def _extract_content_parts(self, soup: BeautifulSoup, url: str = "") -> Tuple[str, str]:
+        """The page's main text, and the same text with short headings kept (the source of its blocks)"""
+        if self._is_wikipedia(soup, url):
+            logger.info("Detected Wikipedia page - using specialized extraction")
+            content = self._extract_wikipedia_content(soup)
+            if content and len(content.strip()) > 50:
+                logger.info(f"Wikipedia extraction successful: {len(content)} chars")
+                return content, content
+            else:
+                logger.warning("Wikipedia specialized extraction failed, trying generic extraction")
+        
+        drop, candidates, paragraphs = self._classify_nodes(soup)
+        
+        # Prune only after the walk so the traversal never sees a mutated tree
+        for node in drop:
+            if not node.decomposed:
+                node.decompose()
+        
+        # Try main content areas in order of preference
+        for priority in sorted(candidates):
+            extracted_content = []
+            outlines = []
+            for element in candidates[priority]:
+                # Extract text with better structure preservation
+                text, outline = self._extract_structured_parts(element)
+                if text and len(text.strip()) > 100:
+                    extracted_content.append(text)
+                    outlines.append(outline)
+            
+            if extracted_content:
+                return '\n\n'.join(extracted_content), '\n\n'.join(outlines)
+        
+        # Fallback: Get text from paragraphs in body
+        body = soup.find('body')
+        if body:
+            if len(paragraphs) > 3:  # Ensure we have substantial paragraph content
+                paragraph_texts = []
+                for p in paragraphs:
+                    text = p.get_text().strip()
+                    if len(text) > 30:  # Only keep substantial paragraphs
+                        paragraph_texts.append(text)
+                
+                if paragraph_texts:
+                    content = '\n\n'.join(paragraph_texts)
+                    return content, content
+            
+            # Last resort: body text
+            content = body.get_text()
+            return content, content
+        
+        content = soup.get_text()
+        return content, content
+    
+    def _is_wikipedia(self, soup: BeautifulSoup, url: str) -> bool:
+        """Detect MediaWiki pages from the URL or <head> without scanning the body"""
+        if 'wikipedia.org' in url.lower():
+            return True
+        
+        head = soup.head
+        if head is None:
+            return False
+        generator = head.find('meta', attrs={'name': 'generator'})
+        if generator and str(generator.get('content', '')).startswith('MediaWiki'):
+            return True
+        canonical = head.find('link', attrs={'rel': 'canonical'})
+        return bool(canonical and 'wikipedia.org' in str(canonical.get('href', '')))
+    
+    def _classify_nodes(self, soup: BeautifulSoup):
+        """Single walk sorting elements into noise to drop, content candidates and body paragraphs.
+        
+        Dropped subtrees are not descended into, so nothing inside them
+        becomes a candidate or paragraph.
+        """
+        drop = []
+        candidates = {}
+        paragraphs = []
+        
+        stack = [(child, False) for child in reversed(soup.contents) if isinstance(child, Tag)]
+        while stack:
+            node, in_body = stack.pop()
+            in_body = in_body or node.name == 'body'
+            
+            classes = node.get('class') or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            node_id = node.get('id')
+            if (node.name in NOISE_TAGS
+                    or any(CLUTTER_RE.search(c) for c in classes)
+                    or (isinstance(node_id, str) and CLUTTER_RE.search(node_id))):
+                drop.append(node)
+                continue
+            
+            priority = self._candidate_priority(node, classes)
+            if priority is not None:
+                candidates.setdefault(priority, []).append(node)
+            if node.name == 'p' and in_body:
+                paragraphs.append(node)
+            
+            # Reversed so children are visited in document order
+            stack.extend((child, in_body) for child in reversed(node.contents) if isinstance(child, Tag))
+        
+        return drop, candidates, paragraphs
+    
+    def _candidate_priority(self, node: Tag, classes) -> Optional[int]:
+        """Best-ranked main content selector this element matches, if any"""
+        if node.name == 'article':
+            return 0
+        if node.name == 'main':
+            return 1
+        if node.get('role') == 'main':
+            return 2
+        ranks = [CONTENT_CLASS_PRIORITY[c] for c in classes if c in CONTENT_CLASS_PRIORITY]
+        return min(ranks) if ranks else None
+    
+    def _extract_wikipedia_content(self, soup: BeautifulSoup) -> str:
+        """Simplified and robust extraction for Wikipedia pages"""
+        logger.info("Extracting Wikipedia content with simplified method")
+        
+        # Simple approach: get all paragraphs from the page
+        all_paragraphs = soup.find_all('p')
+        logger.info(f"Found {len(all_paragraphs)} total paragraphs")
+        
+        paragraph_texts = []
+        
+        for p in all_paragraphs:
+            if p is None:
+                continue
+                
+            # Remove reference markers and edit links
+            try:
+                unwanted_elements = p.find_all(['sup', 'a'])
+                for unwanted in unwanted_elements:
+                    if unwanted is None:
+                        continue
+                        
+                    # Safe null checks for attributes
+                    try:
+                        unwanted_class = unwanted.get('class') if hasattr(unwanted, 'get') else None
+                        unwanted_title = unwanted.get('title') if hasattr(unwanted, 'get') else None
+                        
+                        if unwanted_class and 'reference' in ' '.join(unwanted_class):
+                            unwanted.decompose()
+                        elif unwanted_title and 'edit' in unwanted_title.lower():
+                            unwanted.decompose()
+                    except Exception:
+                        # Silently skip problematic elements
+                        continue
+            except Exception as e:
+                logger.warning(f"Error processing paragraph unwanted elements: {e}")
+                continue
+            
+            try:
+                text = p.get_text().strip() if p else ""
+            except Exception as e:
+                logger.warning(f"Error extracting text from paragraph: {e}")
+                continue
+            
+            # Very lenient filtering - keep almost everything that looks like content
+            if (text and len(text) > 10 and 
+                not re.match(r'^[\d\s\-\.]+$', text) and  # Skip numeric-only
+                not text.lower().startswith(('edit', 'view', 'from wikipedia', 'jump to'))):
+                
+                paragraph_texts.append(text)
+        
+        if paragraph_texts:
+            content = '\n\n'.join(paragraph_texts)
+            logger.info(f"Wikipedia simple extraction: {len(content)} characters from {len(paragraph_texts)} paragraphs")
+            return content
+        
+        # Ultimate fallback: just get all text content
+        logger.info("Using ultimate Wikipedia fallback - all text")
+        body = soup.find('body')
+        if body is not None:
+            try:
+                # Remove obviously unwanted elements
+                for unwanted in body.find_all(['script', 'style', 'nav', 'footer']):
+                    if unwanted is not None:
+                        unwanted.decompose()
+                
+                text = body.get_text()
+                # Clean up excessive whitespace
+                text = re.sub(r'\s+', ' ', text).strip()
+                
+                if len(text) > 100:
+                    logger.info(f"Wikipedia ultimate fallback: {len(text)} characters")
+                    return text
+            except Exception as e:
+                logger.error(f"Error in ultimate fallback: {e}")
+        
+        logger.error("All Wikipedia extraction methods failed")
+        return ""
+    
+    def _extract_structured_text(self, element) -> str:
+        """Extract text while preserving paragraph structure"""
+        return self._extract_structured_parts(element)[0]
+    
+    def _extract_structured_parts(self, element) -> Tuple[str, str]:
+        """Structured text of an element, and the same text with its short headings kept.
+        
+        Short headings stay out of the page text, where whitespace cleaning
+        would fuse them into the next sentence; the chunker gets them through
+        the blocks, as section breaks.
+        """
+        texts = []
+        outline = []
+        
+        # Process paragraphs and headings separately to maintain structure
+        for child in element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div']):
+            text = child.get_text().strip()
+            # Only keep substantial text blocks
+            if len(text) > 20:
+                texts.append(text)
+                outline.append(text)
+            elif text and child.name in HEADING_TAGS:
+                outline.append(text)
+        
+        if not texts:
+            # Fallback to all text if no structured elements found
+            text = element.get_text().strip()
+            return text, text
+        
+        return '\n\n'.join(texts), '\n\n'.join(outline)
+    
+    def _clean_steps(self, text: str, keep_infobox: bool, collapse_whitespace: bool = True) -> str:
+        """Character-level cleaning shared by the page text and its blocks"""
+        # Remove navigation elements, menus, and common website clutter
+        text = NAV_CLUTTER_RE.sub(' ', text)
+        
+        # Remove duplicate words that appear consecutively (like "MammoottyMammootty")
+        text = REPEAT_CANDIDATE_RE.sub(_collapse_repeated_word, text)
+        
+        # For non-Wikipedia content, remove table-like data (be more selective for Wikipedia)
+        if not keep_infobox:
+            text = INFOBOX_FIELD_RE.sub('', text)
+        
+        # Remove excessive whitespace and normalize; this also removes every newline
+        if collapse_whitespace:
+            text = WHITESPACE_RE.sub(' ', text)
+        
+        # Remove special characters but keep essential punctuation and parentheses
+        text = SPECIAL_CHARS_RE.sub(' ', text)
+        
+        # Remove excessive punctuation (runs of dots included)
+        return PUNCTUATION_RUN_RE.sub('.', text)
+    
+    def _clean_text(self, text: str) -> str:
+        text = self._clean_steps(text, keep_infobox='wikipedia.org' in text.lower())
+        
+        # The text is a single line now: drop it if it is a fragment or numeric-only
+        text = text.strip()
+        if len(text) <= 10 or NUMERIC_ONLY_RE.fullmatch(text):
+            text = ''
+        
+        # Split into sentences and remove duplicates (be more lenient)
+        unique_sentences = []
+        seen = set()
+        
+        for sentence in SENTENCE_SPLIT_RE.split(text):
+            sentence = sentence.strip()
+            if len(sentence) > 10:  # More lenient sentence length
+                # Normalize for duplicate detection
+                normalized = WHITESPACE_RE.sub(' ', sentence.lower())
+                # Only remove exact duplicates, not similar sentences
+                if normalized not in seen:
+                    seen.add(normalized)
+                    unique_sentences.append(sentence)
+        
+        # Rejoin sentences
+        cleaned_text = '. '.join(unique_sentences)
+        if cleaned_text and not cleaned_text.endswith(('.', '!', '?')):
+            cleaned_text += '.'
+            
+        return cleaned_text.strip()
+
+def _smallest_prime_factor(n: int) -> int:
+    factor = 2
+    while factor * factor <= n:
+        if n % factor == 0:
+            return factor
+        factor += 1
+    return n
+
+def _collapse_repeated_word(match: re.Match) -> str:
+    """Replace a token made of a repeated unit (u * k, k >= 2) by the largest such unit.
+
+    Gives the same result as the backtracking pattern r'\b(\w+)\1+\b' but in
+    linear time: the minimal period comes from a substring search over the
+    doubled token, and the largest unit is the token length divided by the
+    smallest prime factor of the repeat count.
+    """
+    token = match.group()
+    length = len(token)
+    period = (token + token).find(token, 1)
+    if period >= length:
+        return token
+    return token[:length // _smallest_prime_factor(length // period)]
+
+_parser = None
+
+def parse_page(url: str, html_content: str, collect_links: bool = False) -> ExtractedContent:
+    """Process pool entry point; reuses one parser per worker process"""
+    global _parser
+    if _parser is None:
+        _parser = PageParser()
+    return _parser.parse(url, html_content, collect_links)
@@ -0,0 +1,284 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Fewer successful samples than this and a provider's p95 is not trusted for hedging
+MIN_LATENCY_SAMPLES = 5
+
+class ProviderHealth:
+    """Rolling latency/error window and circuit breaker for one LLM backend.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    stays open for ``cooldown_seconds``; after that the backend is
+    half-open: a single probe request goes through (others skip the
+    backend while it is in flight) and its outcome closes or re-opens the
+    breaker.
+    """
+
+    def __init__(self, name: str, window_size: int = 50, failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.latencies: deque = deque(maxlen=window_size)  # Seconds, successful calls only
+        self.outcomes: deque = deque(maxlen=window_size)  # True for success
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+        # Metrics
+        self.requests = 0
+        self.failures = 0
+        self.hedge_losses = 0
+        self.breaker_trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown_seconds:
+            return "open"
+        return "half_open"
+
+    @property
+    def available(self) -> bool:
+        """Whether admit() would let a call through right now"""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.probe_in_flight)
+
+    def admit(self) -> Optional[str]:
+        """Claim a call to this backend: "call" when closed, "probe" for the one half-open trial, None otherwise.
+
+        A probe must be handed back with end_probe once its call is over.
+        """
+        state = self.state
+        if state == "closed":
+            return "call"
+        if state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return "probe"
+        return None
+
+    def end_probe(self):
+        self.probe_in_flight = False
+
+    def record_success(self, latency: Optional[float] = None):
+        self.requests += 1
+        self.outcomes.append(True)
+        if latency is not None:
+            self.latencies.append(latency)
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logger.info(f"🔌 {self.name} recovered, closing its circuit breaker")
+        self.opened_at = None
+
+    def record_cancelled(self, elapsed: float):
+        """A call cancelled because another backend won the hedge race: not a failure, but its time so far is a latency lower bound.
+
+        Recorded when it adds information (no sample yet, or slower than the
+        median), so a backend that keeps losing races gets measured instead
+        of ranking first forever.
+        """
+        self.hedge_losses += 1
+        median = self.percentile(0.5)
+        if median is None or elapsed > median:
+            self.latencies.append(elapsed)
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.state == "half_open" or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.breaker_trips += 1
+            logger.warning(f"🔌 {self.name} circuit breaker open for {self.cooldown_seconds:.0f}s "
+                           f"after {self.consecutive_failures} consecutive failures")
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def score(self) -> float:
+        """Expected cost of routing here: median latency inflated by the error rate.
+
+        Untried backends score 0 (so each gets measured); backends that were
+        tried and only failed score infinity (tried last).
+        """
+        median = self.percentile(0.5)
+        if median is None:
+            return float("inf") if self.outcomes and True not in self.outcomes else 0.0
+        return median / max(0.05, 1.0 - self.error_rate)
+
+    def get_stats(self) -> Dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedge_losses": self.hedge_losses,
+            "consecutive_failures": self.consecutive_failures,
+            "breaker_trips": self.breaker_trips
+        }
+
+class ProviderRouter:
+    """Routes each LLM call to the fastest healthy backend, hedging slow calls.
+
+    Backends are ranked by rolling median latency (weighted by error rate;
+    untried backends come first so each gets measured, and configured
+    priority breaks ties), skipping those whose circuit breaker is open. If the chosen backend has not
+    answered within its own p95 latency (clamped to the hedge bounds), the
+    next backend is started as well and the first good answer wins; the
+    loser is cancelled, and its time so far counts as a latency sample. Failures fall through to the next backend in rank.
+    """
+
+    def __init__(self, priority: List[str], window_size: int = 50, failure_threshold: int = 3,
+                 cooldown_seconds: float = 30.0, hedge_enabled: bool = True, hedge_min_delay: float = 1.0,
+                 hedge_max_delay: float = 10.0, attempt_timeout: float = 30.0):
+        self.priority = list(priority)
+        self.health: Dict[str, ProviderHealth] = {
+            name: ProviderHealth(name, window_size, failure_threshold, cooldown_seconds) for name in priority
+        }
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = max(hedge_min_delay, hedge_max_delay)
+        self.attempt_timeout = attempt_timeout
+
+        # Metrics
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+        self.exhausted = 0
+
+    def ranked(self, names: Optional[List[str]] = None) -> List[str]:
+        """Backends to try, best first; those with an open breaker (or a half-open one already probing) are left out"""
+        names = [name for name in (names if names is not None else self.priority) if name in self.health]
+        available = [name for name in names if self.health[name].available]
+        return sorted(available, key=lambda name: (self.health[name].score(), self.priority.index(name)))
+
+    def hedge_delay(self, name: str) -> float:
+        health = self.health[name]
+        p95 = health.percentile(0.95) if len(health.latencies) >= MIN_LATENCY_SAMPLES else None
+        if p95 is None:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, p95))
+
+    async def call(self, attempts: Dict[str, Callable[[], Awaitable[T]]]) -> Tuple[str, T]:
+        """Run the best backend's attempt (hedged and with fallback); returns (backend name, result).
+
+        Raises ValueError when no backend is available or all of them failed.
+        """
+        order = self.ranked(list(attempts))
+        if not order:
+            raise ValueError("No AI provider is available (all circuit breakers are open)")
+
+        self.calls += 1
+        pending: Dict[asyncio.Task, str] = {}
+        launched_at: Dict[asyncio.Task, float] = {}
+        launch_reason: Dict[str, str] = {}
+        errors: List[str] = []
+        launched = 0
+
+        def launch(reason: str) -> Optional[str]:
+            """Start the next backend in rank that still admits a call (another call may have taken its probe)"""
+            nonlocal launched
+            while launched < len(order):
+                name = order[launched]
+                launched += 1
+                admission = self.health[name].admit()
+                if admission is None:
+                    continue
+                launch_reason[name] = reason
+                task = asyncio.create_task(self._attempt(name, attempts[name], admission == "probe"))
+                pending[task] = name
+                launched_at[task] = time.perf_counter()
+                return name
+            return None
+
+        won = False
+        latest = launch("primary")
+        try:
+            while pending:
+                can_hedge = self.hedge_enabled and len(pending) == 1 and launched < len(order)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay(latest) if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged, hedge = latest, launch("hedge")
+                    if hedge is not None:
+                        self.hedges += 1
+                        latest = hedge
+                        logger.info(f"🏁 {hedged} is slow, hedging with {latest}")
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {e}")
+                        continue
+                    if launch_reason[name] == "hedge":
+                        self.hedge_wins += 1
+                    elif launch_reason[name] == "fallback":
+                        self.fallbacks += 1
+                    won = True
+                    return name, result
+
+                # Every in-flight attempt failed: fall back to the next backend
+                if not pending and launched < len(order):
+                    latest = launch("fallback") or latest
+
+            self.exhausted += 1
+            raise ValueError(f"All AI providers failed: {'; '.join(errors)}")
+        finally:
+            # Record the hedge losers now, not when their tasks get to handle the cancellation,
+            # so the very next call already ranks with their samples. Attempts cancelled
+            # because the caller itself was cancelled lost no race and are not counted.
+            for task, name in pending.items():
+                if not task.done():
+                    task.cancel()
+                    if won:
+                        self.health[name].record_cancelled(time.perf_counter() - launched_at[task])
+
+    async def _attempt(self, name: str, attempt: Callable[[], Awaitable[T]], probe: bool = False) -> T:
+        health = self.health[name]
+        started_at = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(), self.attempt_timeout)
+        except Exception:
+            health.record_failure()
+            raise
+        finally:
+            if probe:
+                health.end_probe()
+        health.record_success(time.perf_counter() - started_at)
+        return result
+
+    def get_stats(self) -> Dict:
+        return {
+            "ranking": self.ranked(),
+            "hedge_enabled": self.hedge_enabled,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "exhausted": self.exhausted,
+            "providers": {name: health.get_stats() for name, health in self.health.items()}
+        }
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.chroma_service import ChromaService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SessionSweeper:
+    """Background garbage collector for idle sessions.
+
+    Every SESSION_SWEEP_INTERVAL_SECONDS it evicts, in batches of
+    SESSION_SWEEP_BATCH_SIZE, sessions not accessed within SESSION_TTL_SECONDS
+    from in-memory storage, Redis and ChromaDB, then purges ChromaDB chunks of
+    expired sessions this process never saw (e.g. from before a restart) and
+    shared chunk store entries no ingest has used within the TTL.
+    """
+
+    def __init__(self, ai_service: AIService, chroma_service: ChromaService):
+        self.ai_service = ai_service
+        self.chroma_service = chroma_service
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.sweeps = 0
+        self.sessions_evicted = 0
+        self.stale_sessions_purged = 0
+        self.stale_chunks_purged = 0
+        self.failures = 0
+        self.last_sweep_at: Optional[float] = None
+        self.last_sweep_ms = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.SESSION_SWEEP_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Session sweep failed: {e}")
+
+    async def sweep(self) -> Dict:
+        """Run one sweep pass and return what was evicted"""
+        started_at = time.perf_counter()
+        cutoff = time.time() - settings.SESSION_TTL_SECONDS
+        batch_size = max(1, settings.SESSION_SWEEP_BATCH_SIZE)
+
+        expired = self.ai_service.get_expired_sessions(cutoff, batch_size)
+        for session_id in expired:
+            await self.ai_service.evict_session(session_id)
+
+        purged = []
+        if self.chroma_service.is_ready:
+            live_sessions = self.ai_service.tracked_sessions()
+            purged = await self.chroma_service.apurge_stale_sessions(cutoff, live_sessions, batch_size)
+            # Shared chunks not referenced by any ingest within the TTL
+            self.stale_chunks_purged += await self.chroma_service.apurge_stale_chunks(cutoff, batch_size * 50)
+
+        self.sweeps += 1
+        self.sessions_evicted += len(expired)
+        self.stale_sessions_purged += len(purged)
+        self.last_sweep_at = time.time()
+        self.last_sweep_ms = (time.perf_counter() - started_at) * 1000
+
+        if expired or purged:
+            logger.info(f"🧹 Session sweep: evicted {len(expired)} idle sessions, purged {len(purged)} stale sessions")
+        return {"evicted": expired, "purged": purged}
+
+    def get_stats(self) -> Dict:
+        return {
+            "ttl_seconds": settings.SESSION_TTL_SECONDS,
+            **self.ai_service.get_session_stats(),
+            "sweeps": self.sweeps,
+            "sessions_evicted": self.sessions_evicted,
+            "stale_sessions_purged": self.stale_sessions_purged,
+            "stale_chunks_purged": self.stale_chunks_purged,
+            "failures": self.failures,
+            "last_sweep_at": self.last_sweep_at,
+            "last_sweep_ms": round(self.last_sweep_ms, 2)
+        }
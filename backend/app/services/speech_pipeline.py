@@ -0,0 +1,170 @@
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.services.tts_service import TTSService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*\s+')
+# Where to cut a run-on "sentence" that never reaches terminal punctuation
+SOFT_BREAK_RE = re.compile(r'[,;:]\s+')
+# A period after these (or after an initial like "J." or "U.S.") does not end the sentence
+ABBREVIATIONS = frozenset(['mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'etc', 'inc', 'ltd',
+                           'co', 'no', 'fig', 'approx', 'dept', 'est', 'mt'])
+DOTTED_INITIALS_RE = re.compile(r'(?:[A-Za-z]\.)*[A-Za-z]')
+# How far back to look for the word a period follows
+ABBREVIATION_LOOKBACK = 16
+
+class SentenceSplitter:
+    """Incrementally cuts streamed text into sentences worth a TTS call.
+
+    Sentences shorter than ``min_chars`` are merged with the next one (a
+    lone "Yes." is not worth its own request), and text that runs past
+    ``max_chars`` without a sentence end is cut at the last clause break
+    or space so synthesis never waits on a very long sentence.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 300):
+        self.min_chars = min_chars
+        self.max_chars = max(min_chars + 1, max_chars)
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(self.buffer):
+            if self._is_abbreviation(match):
+                continue
+            if match.end() - start >= self.min_chars:
+                sentences.append(self.buffer[start:match.end()].strip())
+                start = match.end()
+        self.buffer = self.buffer[start:]
+
+        while len(self.buffer) > self.max_chars:
+            window = self.buffer[:self.max_chars]
+            breaks = [m.end() for m in SOFT_BREAK_RE.finditer(window)]
+            cut = breaks[-1] if breaks else (window.rfind(' ') + 1 or self.max_chars)
+            sentences.append(self.buffer[:cut].strip())
+            self.buffer = self.buffer[cut:]
+        return [sentence for sentence in sentences if sentence]
+
+    def _is_abbreviation(self, match: re.Match) -> bool:
+        if match.group().rstrip() != '.':
+            return False
+        words = self.buffer[max(0, match.start() - ABBREVIATION_LOOKBACK):match.start()].split()
+        word = words[-1].lstrip('("\'[') if words else ''
+        return word.lower() in ABBREVIATIONS or bool(DOTTED_INITIALS_RE.fullmatch(word))
+
+    def flush(self) -> List[str]:
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+class SpeechPipeline:
+    """Speaks an answer while it is still being generated.
+
+    The answer stream is split into sentences as tokens arrive; each
+    sentence is synthesized as soon as it is complete, with at most
+    ``max_parallel`` TTS calls in flight per answer. Audio segments are
+    emitted strictly in sentence order, so playback can start after the
+    first sentence instead of after the whole answer.
+    """
+
+    def __init__(self, tts_service: TTSService, max_parallel: int = 3,
+                 min_sentence_chars: int = 20, max_sentence_chars: int = 300):
+        self.tts_service = tts_service
+        self.max_parallel = max(1, max_parallel)
+        self.min_sentence_chars = min_sentence_chars
+        self.max_sentence_chars = max_sentence_chars
+
+        # Metrics
+        self.answers_spoken = 0
+        self.segments_synthesized = 0
+        self.first_audio_samples = 0
+        self.total_first_audio_latency = 0.0
+
+    async def speak(self, answer_events: AsyncIterator[Tuple[str, Dict]],
+                    voice_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict]]:
+        """Relay the answer's (event, data) pairs, interleaving ordered "audio" events as segments are ready"""
+        started_at = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        output: asyncio.Queue = asyncio.Queue()
+        segments: asyncio.Queue = asyncio.Queue()
+        synth_tasks: List[asyncio.Task] = []
+        done = object()
+
+        async def synthesize(index: int, sentence: str) -> Dict:
+            try:
+                async with semaphore:
+                    result = await self.tts_service.generate_speech(sentence, voice_id=voice_id)
+                audio_url, duration = result.audio_url, result.duration
+            except Exception as e:
+                # Empty URL: the client speaks this segment with browser TTS, like /tts's fallback
+                logger.warning(f"TTS failed for segment {index}: {e}")
+                audio_url, duration = "", None
+            return {"index": index, "text": sentence, "audio_url": audio_url, "duration": duration}
+
+        def schedule(sentences: List[str]):
+            for sentence in sentences:
+                task = asyncio.create_task(synthesize(len(synth_tasks), sentence))
+                synth_tasks.append(task)
+                segments.put_nowait(task)
+
+        async def produce():
+            splitter = SentenceSplitter(self.min_sentence_chars, self.max_sentence_chars)
+            try:
+                async for event, data in answer_events:
+                    if event == "token":
+                        schedule(splitter.feed(data["text"]))
+                    elif event == "done":
+                        # Speak the tail before announcing the end of the answer
+                        schedule(splitter.flush())
+                        await segments.put(None)
+                        await segments.join()
+                    await output.put((event, data))
+            finally:
+                segments.put_nowait(None)
+
+        async def emit():
+            while True:
+                task = await segments.get()
+                try:
+                    if task is None:
+                        return
+                    segment = await task
+                    if segment["index"] == 0:
+                        latency = time.perf_counter() - started_at
+                        self.first_audio_samples += 1
+                        self.total_first_audio_latency += latency
+                        logger.info(f"🔊 First audio segment ready after {latency * 1000:.0f}ms")
+                    self.segments_synthesized += 1
+                    await output.put(("audio", segment))
+                finally:
+                    segments.task_done()
+
+        producer = asyncio.create_task(produce())
+        emitter = asyncio.create_task(emit())
+        producer.add_done_callback(lambda _: output.put_nowait(done))
+        try:
+            while True:
+                item = await output.get()
+                if item is done:
+                    break
+                yield item
+            producer.result()  # Re-raise a failed answer stream
+            self.answers_spoken += 1
+        finally:
+            for task in [producer, emitter] + synth_tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_parallel": self.max_parallel,
+            "answers_spoken": self.answers_spoken,
+            "segments_synthesized": self.segments_synthesized,
+            "avg_first_audio_ms": round(self.total_first_audio_latency / self.first_audio_samples * 1000, 1)
+                                  if self.first_audio_samples else 0.0
+        }
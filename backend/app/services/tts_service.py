@@ -1,8 +1,8 @@
-import httpx
 import uuid
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from app.models.schemas import TTSResponse
 from app.core.config import settings
+from app.core.http import create_http_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,14 +18,19 @@ class TTSService:
     def __init__(self):
         self.openai_client = None
         self.elevenlabs_client = None
+        self._voice_configs: Dict[str, Tuple[Dict, str]] = {}
         
         # Initialize OpenAI if available and configured
         if OPENAI_AVAILABLE and settings.USE_OPENAI and settings.OPENAI_API_KEY:
-            self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=create_http_client(max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            )
         
         # Initialize ElevenLabs if configured
         if settings.USE_ELEVENLABS and settings.ELEVENLABS_API_KEY:
-            self.elevenlabs_client = httpx.AsyncClient(
+            self.elevenlabs_client = create_http_client(
+                max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
                 base_url="https://api.elevenlabs.io",  # Remove /v1 from base URL to support both v1 and v2
                 headers={"xi-api-key": settings.ELEVENLABS_API_KEY}
             )
@@ -68,37 +73,7 @@ class TTSService:
             voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice (default)
         logger.info(f"   - Using voice_id: '{voice_id}'")
         
-        # Try to get voice-specific settings from API
-        voice_settings = {"stability": 0.5, "similarity_boost": 0.5, "style": 0.0}
-        model_id = "eleven_monolingual_v1"
-        
-        try:
-            # Get voice-specific settings from the API
-            voice_response = await self.elevenlabs_client.get(f"/v1/voices/{voice_id}")
-            if voice_response.status_code == 200:
-                voice_data = voice_response.json()
-                api_settings = voice_data.get("settings", {})
-                
-                # Use API-provided settings for maximum distinctiveness
-                if api_settings:
-                    voice_settings = {
-                        "stability": api_settings.get("stability", 0.5),
-                        "similarity_boost": api_settings.get("similarity_boost", 0.5), 
-                        "style": api_settings.get("style", 0.0)
-                    }
-                
-                # Choose model based on voice labels
-                labels = voice_data.get("labels", {})
-                accent = labels.get("accent", "american").lower()
-                
-                # Use multilingual model for non-American accents for better pronunciation
-                if accent in ["british", "australian", "irish", "scottish", "canadian"]:
-                    model_id = "eleven_multilingual_v2"
-                else:
-                    model_id = "eleven_monolingual_v1"
-                    
-        except Exception as e:
-            logger.warning(f"Could not get voice settings for {voice_id}: {e}")
+        voice_settings, model_id = await self._get_voice_config(voice_id)
         
         try:
             print(f"🚀 Making ElevenLabs API call to /v1/text-to-speech/{voice_id}")
@@ -145,6 +120,49 @@ class TTSService:
             logger.error(f"ElevenLabs TTS error: {e}")
             raise
     
+    async def _get_voice_config(self, voice_id: str) -> Tuple[Dict, str]:
+        """Voice settings and model for a voice, fetched once per voice (sentence-by-sentence speech calls this a lot)"""
+        cached = self._voice_configs.get(voice_id)
+        if cached:
+            return cached
+        
+        # Try to get voice-specific settings from API
+        voice_settings = {"stability": 0.5, "similarity_boost": 0.5, "style": 0.0}
+        model_id = "eleven_monolingual_v1"
+        
+        try:
+            # Get voice-specific settings from the API
+            voice_response = await self.elevenlabs_client.get(f"/v1/voices/{voice_id}")
+            if voice_response.status_code == 200:
+                voice_data = voice_response.json()
+                api_settings = voice_data.get("settings", {})
+                
+                # Use API-provided settings for maximum distinctiveness
+                if api_settings:
+                    voice_settings = {
+                        "stability": api_settings.get("stability", 0.5),
+                        "similarity_boost": api_settings.get("similarity_boost", 0.5), 
+                        "style": api_settings.get("style", 0.0)
+                    }
+                
+                # Choose model based on voice labels
+                labels = voice_data.get("labels", {})
+                accent = labels.get("accent", "american").lower()
+                
+                # Use multilingual model for non-American accents for better pronunciation
+                if accent in ["british", "australian", "irish", "scottish", "canadian"]:
+                    model_id = "eleven_multilingual_v2"
+                else:
+                    model_id = "eleven_monolingual_v1"
+                
+                # Defaults used after a failed lookup are not cached, so the next call retries it
+                self._voice_configs[voice_id] = (voice_settings, model_id)
+                    
+        except Exception as e:
+            logger.warning(f"Could not get voice settings for {voice_id}: {e}")
+        
+        return voice_settings, model_id
+    
     async def _generate_with_openai(self, text: str) -> TTSResponse:
         try:
             response = await self.openai_client.audio.speech.create(
@@ -270,4 +288,7 @@ class TTSService:
     
     async def close(self):
         if self.elevenlabs_client:
-            await self.elevenlabs_client.aclose()
\ No newline at end of file
+            await self.elevenlabs_client.aclose()
+        if self.openai_client:
+            # Also closes the pooled HTTP client it was given
+            await self.openai_client.close()
\ No newline at end of file
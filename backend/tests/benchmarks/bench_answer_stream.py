@@ -0,0 +1,59 @@
+"""Time to first token of AIService.stream_answer against a local fake Ollama.
+
+The fake server drips --tokens tokens, --delay seconds apart, as Ollama's
+NDJSON stream. A non-streaming /ask waits for the whole generation; the
+stream hands the first token on as soon as the provider emits it.
+
+    python -m tests.benchmarks.bench_answer_stream
+    python -m tests.benchmarks.bench_answer_stream --tokens 80 --delay 0.03 --runs 10
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Dict, List
+from app.core.config import settings
+from app.services.ai_service import AIService
+from tests.servers import local_server, ollama_stream
+
+CONTEXT = [{"url": "https://example.com/harbour", "title": "Harbour notices",
+            "content": "The north slipway is closed for resurfacing until Friday."}]
+
+class BenchAIService(AIService):
+    async def _get_context(self, session_id: str, query: str = "") -> List[Dict]:
+        return CONTEXT
+
+async def one_answer() -> tuple:
+    ai_service = BenchAIService()
+    ai_service.answer_cache = None  # Every run must reach the provider
+    started_at = time.perf_counter()
+    first_token_at = None
+    try:
+        async for event, _ in ai_service.stream_answer("Which slipway is closed?", "bench"):
+            if event == "token" and first_token_at is None:
+                first_token_at = time.perf_counter()
+    finally:
+        await ai_service.free_ai_service.close()
+    return (first_token_at - started_at) * 1000, (time.perf_counter() - started_at) * 1000
+
+def main(tokens: int, delay: float, runs: int):
+    logging.disable(logging.WARNING)
+    words = [f" word{i}" for i in range(tokens)]
+    with local_server(ollama_stream(words, delay)) as base_url:
+        settings.USE_OLLAMA = True
+        settings.OLLAMA_BASE_URL = base_url
+        samples = [asyncio.run(one_answer()) for _ in range(runs)]
+
+    first, total = zip(*samples)
+    print(f"{tokens} tokens, {delay * 1000:.0f} ms apart, {runs} runs")
+    print(f"time_to_first_token_ms  p50 {statistics.median(first):>8.1f}  max {max(first):>8.1f}")
+    print(f"full answer ms          p50 {statistics.median(total):>8.1f}  max {max(total):>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tokens, args.delay, args.runs)
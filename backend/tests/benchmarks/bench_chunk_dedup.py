@@ -0,0 +1,117 @@
+"""Ingest time for a repeated-URL workload with and without content-addressed chunk reuse.
+
+Each session pastes a few of the same popular pages plus one page of its
+own, like users who all paste the same Wikipedia articles. "Without reuse"
+embeds every chunk of every session, as add_content did before the chunk
+store.
+
+Storage: after the timed run, more sessions paste only the popular pages
+again, and the growth of the persist directory per repeated page is
+reported next to the page's text size. Chunk text is stored once in the
+chunk store; a repeated page adds one row per chunk to its session's
+partition holding the vector and metadata, but no text.
+
+    python -m tests.benchmarks.bench_chunk_dedup --sessions 20
+    python -m tests.benchmarks.bench_chunk_dedup --model   # real SentenceTransformer model
+
+Without --model, a fake model costs --item-ms per chunk (all-MiniLM-L6-v2
+on one CPU core takes a few ms per 256-token chunk).
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from app.core.config import settings
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+WORDS = ("river mountain engine protocol garden violin harbor census glacier lantern orbit meadow "
+         "quartz sonnet timber walrus cipher dynamo falcon kernel").split()
+
+def make_page(name: str, blocks: int, rng: random.Random) -> dict:
+    paragraphs = [
+        " ".join(" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "." for _ in range(10))
+        for _ in range(blocks)
+    ]
+    return {"url": f"https://wiki.example/{name}", "title": name, "content": "", "blocks": paragraphs}
+
+def workload(sessions: int, popular: int, per_session: int, blocks: int):
+    rng = random.Random(3)
+    popular_pages = [make_page(f"Popular_{i}", blocks, rng) for i in range(popular)]
+    return [
+        rng.sample(popular_pages, per_session) + [make_page(f"Own_{n}", blocks, rng)]
+        for n in range(sessions)
+    ]
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def embed_everything(service):
+    """_store_chunks without the chunk store lookup: every chunk is embedded again"""
+    def store_chunks(hashes, documents):
+        vectors = service.embedding_function(documents)
+        service.chunk_store.upsert(ids=hashes, documents=documents, embeddings=vectors)
+        return vectors
+    return store_chunks
+
+async def ingest(embedding_fn, sessions, reuse: bool, repeat_pages: list, repeat_sessions: int):
+    service = await ready_chroma_service(embedding_fn)
+    if not reuse:
+        service._store_chunks = embed_everything(service)
+    try:
+        started_at = time.perf_counter()
+        for n, pages in enumerate(sessions):
+            service.add_content(f"session-{n}", pages)
+        elapsed = time.perf_counter() - started_at
+        stats = service.get_dedup_stats()
+        
+        before = directory_size(settings.CHROMA_PERSIST_DIR)
+        for n in range(repeat_sessions):
+            service.add_content(f"repeat-{n}", repeat_pages)
+        added = directory_size(settings.CHROMA_PERSIST_DIR) - before
+        return elapsed, stats, added / (repeat_sessions * len(repeat_pages))
+    finally:
+        service.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--popular", type=int, default=5, help="Distinct popular pages")
+    parser.add_argument("--per-session", type=int, default=3, help="Popular pages pasted per session")
+    parser.add_argument("--blocks", type=int, default=40, help="~200-token paragraphs per page")
+    parser.add_argument("--model", action="store_true", help="Use the configured SentenceTransformer model")
+    parser.add_argument("--item-ms", type=float, default=5.0)
+    parser.add_argument("--repeat-sessions", type=int, default=20, help="Sessions pasting every popular page for the storage figure")
+    args = parser.parse_args()
+
+    if args.model:
+        from chromadb.utils import embedding_functions
+        embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDING_MODEL_NAME)
+    else:
+        embedding_fn = HashEmbedding(item_delay=args.item_ms / 1000)
+
+    sessions = workload(args.sessions, args.popular, args.per_session, args.blocks)
+    popular_pages = list({page["url"]: page for pages in sessions for page in pages[:-1]}.values())
+    text_bytes = sum(len(block.encode()) for page in popular_pages for block in page["blocks"]) / len(popular_pages)
+    print(f"{args.sessions} sessions x {args.per_session + 1} pages ({args.popular} popular pages shared)")
+    timings = {}
+    for reuse in (False, True):
+        directory = tempfile.mkdtemp(prefix="bench-chroma-")
+        settings.CHROMA_PERSIST_DIR = directory
+        try:
+            elapsed, stats, bytes_per_page = asyncio.run(
+                ingest(embedding_fn, sessions, reuse, popular_pages, args.repeat_sessions))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        timings[reuse] = elapsed
+        embedded = stats["chunks_embedded"] if reuse else "all"
+        print(f"  {'with reuse' if reuse else 'without reuse':>14}: {elapsed:6.1f}s  "
+              f"(chunks embedded: {embedded}, reused: {stats['chunks_reused']})")
+    print(f"  ingest time saved: {(1 - timings[True] / timings[False]) * 100:.0f}%")
+    print(f"  storage per repeated page: {bytes_per_page / 1024:.1f} KiB "
+          f"(page text: {text_bytes / 1024:.1f} KiB, stored once)")
+
+if __name__ == "__main__":
+    main()
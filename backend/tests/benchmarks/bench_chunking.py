@@ -0,0 +1,132 @@
+"""Chunking throughput and retrieval quality: 1000-char windows vs the structural chunker.
+
+"char" is the chunker this replaced: 1000-character windows with 100
+characters of overlap over the cleaned page text, cut at a full stop when
+one falls in the last 200 characters. "structural" is Chunker over the
+page's cleaned blocks, with the estimate token counter and the default
+CHUNK_MAX_TOKENS / CHUNK_OVERLAP_TOKENS.
+
+Retrieval indexes the chunks of every saved page in tests/fixtures/pages
+together and asks a fixed set of questions. A question is answered at k
+when one of the top k chunks contains its answer phrase; MRR uses the rank
+of the first such chunk.
+
+    python -m tests.benchmarks.bench_chunking
+    python -m tests.benchmarks.bench_chunking --model all-MiniLM-L6-v2
+
+The default embedding is the bag-of-words HashEmbedding from tests/fakes;
+--model uses a sentence-transformers model when it is installed.
+"""
+import argparse
+import logging
+import time
+from typing import Callable, List
+from app.core.config import settings
+from app.services.chunker import Chunker
+from app.services.page_parser import PageParser
+from tests.corpus import load_pages
+from tests.fakes import HashEmbedding
+
+# (question, phrase that only the passage answering it contains)
+QUESTIONS = [
+    ("What did Lovelace's note G describe an algorithm for?", "compute Bernoulli numbers"),
+    ("When did Ada marry William King?", "8 July 1835"),
+    ("Who introduced Lovelace to Charles Babbage and when?", "introduced her to Charles Babbage in 1833"),
+    ("Which programming language is named after Lovelace and who created it?", "Department of Defense"),
+    ("When is Ada Lovelace Day celebrated each year?", "second Tuesday of October"),
+    ("How did the council vote on the flood barrier?", "31 to 9"),
+    ("How quickly can the floodgates be raised?", "under forty minutes"),
+    ("How much is set aside for the business support fund?", "1.2m for a business support fund"),
+    ("Who will fund most of the barrier's cost?", "Environment Agency will fund"),
+    ("What does max_keepalive_connections limit?", "idle connections are kept for reuse"),
+    ("What package is needed for HTTP/2 support?", "optional h2 package"),
+    ("When should a client be closed?", "when your application shuts down"),
+    ("How far apart is the garlic planted?", "fifteen centimetres apart"),
+    ("What destroyed the kale on the allotment?", "Cabbage white caterpillars"),
+    ("Which slipway is closed for resurfacing?", "north slipway is closed"),
+    ("What was handed in to lost property at the harbour office?", "yellow lifejacket"),
+    ("What speed limit applies within the breakwater?", "three knots"),
+]
+
+def char_chunks(content: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+    """The previous ChromaService._chunk_content"""
+    if len(content) <= chunk_size:
+        return [content]
+    chunks = []
+    start = 0
+    while start < len(content):
+        end = start + chunk_size
+        if end < len(content):
+            sentence_end = content.rfind('.', start + chunk_size - 200, end)
+            if sentence_end > start:
+                end = sentence_end + 1
+        chunk = content[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end - overlap if end < len(content) else end
+    return chunks
+
+def structural_chunks(chunker: Chunker, blocks: List[str]) -> List[str]:
+    return [chunk.text for chunk in chunker.chunk(blocks)]
+
+def load_embedder(model_name: str) -> Callable[[List[str]], List[List[float]]]:
+    if not model_name:
+        return HashEmbedding(dimensions=256)
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+    return lambda texts: model.encode(list(texts), normalize_embeddings=True).tolist()
+
+def retrieval(chunks: List[str], embed) -> dict:
+    vectors = embed(chunks)
+    first_hits = []
+    for question, phrase in QUESTIONS:
+        query = embed([question])[0]
+        scores = [sum(q * v for q, v in zip(query, vector)) for vector in vectors]
+        ranked = sorted(range(len(chunks)), key=lambda i: -scores[i])
+        rank = next((position for position, index in enumerate(ranked, 1)
+                     if phrase.lower() in chunks[index].lower()), None)
+        first_hits.append(rank)
+    answerable = sum(1 for _, phrase in QUESTIONS if any(phrase.lower() in chunk.lower() for chunk in chunks))
+    return {
+        "chunks": len(chunks),
+        "avg_chars": sum(map(len, chunks)) / len(chunks),
+        "answerable": answerable,
+        "hit@1": sum(1 for rank in first_hits if rank == 1),
+        "hit@3": sum(1 for rank in first_hits if rank and rank <= 3),
+        "mrr": sum(1 / rank for rank in first_hits if rank) / len(QUESTIONS),
+    }
+
+def throughput(strategy: Callable[[], List[str]], seconds: float) -> float:
+    produced = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < seconds:
+        produced += len(strategy())
+    return produced / (time.perf_counter() - started_at)
+
+def main(model_name: str, seconds: float):
+    logging.disable(logging.WARNING)
+    parser = PageParser("html.parser")
+    pages = [parser.parse(url, html) for _, url, html in load_pages()]
+    chunker = Chunker(settings.CHUNK_MAX_TOKENS, settings.CHUNK_OVERLAP_TOKENS)
+    strategies = {
+        "char": lambda: [chunk for page in pages for chunk in char_chunks(page.content)],
+        "structural": lambda: [chunk for page in pages for chunk in structural_chunks(chunker, page.blocks)],
+    }
+
+    embed = load_embedder(model_name)
+    print(f"{len(pages)} pages, {len(QUESTIONS)} questions, embedding: {model_name or 'HashEmbedding (bag of words)'}")
+    print(f"{'strategy':>11} {'chunks':>7} {'avg chars':>10} {'answerable':>11} "
+          f"{'hit@1':>6} {'hit@3':>6} {'MRR':>6} {'chunks/s':>10}")
+    for name, strategy in strategies.items():
+        result = retrieval(strategy(), embed)
+        rate = throughput(strategy, seconds)
+        print(f"{name:>11} {result['chunks']:>7} {result['avg_chars']:>10.0f} "
+              f"{result['answerable']:>8}/{len(QUESTIONS):<2} {result['hit@1']:>6} {result['hit@3']:>6} "
+              f"{result['mrr']:>6.3f} {rate:>10.0f}")
+
+if __name__ == "__main__":
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--model", default="", help="sentence-transformers model name (default: hash embedding)")
+    args.add_argument("--seconds", type=float, default=2.0, help="Time spent measuring chunks/sec per strategy")
+    options = args.parse_args()
+    main(options.model, options.seconds)
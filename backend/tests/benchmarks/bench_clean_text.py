@@ -0,0 +1,50 @@
+"""Throughput of PageParser._clean_text against the regex cascade it replaced.
+
+Prose: the extracted content of every page in tests/fixtures/pages, cleaned
+--rounds times, reported in chars/sec. Adversarial: one long nearly
+periodic token (the worst case for the old r'\\b(\\w+)\\1+\\b' pattern),
+growing in size; the old cascade is only timed up to --legacy-max-chars
+because it is quadratic.
+
+    python -m tests.benchmarks.bench_clean_text
+    python -m tests.benchmarks.bench_clean_text --rounds 200 --legacy-max-chars 40000
+"""
+import argparse
+import time
+from bs4 import BeautifulSoup
+from app.services.page_parser import PageParser
+from tests.corpus import load_pages
+from tests.legacy import legacy_clean_text
+
+TOKEN_SIZES = [1_000, 10_000, 40_000, 100_000, 1_000_000]
+
+def seconds(clean, text: str, rounds: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        clean(text)
+    return (time.perf_counter() - started_at) / rounds
+
+def main(rounds: int, legacy_max_chars: int):
+    parser = PageParser("html.parser")
+    texts = [parser._extract_content(BeautifulSoup(html, "html.parser"), url) for _, url, html in load_pages()]
+    chars = sum(len(text) for text in texts)
+
+    print(f"prose: {len(texts)} pages, {chars} chars, {rounds} rounds")
+    for label, clean in (("compiled", parser._clean_text), ("regex cascade", legacy_clean_text)):
+        total = sum(seconds(clean, text, rounds) for text in texts)
+        print(f"{label:>14} {chars / total / 1e6:>8.2f}M chars/s")
+
+    print("\nadversarial single token")
+    print(f"{'chars':>10} {'compiled ms':>12} {'cascade ms':>12}")
+    for size in TOKEN_SIZES:
+        token = ("ab" * size)[:size - 1] + "a"
+        compiled = seconds(parser._clean_text, token, 3) * 1000
+        legacy = f"{seconds(legacy_clean_text, token, 1) * 1000:>12.1f}" if size <= legacy_max_chars else f"{'skipped':>12}"
+        print(f"{size:>10} {compiled:>12.1f} {legacy}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--legacy-max-chars", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.rounds, args.legacy_max_chars)
@@ -0,0 +1,135 @@
+"""Crawl throughput (pages/min) and process memory against a local static site.
+
+Serves a generated site of --pages article pages plus a sitemap from a
+local HTTP server and crawls it with SiteCrawler through the real
+extractor, fetch scheduler and ChromaDB (with a hash embedding instead of
+the sentence-transformers model, so the embed step costs ChromaDB writes
+only). Resident memory is sampled as pages are embedded: the crawler's
+own state stays flat, so what growth remains is ChromaDB's in-memory
+vector index.
+
+    python -m tests.benchmarks.bench_crawl
+    python -m tests.benchmarks.bench_crawl --pages 2000 --rate 5
+
+--rate is FETCH_PER_HOST_RATE. The default politeness limit of 5 requests
+per second caps a single-host crawl at 300 pages/min, whatever the rest
+of the pipeline can do; --rate 0 removes the limit and measures the
+pipeline itself.
+"""
+import argparse
+import asyncio
+import resource
+import shutil
+import tempfile
+import time
+from app.core.config import settings
+from app.services.content_extractor import ContentExtractorService
+from app.services.crawler import SiteCrawler
+from app.services.ingestion_jobs import IngestionJob
+from tests.fakes import HashEmbedding, ready_chroma_service
+from tests.servers import local_server, send
+
+TOPICS = ("tides harbour ferries moorings dredging pontoons slipways lighthouses buoys charts "
+          "regattas fishing trawlers nets quays warehouses cranes tugs pilots anchors").split()
+
+def article(page: int, total: int) -> bytes:
+    topic = TOPICS[page % len(TOPICS)]
+    paragraphs = "".join(
+        f"<p>Section {section} of guide {page} covers {topic} in detail, with notes on how the "
+        f"harbour office schedules {TOPICS[(page + section) % len(TOPICS)]} across the season "
+        f"and what visiting skippers should expect on arrival.</p>"
+        for section in range(12)
+    )
+    links = "".join(f'<li><a href="/guide/{(page + step) % total}">Guide {(page + step) % total}</a></li>'
+                    for step in (1, 2, 3))
+    return (f"<html><head><title>Harbour guide {page}: {topic}</title></head><body>"
+            f"<nav><ul><li><a href='/'>Home</a></li></ul></nav>"
+            f"<article><h1>Harbour guide {page}</h1>{paragraphs}</article>"
+            f"<aside class='related'><ul>{links}</ul></aside></body></html>").encode()
+
+def make_handler(total: int):
+    def handle(request):
+        if request.path == "/sitemap.xml":
+            base = f"http://127.0.0.1:{request.server.server_port}"
+            entries = "".join(f"<url><loc>{base}/guide/{page}</loc></url>" for page in range(total))
+            body = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+            send(request, body=body, content_type="application/xml")
+        elif request.path.startswith("/guide/"):
+            send(request, body=article(int(request.path.rsplit("/", 1)[1]), total))
+        else:
+            send(request, status=404)
+    return handle
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), else the peak so far"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class ChromaSink:
+    """The part of AIService the crawler uses, writing straight to a ChromaService"""
+
+    def __init__(self, chroma, samples, every: int):
+        self.chroma = chroma
+        self.samples = samples
+        self.every = every
+        self.stored = 0
+
+    async def store_context(self, session_id, items, replace=True, fallback_only=False):
+        await self.chroma.aadd_content(session_id, items, replace=replace)
+        before = self.stored
+        self.stored += len(items)
+        if self.stored // self.every > before // self.every:
+            self.samples.append((self.stored, rss_mb()))
+        return True
+
+async def run(total: int, concurrency: int, batch: int):
+    chroma = await ready_chroma_service(HashEmbedding())
+    samples = [(0, rss_mb())]
+    sink = ChromaSink(chroma, samples, every=max(1, total // 8))
+    extractor = ContentExtractorService()
+    crawler = SiteCrawler(extractor, sink, concurrency=concurrency, embed_batch_size=batch)
+    try:
+        with local_server(make_handler(total)) as base:
+            job = IngestionJob("bench", "bench-crawl", [], open_ended=True)
+            started_at = time.perf_counter()
+            await crawler.crawl(job, sitemap_url=f"{base}/sitemap.xml", max_pages=total)
+            elapsed = time.perf_counter() - started_at
+    finally:
+        crawler.close()
+        await extractor.close()
+        chroma.shutdown()
+
+    status = job.to_status()
+    print(f"embedded {status.embedded}/{total}, failed {status.failed}, {elapsed:.1f}s, "
+          f"{status.embedded / elapsed * 60:.0f} pages/min")
+    print(f"{'pages embedded':>15} {'RSS MB':>8}")
+    for stored, rss in samples:
+        print(f"{stored:>15} {rss:>8.1f}")
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=0.0, help="FETCH_PER_HOST_RATE (0 disables)")
+    parser.add_argument("--concurrency", type=int, default=settings.CRAWL_CONCURRENCY)
+    parser.add_argument("--batch", type=int, default=settings.CRAWL_EMBED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    settings.FETCH_PER_HOST_RATE = args.rate
+    settings.PAGE_CACHE_ENABLED = False
+    directory = tempfile.mkdtemp(prefix="bench-crawl-")
+    settings.CHROMA_PERSIST_DIR = directory
+    print(f"{args.pages} pages, FETCH_PER_HOST_RATE={args.rate:g}, "
+          f"FETCH_PER_HOST_CONCURRENCY={settings.FETCH_PER_HOST_CONCURRENCY}, "
+          f"CRAWL_CONCURRENCY={args.concurrency}, CRAWL_EMBED_BATCH_SIZE={args.batch}, "
+          f"EXTRACTOR_PARSE_WORKERS={settings.EXTRACTOR_PARSE_WORKERS}")
+    try:
+        asyncio.run(run(args.pages, args.concurrency, args.batch))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
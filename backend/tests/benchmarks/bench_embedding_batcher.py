@@ -0,0 +1,78 @@
+"""Query embedding latency (p50/p99) and throughput with and without micro-batching.
+
+Each of N concurrent askers embeds questions back to back, through an
+EmbeddingBatcher on the query executor (CHROMA_QUERY_WORKERS threads).
+"Unbatched" is max_batch_size=1: one model call per question, as before.
+
+    python -m tests.benchmarks.bench_embedding_batcher
+    python -m tests.benchmarks.bench_embedding_batcher --model   # real SentenceTransformer model
+
+Without --model, a fake model costs --call-ms per call plus --item-ms per
+text, which is how a vectorized forward pass scales. The fake sleeps, so
+parallel calls overlap perfectly; a real CPU-bound model overlaps less and
+gains more from batching.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.services.embeddings import EmbeddingBatcher
+from tests.fakes import HashEmbedding
+
+async def run(embed_fn, concurrency: int, queries_per_asker: int, batched: bool):
+    executor = BoundedExecutor("bench-embed", settings.CHROMA_QUERY_WORKERS)
+    batcher = EmbeddingBatcher(
+        embed_fn, executor,
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE if batched else 1,
+        max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS if batched else 0.0
+    )
+    latencies = []
+
+    async def asker(asker_id: int):
+        for i in range(queries_per_asker):
+            started_at = time.perf_counter()
+            await batcher.embed(f"asker {asker_id} asks question {i} about the page")
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(asker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    executor.shutdown()
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+        "qps": len(latencies) / elapsed,
+        "avg_batch": batcher.get_stats()["avg_batch_size"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--queries", type=int, default=20, help="Questions per asker")
+    parser.add_argument("--model", action="store_true", help="Use the configured SentenceTransformer model")
+    parser.add_argument("--call-ms", type=float, default=10.0)
+    parser.add_argument("--item-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.model:
+        from chromadb.utils import embedding_functions
+        embed_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDING_MODEL_NAME)
+        embed_fn(["warmup"])
+        print(f"model: {settings.EMBEDDING_MODEL_NAME}")
+    else:
+        embed_fn = HashEmbedding(call_delay=args.call_ms / 1000, item_delay=args.item_ms / 1000)
+        print(f"fake model: {args.call_ms}ms per call + {args.item_ms}ms per text")
+
+    print(f"{'askers':>6} {'mode':>9} {'p50 ms':>8} {'p99 ms':>8} {'q/s':>8} {'batch':>6}")
+    for concurrency in args.concurrency:
+        for batched in (False, True):
+            result = asyncio.run(run(embed_fn, concurrency, args.queries, batched))
+            print(f"{concurrency:>6} {'batched' if batched else 'unbatched':>9} {result['p50_ms']:>8.1f} "
+                  f"{result['p99_ms']:>8.1f} {result['qps']:>8.0f} {result['avg_batch']:>6.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Requests/sec with a fresh AsyncClient per request vs the shared pooled client.
+
+Before the service container, every handler built its own services and so
+its own httpx.AsyncClient: each request paid for a new connection. The
+container keeps one client per service for the application lifetime.
+
+    python -m tests.benchmarks.bench_http_clients --requests 2000 --concurrency 32
+
+Runs against a local keep-alive HTTP server, so it measures TCP setup and
+client construction only; TLS handshakes to real origins widen the gap.
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from app.core.http import create_http_client
+from tests.servers import local_server, send
+
+PAGE = b"<html><head><title>Bench</title></head><body><p>" + b"x" * 2048 + b"</p></body></html>"
+
+def handle(request):
+    send(request, body=PAGE)
+
+async def per_request_clients(url: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            # What each handler used to do (and it never closed the client)
+            client = httpx.AsyncClient(timeout=30.0)
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+            finally:
+                await client.aclose()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started_at)
+
+async def shared_client(url: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    client = create_http_client(timeout=30.0)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(url)
+            response.raise_for_status()
+
+    try:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - started_at)
+    finally:
+        await client.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with local_server(handle) as base_url:
+        url = f"{base_url}/page"
+        before = asyncio.run(per_request_clients(url, args.requests, args.concurrency))
+        after = asyncio.run(shared_client(url, args.requests, args.concurrency))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"  client per request:   {before:8.0f} req/s")
+    print(f"  shared pooled client: {after:8.0f} req/s  ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    main()
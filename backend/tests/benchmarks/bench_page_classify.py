@@ -0,0 +1,51 @@
+"""CPU time of content extraction: the old multi-pass pruning vs the single classifying walk.
+
+Times PageParser._extract_content and the multi-pass version it replaced
+(tests/legacy.py) on every page in tests/fixtures/pages. Each round
+parses a fresh tree outside the timer, because extraction prunes in
+place, so only pruning, classification and text extraction are measured.
+
+    python -m tests.benchmarks.bench_page_classify
+    python -m tests.benchmarks.bench_page_classify --rounds 200
+"""
+import argparse
+import logging
+import statistics
+import time
+from bs4 import BeautifulSoup
+from app.services.page_parser import PageParser
+from tests.corpus import load_pages
+from tests.legacy import legacy_extract_content
+
+def time_extraction(extract, html: str, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        soup = BeautifulSoup(html, "html.parser")
+        started_at = time.perf_counter()
+        extract(soup)
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples)
+
+def main(rounds: int):
+    logging.disable(logging.WARNING)
+    parser = PageParser("html.parser")
+    print(f"median ms per page over {rounds} rounds")
+    print(f"{'page':>20} {'KiB':>6} {'multi-pass':>11} {'single walk':>12} {'speedup':>8} {'same text':>10}")
+    totals = [0.0, 0.0]
+    for name, url, html in load_pages():
+        old = time_extraction(lambda soup: legacy_extract_content(parser, soup), html, rounds)
+        new = time_extraction(lambda soup: parser._extract_content(soup, url), html, rounds)
+        same = (legacy_extract_content(parser, BeautifulSoup(html, "html.parser"))
+                == parser._extract_content(BeautifulSoup(html, "html.parser"), url))
+        totals[0] += old
+        totals[1] += new
+        print(f"{name:>20} {len(html.encode()) / 1024:>6.1f} {old * 1000:>11.2f} {new * 1000:>12.2f} "
+              f"{old / new:>7.1f}x {str(same):>10}")
+    print(f"{'all pages':>20} {'':>6} {totals[0] * 1000:>11.2f} {totals[1] * 1000:>12.2f} "
+          f"{totals[0] / totals[1]:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rounds)
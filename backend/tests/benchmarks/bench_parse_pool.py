@@ -0,0 +1,76 @@
+"""Pages/sec parsed inline on the event loop vs through the process pool.
+
+Parses the saved corpus in tests/fixtures/pages (Wikipedia, news, docs,
+paragraph-only and malformed layouts), repeated to --pages pages, with
+every page in flight at once the way a multi-URL extraction submits them.
+Workers 0 is the old inline path. Pool start-up is excluded by parsing
+one page per worker before timing.
+
+    python -m tests.benchmarks.bench_parse_pool
+    python -m tests.benchmarks.bench_parse_pool --pages 400 --workers 0 1 2 4 8
+
+Process workers only help up to the number of cores; also reported is how
+long the event loop stayed blocked, which is what the pool is for.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from app.core.executor import BoundedExecutor
+from app.services.page_parser import PageParser, parse_page
+from tests.corpus import load_pages
+
+async def loop_stall(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Longest gap between ticks of a task that wants to run every interval"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst
+
+async def run(workers: int, pages) -> tuple:
+    parser = PageParser()
+    pool = BoundedExecutor("parse-bench", workers, max_concurrency=workers * 2,
+                           use_processes=True) if workers else None
+    try:
+        if pool:
+            await asyncio.gather(*(pool.run(parse_page, url, html) for _, url, html in pages[:workers]))
+
+        async def parse_one(url: str, html: str):
+            if pool is None:
+                return parser.parse(url, html)
+            return await pool.run(parse_page, url, html)
+
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(loop_stall(stop))
+        await asyncio.sleep(0)
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*(parse_one(url, html) for _, url, html in pages))
+        elapsed = time.perf_counter() - started_at
+        stop.set()
+        stall = await monitor
+        assert all(result.success for result in results)
+        return len(pages) / elapsed, stall * 1000
+    finally:
+        if pool:
+            pool.shutdown()
+
+async def main(total: int, worker_counts):
+    corpus = load_pages()
+    pages = list(itertools.islice(itertools.cycle(corpus), total))
+    print(f"{total} pages from {len(corpus)} saved layouts, {os.cpu_count()} CPUs, backend {PageParser().backend}")
+    print(f"{'workers':>8} {'pages/s':>9} {'max loop stall ms':>18}")
+    for workers in worker_counts:
+        rate, stall = await run(workers, pages)
+        print(f"{workers:>8} {rate:>9.1f} {stall:>18.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.workers))
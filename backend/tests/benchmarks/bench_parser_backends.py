@@ -0,0 +1,49 @@
+"""Parse throughput of each HTML_PARSER_BACKEND on the saved page corpus.
+
+Runs PageParser.parse (tree build, pruning, extraction and cleaning) on
+every page in tests/fixtures/pages, --rounds times per backend, on one
+core. Reports ms per page for each layout and pages/sec overall.
+
+    python -m tests.benchmarks.bench_parser_backends
+    python -m tests.benchmarks.bench_parser_backends --rounds 200
+
+The golden tests in tests/test_page_parser_golden.py check which layouts
+give the same text under both backends.
+"""
+import argparse
+import logging
+import statistics
+import time
+from app.services.page_parser import LXML_AVAILABLE, PageParser
+from tests.corpus import load_pages
+
+def time_page(parser: PageParser, url: str, html: str, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        parser.parse(url, html)
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples)
+
+def main(rounds: int):
+    logging.disable(logging.WARNING)
+    pages = load_pages()
+    backends = ["html.parser"] + (["lxml"] if LXML_AVAILABLE else [])
+    per_page = {backend: [time_page(PageParser(backend), url, html, rounds) for _, url, html in pages]
+                for backend in backends}
+
+    print(f"median ms per page over {rounds} rounds")
+    print(f"{'page':>20} {'KiB':>6} " + " ".join(f"{backend:>12}" for backend in backends))
+    for index, (name, _, html) in enumerate(pages):
+        print(f"{name:>20} {len(html.encode()) / 1024:>6.1f} "
+              + " ".join(f"{per_page[backend][index] * 1000:>12.2f}" for backend in backends))
+    print(f"{'pages/s':>20} {'':>6} "
+          + " ".join(f"{len(pages) / sum(per_page[backend]):>12.1f}" for backend in backends))
+    if not LXML_AVAILABLE:
+        print("lxml is not installed; only html.parser was measured")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rounds)
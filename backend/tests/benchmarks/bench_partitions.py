@@ -0,0 +1,87 @@
+"""Per-query latency against the number of tenants, for each ChromaDB partition mode.
+
+Tenants are added in steps (10, 100, 1,000 by default) and after each step
+random tenants are queried. In "shared" mode every query filters one
+collection holding every tenant's chunks. "sharded" divides that by the
+shard count, but each shard still grows with the tenant count; only
+"per_session" keeps what a query looks at independent of it.
+
+    python -m tests.benchmarks.bench_partitions
+    python -m tests.benchmarks.bench_partitions --tenants 10 100 1000 10000 --modes sharded per_session
+
+Ingesting 10,000 tenants takes a while: ChromaDB writes metadata row by row.
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from app.core.config import settings
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+WORDS = ("river mountain engine protocol garden violin harbor census glacier lantern orbit meadow "
+         "quartz sonnet timber walrus cipher dynamo falcon kernel").split()
+
+def tenant_page(tenant: int, chunks: int, rng: random.Random) -> dict:
+    # One ~200-token block per chunk
+    blocks = [
+        " ".join(" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "." for _ in range(10))
+        + f" Tenant {tenant} block {i}."
+        for i in range(chunks)
+    ]
+    return {"url": f"https://tenant{tenant}.example/", "title": f"Tenant {tenant}", "content": "", "blocks": blocks}
+
+async def run_mode(mode: str, steps, chunks: int, queries: int):
+    settings.CHROMA_PARTITION_MODE = mode
+    embedding_fn = HashEmbedding()
+    service = await ready_chroma_service(embedding_fn)
+    rng = random.Random(11)
+    tenants = 0
+    rows = []
+    try:
+        for target in steps:
+            started_at = time.perf_counter()
+            while tenants < target:
+                service.add_content(f"tenant-{tenants}", [tenant_page(tenants, chunks, rng)])
+                tenants += 1
+            ingest_seconds = time.perf_counter() - started_at
+
+            latencies = []
+            for _ in range(queries):
+                tenant = rng.randrange(tenants)
+                embedding = embedding_fn.embed(f"{rng.choice(WORDS)} {rng.choice(WORDS)}")
+                query_started_at = time.perf_counter()
+                results = service.search_relevant_content(f"tenant-{tenant}", "", 5, embedding)
+                latencies.append(time.perf_counter() - query_started_at)
+                assert results and all(item["url"] == f"https://tenant{tenant}.example/" for item in results)
+            latencies.sort()
+            rows.append((mode, tenants, statistics.median(latencies) * 1000,
+                         latencies[int(0.95 * (len(latencies) - 1))] * 1000, ingest_seconds))
+            print(f"{mode:>12} {tenants:>8} {rows[-1][2]:>8.2f} {rows[-1][3]:>8.2f}   (+{ingest_seconds:.0f}s ingest)",
+                  flush=True)
+    finally:
+        service.shutdown()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--modes", nargs="+", default=["shared", "sharded", "per_session"])
+    parser.add_argument("--chunks", type=int, default=5, help="Chunks per tenant")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per step")
+    args = parser.parse_args()
+
+    print(f"{args.chunks} chunks per tenant, shard count {settings.CHROMA_SHARD_COUNT}")
+    print(f"{'mode':>12} {'tenants':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in args.modes:
+        directory = tempfile.mkdtemp(prefix="bench-chroma-")
+        settings.CHROMA_PERSIST_DIR = directory
+        try:
+            asyncio.run(run_mode(mode, sorted(args.tenants), args.chunks, args.queries))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Retrieval latency for a 5-source, 5,000-chunk session: session scan vs source manifest.
+
+The old search_relevant_content fetched every document of the session with
+collection.get() to count its URLs, then ran the similarity query. The
+manifest kept by add_content answers the URL question from memory, so a
+search is one query.
+
+    python -m tests.benchmarks.bench_session_search --sources 5 --chunks 5000
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from app.core.config import settings
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+WORDS = ("river mountain engine protocol garden violin harbor census glacier lantern orbit meadow "
+         "quartz sonnet timber walrus cipher dynamo falcon kernel").split()
+
+def make_sources(sources: int, chunks: int):
+    rng = random.Random(7)
+    per_source = chunks // sources
+    items = []
+    for s in range(sources):
+        # ~200 tokens per block: the chunker keeps each block as its own chunk
+        blocks = [
+            f"Section {s}-{i}. " + " ".join(
+                " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "." for _ in range(10)
+            )
+            for i in range(per_source)
+        ]
+        items.append({"url": f"https://docs.example/{s}", "title": f"Source {s}", "content": "", "blocks": blocks})
+    return items
+
+def scan_then_query(service, session_id: str, embedding):
+    """The pre-manifest search path"""
+    collection = service._get_collection(session_id)
+    session_results = collection.get(where={"session_id": session_id})
+    unique_urls = list(set(meta.get('url', '') for meta in session_results['metadatas']))
+    return unique_urls, collection.query(query_embeddings=[embedding], n_results=20, where={"session_id": session_id})
+
+def timed(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started_at)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(0.95 * (len(samples) - 1))] * 1000
+
+async def main_async(args):
+    embedding_fn = HashEmbedding()
+    service = await ready_chroma_service(embedding_fn)
+    try:
+        started_at = time.perf_counter()
+        service.add_content("bench", make_sources(args.sources, args.chunks))
+        stats = service.get_collection_stats("bench")
+        print(f"session: {len(stats['urls'])} sources, {stats['total_chunks']} chunks "
+              f"(ingested in {time.perf_counter() - started_at:.1f}s)")
+
+        query_embedding = embedding_fn.embed("glacier harbor protocol")
+        old = timed(lambda: scan_then_query(service, "bench", query_embedding), args.repeats)
+        new = timed(lambda: service.search_relevant_content("bench", "", 10, query_embedding), args.repeats)
+        print(f"{'path':>16} {'p50 ms':>8} {'p95 ms':>8}")
+        print(f"{'scan + query':>16} {old[0]:>8.1f} {old[1]:>8.1f}")
+        print(f"{'manifest + query':>16} {new[0]:>8.1f} {new[1]:>8.1f}   ({old[0] / new[0]:.1f}x at p50)")
+    finally:
+        service.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=5)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-chroma-")
+    settings.CHROMA_PERSIST_DIR = directory
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
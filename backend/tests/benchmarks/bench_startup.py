@@ -0,0 +1,77 @@
+"""Application startup time with the vector store warmed in the background vs loaded up front.
+
+"eager" is how the app started before ChromaService was made lazy: the
+client and embedding model were loaded (at import time) before the first
+request could be served. "background" is the current lifespan: the
+container starts the warmup task and serves at once, answering with
+keyword retrieval until the model is ready.
+
+By default the model is a stand-in that takes --model-load-seconds to
+load; --real-model loads EMBEDDING_MODEL_NAME (needs sentence-transformers).
+
+    python -m tests.benchmarks.bench_startup
+    python -m tests.benchmarks.bench_startup --real-model --runs 1
+"""
+import argparse
+import asyncio
+import logging
+import shutil
+import statistics
+import tempfile
+import time
+import httpx
+from app.core import container as container_module
+from app.core.config import settings
+from app.main import app, lifespan
+from app.services.chroma_service import ChromaService
+from tests.fakes import HashEmbedding
+
+class SlowLoadingChromaService(ChromaService):
+    """Loads a stand-in model that takes load_seconds, like a SentenceTransformer from disk"""
+
+    def __init__(self, load_seconds: float):
+        super().__init__()
+        self.load_seconds = load_seconds
+
+    def _create_embedding_function(self):
+        time.sleep(self.load_seconds)
+        return HashEmbedding()
+
+async def one_startup(eager: bool, make_service) -> tuple:
+    container_module.chroma_service = make_service()
+    started_at = time.perf_counter()
+    async with lifespan(app):
+        chroma = app.state.services.chroma_service
+        if eager:
+            await chroma.wait_until_ready(float("inf"))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app") as client:
+            readiness = (await client.get("/health")).json()["readiness"]
+        serving = time.perf_counter() - started_at
+        await chroma.wait_until_ready(float("inf"))
+        ready = time.perf_counter() - started_at
+    return serving * 1000, ready * 1000, readiness
+
+def main(runs: int, load_seconds: float, real_model: bool):
+    logging.disable(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix="bench-startup-")
+    settings.CHROMA_PERSIST_DIR = f"{directory}/chroma_db"
+    settings.PAGE_CACHE_DIR = f"{directory}/page_cache"
+    make_service = ChromaService if real_model else (lambda: SlowLoadingChromaService(load_seconds))
+    try:
+        print(f"{'real model' if real_model else f'stand-in model, {load_seconds:.1f}s load'}, {runs} runs")
+        print(f"{'startup':>12} {'first /health ms':>17} {'model ready ms':>15} {'readiness':>10}")
+        for eager in (True, False):
+            samples = [asyncio.run(one_startup(eager, make_service)) for _ in range(runs)]
+            print(f"{'eager' if eager else 'background':>12} "
+                  f"{statistics.median(s[0] for s in samples):>17.1f} "
+                  f"{statistics.median(s[1] for s in samples):>15.1f} {samples[-1][2]:>10}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--model-load-seconds", type=float, default=2.0)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+    main(args.runs, args.model_load_seconds, args.real_model)
@@ -0,0 +1,8 @@
+import pytest
+from app.core.config import settings
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """Keep the page cache and ChromaDB files of a test run out of the source tree"""
+    monkeypatch.setattr(settings, "PAGE_CACHE_DIR", str(tmp_path / "page_cache"))
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma_db"))
@@ -0,0 +1,21 @@
+"""Saved HTML pages covering the layouts the extractor has to handle"""
+from pathlib import Path
+from typing import List, Tuple
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+# Where each page would have been fetched from; extraction looks at the URL
+PAGE_URLS = {
+    "wikipedia_article": "https://en.wikipedia.org/wiki/Ada_Lovelace",
+    "news_article": "https://harbourgazette.example/news/local/flood-barrier-approved",
+    "docs_page": "https://docs.streamline.example/en/3.2/pooling.html",
+    "blog_plain": "https://allotment.example/2026/10/october-notes",
+    "malformed": "http://harbour-office.example/notices",
+}
+
+def load_pages() -> List[Tuple[str, str, str]]:
+    """(name, url, html) for every saved page, in name order"""
+    return [
+        (path.stem, PAGE_URLS[path.stem], path.read_text(encoding="utf-8"))
+        for path in sorted(PAGES_DIR.glob("*.html"))
+    ]
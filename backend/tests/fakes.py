@@ -0,0 +1,83 @@
+"""Deterministic stand-ins for the embedding model and Redis, for tests and benchmarks"""
+import math
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List
+from app.services.chroma_service import ChromaService
+
+_WORD_RE = re.compile(r'\w+')
+
+class HashEmbedding:
+    """Bag-of-words embedding: each word hashes into one of ``dimensions`` buckets.
+
+    Texts that share words are similar, so retrieval behaves sensibly. The
+    optional delays model the cost of a real model call (fixed overhead plus
+    per text); they sleep, which releases the GIL like a native model does.
+    """
+
+    def __init__(self, dimensions: int = 64, call_delay: float = 0.0, item_delay: float = 0.0):
+        self.dimensions = dimensions
+        self.call_delay = call_delay
+        self.item_delay = item_delay
+        self.calls = 0
+        self.texts = 0
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+            self.texts += len(input)
+            self.batch_sizes.append(len(input))
+        if self.call_delay or self.item_delay:
+            time.sleep(self.call_delay + self.item_delay * len(input))
+        return [self.embed(text) for text in input]
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD_RE.findall(text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+async def ready_chroma_service(embedding_function) -> ChromaService:
+    """A warmed-up ChromaService using the given embedding function (storage per settings)"""
+    service = ChromaService(embedding_function)
+    service.start_warmup()
+    assert await service.wait_until_ready(60)
+    return service
+
+class FakeRedis:
+    """The few redis.asyncio commands AIService uses, kept in a dict (TTLs are recorded, not enforced)"""
+
+    def __init__(self):
+        self.data: Dict[str, object] = {}
+        self.ttls: Dict[str, int] = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def setex(self, key: str, seconds: int, value):
+        self.data[key] = value
+        self.ttls[key] = seconds
+
+    async def lpush(self, key: str, *values):
+        self.data.setdefault(key, [])[:0] = reversed(values)
+
+    async def lrange(self, key: str, start: int, end: int):
+        items = self.data.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def expire(self, key: str, seconds: int):
+        if key in self.data:
+            self.ttls[key] = seconds
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.data.pop(key, None)
+            self.ttls.pop(key, None)
+
+    async def close(self):
+        pass
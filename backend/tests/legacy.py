@@ -0,0 +1,89 @@
+"""Earlier implementations, kept as references for equivalence tests and benchmarks"""
+import re
+
+def legacy_clean_text(text: str) -> str:
+    """PageParser._clean_text as it was before its patterns were compiled (uncompiled regex cascade).
+
+    The backtracking r'\\b(\\w+)\\1+\\b' makes this quadratic on long tokens;
+    only feed it ordinary text.
+    """
+    text = re.sub(r'(Menu|Navigation|Skip to|Home|About|Contact|Privacy|Terms|Edit|View history)', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(\w+)\1+\b', r'\1', text)
+    if 'wikipedia.org' not in text.lower():
+        text = re.sub(r'\b(Born|Died|Age|Occupation|Years active|Spouse|Children|Education|Alma mater)\s*[:\-]?\s*[^\n]*', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s.,!?;:()\-\'""\n]', ' ', text)
+    text = re.sub(r'\.{3,}', '...', text)
+    text = re.sub(r'[.,!?]{2,}', '.', text)
+
+    cleaned_lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) > 10 and not re.match(r'^[\d\s\-\.]+$', line):
+            cleaned_lines.append(line)
+    text = ' '.join(cleaned_lines)
+
+    unique_sentences = []
+    seen = set()
+    for sentence in re.split(r'[.!?]+', text):
+        sentence = sentence.strip()
+        if len(sentence) > 10:
+            normalized = re.sub(r'\s+', ' ', sentence.lower())
+            if normalized not in seen:
+                seen.add(normalized)
+                unique_sentences.append(sentence)
+
+    cleaned_text = '. '.join(unique_sentences)
+    if cleaned_text and not cleaned_text.endswith(('.', '!', '?')):
+        cleaned_text += '.'
+    return cleaned_text.strip()
+
+LEGACY_NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside', 'menu',
+                     'noscript', 'iframe', 'object', 'embed', 'form', 'input', 'button']
+LEGACY_CONTENT_SELECTORS = ['article', 'main', '[role="main"]', '.content', '.post-content', '.entry-content',
+                            '.article-content', '.story-body', '.post-body', '.article-text']
+
+def legacy_extract_content(parser, soup) -> str:
+    """PageParser._extract_content as it was before the single classifying walk.
+
+    Serializes the document to detect Wikipedia, then makes a tag-removal
+    pass, two regex find_all passes and up to ten soup.select calls. Uses
+    the parser's current structured-text and Wikipedia helpers.
+    """
+    page_source = str(soup)[:1000]
+    is_wikipedia = ('wikipedia.org' in page_source or
+                    soup.find(attrs={'class': 'mw-parser-output'}) is not None or
+                    soup.find(attrs={'id': 'mw-content-text'}) is not None)
+    if is_wikipedia:
+        content = parser._extract_wikipedia_content(soup)
+        if content and len(content.strip()) > 50:
+            return content
+
+    for unwanted in soup(LEGACY_NOISE_TAGS):
+        unwanted.decompose()
+    clutter_re = r'(nav|menu|sidebar|footer|header|ad|advertisement|social|share|comment|related)'
+    for clutter in soup.find_all(attrs={'class': re.compile(clutter_re, re.I)}):
+        clutter.decompose()
+    for clutter in soup.find_all(attrs={'id': re.compile(clutter_re, re.I)}):
+        clutter.decompose()
+
+    for selector in LEGACY_CONTENT_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            extracted_content = []
+            for element in elements:
+                text = parser._extract_structured_text(element)
+                if text and len(text.strip()) > 100:
+                    extracted_content.append(text)
+            if extracted_content:
+                return '\n\n'.join(extracted_content)
+
+    body = soup.find('body')
+    if body:
+        paragraphs = body.find_all('p')
+        if len(paragraphs) > 3:
+            paragraph_texts = [p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 30]
+            if paragraph_texts:
+                return '\n\n'.join(paragraph_texts)
+        return body.get_text()
+    return soup.get_text()
@@ -0,0 +1,76 @@
+"""Local HTTP servers for tests and benchmarks (standard library only)"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional
+
+Handler = Callable[[BaseHTTPRequestHandler], None]
+
+def send(request: BaseHTTPRequestHandler, status: int = 200, body: bytes = b"",
+         headers: Optional[Dict[str, str]] = None, content_type: str = "text/html; charset=utf-8"):
+    """Write a complete response with a Content-Length"""
+    request.send_response(status)
+    request.send_header("Content-Type", content_type)
+    for name, value in (headers or {}).items():
+        request.send_header(name, value)
+    request.send_header("Content-Length", str(len(body)))
+    request.end_headers()
+    if request.command != "HEAD":
+        request.wfile.write(body)
+
+@contextmanager
+def local_server(handle: Handler) -> Iterator[str]:
+    """Serve every request with handle(request) on 127.0.0.1; yields the base URL"""
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like real origins
+
+        def do_GET(self):
+            handle(self)
+
+        do_POST = do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def ollama_stream(tokens: List[str], delay: float, timings: Optional[Dict[str, float]] = None) -> Handler:
+    """A fake Ollama /api/generate that streams one NDJSON line per token, delay seconds apart.
+
+    timings, if given, gets the perf_counter times of the "first_token" and
+    of "finished" (the final done line written).
+    """
+    def handle(request: BaseHTTPRequestHandler):
+        request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        request.send_response(200)
+        request.send_header("Content-Type", "application/x-ndjson")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+
+        def write_line(message: dict):
+            line = json.dumps(message).encode() + b"\n"
+            request.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            request.wfile.flush()
+
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(delay)
+            write_line({"response": token, "done": False})
+            if index == 0 and timings is not None:
+                timings["first_token"] = time.perf_counter()
+        time.sleep(delay)
+        write_line({"response": "", "done": True})
+        request.wfile.write(b"0\r\n\r\n")
+        if timings is not None:
+            timings["finished"] = time.perf_counter()
+    return handle
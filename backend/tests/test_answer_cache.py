@@ -0,0 +1,88 @@
+import pytest
+from app.services import answer_cache as answer_cache_module
+from app.services.answer_cache import AnswerCache, context_fingerprint
+
+CONTEXT = [{"url": "https://example.com/harbour", "content": "The north slipway is closed until Friday."}]
+FINGERPRINT = context_fingerprint(CONTEXT)
+STORED = [1.0, 0.0]
+
+def make_cache(**kwargs) -> AnswerCache:
+    options = {"similarity_threshold": 0.6, "max_entries": 100, "ttl_seconds": 60, "max_per_context": 20}
+    options.update(kwargs)
+    return AnswerCache(**options)
+
+def test_similarity_threshold_is_inclusive():
+    cache = make_cache(similarity_threshold=0.6)
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", STORED, "The north slipway.")
+
+    # cos([1, 0], [3, 4]) is exactly 0.6; tilting the query a little drops it below
+    assert cache.get("a", FINGERPRINT, "What slipway is shut?", [3.0, 4.0]) == "The north slipway."
+    assert cache.get("a", FINGERPRINT, "What slipway is shut?", [3.0, 4.01]) is None
+
+def test_identical_wording_matches_without_an_embedding():
+    cache = make_cache()
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", None, "The north slipway.")
+
+    assert cache.get("a", FINGERPRINT, "  which SLIPWAY is   closed?", None) == "The north slipway."
+    assert cache.get("a", FINGERPRINT, "Which slipway is open?", None) is None
+
+def test_questions_differing_only_in_symbols_are_not_served_each_others_answers():
+    cache = make_cache(similarity_threshold=0.92)
+    cache.put("a", FINGERPRINT, "What is C?", [1.0, 0.0], "A systems language.")
+
+    # Dissimilar embeddings must decide; the wording alone must not count as identical
+    assert cache.get("a", FINGERPRINT, "What is C++?", [0.6, 0.8]) is None
+    assert cache.get("a", FINGERPRINT, "what is C#", [0.6, 0.8]) is None
+
+def test_changed_context_misses():
+    cache = make_cache()
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", STORED, "The north slipway.")
+    changed = context_fingerprint([{**CONTEXT[0], "content": "The south slipway is closed until Monday."}])
+
+    assert changed != FINGERPRINT
+    assert cache.get("a", changed, "Which slipway is closed?", STORED) is None
+
+@pytest.mark.parametrize("cross_session", [True, False])
+def test_cross_session_reuse_follows_the_setting(cross_session):
+    cache = make_cache(cross_session=cross_session)
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", STORED, "The north slipway.")
+
+    answer = cache.get("b", FINGERPRINT, "Which slipway is closed?", STORED)
+
+    assert answer == ("The north slipway." if cross_session else None)
+    assert cache.get_stats()["cross_session_hits"] == (1 if cross_session else 0)
+    assert cache.get("a", FINGERPRINT, "Which slipway is closed?", STORED) == "The north slipway."
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache_module.time, "monotonic", lambda: now[0])
+    cache = make_cache(ttl_seconds=60)
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", STORED, "The north slipway.")
+
+    now[0] += 59
+    assert cache.get("a", FINGERPRINT, "Which slipway is closed?", STORED) == "The north slipway."
+    now[0] += 2
+    assert cache.get("a", FINGERPRINT, "Which slipway is closed?", STORED) is None
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0 and stats["contexts"] == 0
+
+def test_max_per_context_evicts_the_oldest_answer():
+    cache = make_cache(max_per_context=2, similarity_threshold=0.99)
+    vectors = {"first": [1.0, 0.0, 0.0], "second": [0.0, 1.0, 0.0], "third": [0.0, 0.0, 1.0]}
+    for name, vector in vectors.items():
+        cache.put("a", FINGERPRINT, f"The {name} question?", vector, f"The {name} answer.")
+
+    assert cache.get("a", FINGERPRINT, "The first question?", vectors["first"]) is None
+    assert cache.get("a", FINGERPRINT, "The third question?", vectors["third"]) == "The third answer."
+    stats = cache.get_stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+def test_hit_and_miss_metrics():
+    cache = make_cache()
+    assert cache.get("a", FINGERPRINT, "Which slipway is closed?", STORED) is None
+    cache.put("a", FINGERPRINT, "Which slipway is closed?", STORED, "The north slipway.")
+    cache.get("a", FINGERPRINT, "Which slipway is closed?", STORED)
+    cache.get("a", FINGERPRINT, "Unrelated?", [0.0, 1.0])
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["hit_rate"]) == (1, 2, 1, 0.333)
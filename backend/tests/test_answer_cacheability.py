@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.free_ai_service import FreeAIService
+
+CONTEXT = [{"url": "https://example.com/harbour", "title": "Harbour notices",
+            "content": "The north slipway is closed for resurfacing until Friday."}]
+
+@pytest.fixture(autouse=True)
+def free_service_only(monkeypatch):
+    async def fake_context(self, session_id, query=""):
+        return CONTEXT
+
+    monkeypatch.setattr(AIService, "_get_context", fake_context)
+    monkeypatch.setattr(settings, "USE_OLLAMA", False)
+
+def answer_twice(monkeypatch, model_answer, stream: bool):
+    """Ask the same question twice; returns (model calls, answer cache stats)"""
+    calls = []
+
+    async def huggingface(self, question, context):
+        calls.append(question)
+        return model_answer
+
+    monkeypatch.setattr(FreeAIService, "_answer_with_huggingface", huggingface)
+
+    async def scenario():
+        ai_service = AIService()
+        for _ in range(2):
+            if stream:
+                async for _ in ai_service.stream_answer("Which slipway is closed?", "harbour"):
+                    pass
+            else:
+                await ai_service.answer_question("Which slipway is closed?", "harbour")
+        await ai_service.free_ai_service.close()
+        return ai_service.answer_cache.get_stats()
+
+    return calls, asyncio.run(scenario())
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_model_answers_are_cached(monkeypatch, stream):
+    calls, stats = answer_twice(monkeypatch, "The north slipway is closed until Friday.", stream)
+    assert len(calls) == 1
+    assert stats["stores"] == 1 and stats["hits"] == 1
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_keyword_fallback_answers_are_not_cached(monkeypatch, stream):
+    calls, stats = answer_twice(monkeypatch, None, stream)
+    assert len(calls) == 2
+    assert stats["stores"] == 0 and stats["hits"] == 0
+
+def test_free_service_reports_cacheability(monkeypatch):
+    async def no_answer(self, question, context):
+        return None
+
+    async def scenario():
+        service = FreeAIService()
+        origin = {}
+        await service.answer_question("Which slipway is closed?", CONTEXT, "harbour", use_ollama=False, origin=origin)
+        await service.close()
+        return origin
+
+    monkeypatch.setattr(FreeAIService, "_answer_with_huggingface", no_answer)
+    assert asyncio.run(scenario()) == {"cacheable": False}
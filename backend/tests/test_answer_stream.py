@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services.ai_service import AIService
+from app.services.free_ai_service import FreeAIService, KEYWORD_ANSWER_CONFIDENCE
+from app.services.tts_service import TTSService
+from tests.servers import local_server, ollama_stream
+
+CONTEXT = [{"url": "https://example.com/harbour", "title": "Harbour notices",
+            "content": "The north slipway is closed for resurfacing until Friday."}]
+
+@pytest.fixture(autouse=True)
+def keyword_answers_only(monkeypatch):
+    """One known session, answered by the keyword fallback (no model reachable)"""
+    async def fake_context(self, session_id, query=""):
+        return CONTEXT if session_id == "known" else None
+
+    async def no_answer(self, question, context):
+        return None
+
+    monkeypatch.setattr(AIService, "_get_context", fake_context)
+    monkeypatch.setattr(settings, "USE_OLLAMA", False)
+    monkeypatch.setattr(FreeAIService, "_answer_with_huggingface", no_answer)
+
+def sse_events(body: str):
+    events = []
+    for message in body.strip().split("\n\n"):
+        event, data = message.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def test_unknown_session_is_rejected_before_the_stream_starts():
+    with TestClient(app) as client:
+        response = client.post("/api/ask/stream", json={"question": "Which slipway is closed?", "session_id": "unknown"})
+    assert response.status_code == 400
+    assert "No content available" in response.json()["detail"]
+
+def test_done_event_reports_the_answer_confidence():
+    with TestClient(app) as client:
+        response = client.post("/api/ask/stream", json={"question": "Which slipway is closed?", "session_id": "known"})
+    assert response.status_code == 200
+    events = sse_events(response.text)
+    assert [event for event, _ in events][0] == "sources"
+    done = events[-1][1]
+    assert events[-1][0] == "done" and not done["cached"]
+    assert done["confidence"] == KEYWORD_ANSWER_CONFIDENCE
+
+def test_ask_and_speak_rejects_unknown_session_before_the_stream_starts():
+    with TestClient(app) as client:
+        response = client.post("/api/ask/speak", json={"question": "Which slipway is closed?", "session_id": "unknown"})
+    assert response.status_code == 400
+    assert "No content available" in response.json()["detail"]
+
+def test_ask_and_speak_replays_the_first_event(monkeypatch):
+    async def no_speech(self, text, voice_id=None):
+        raise RuntimeError("no TTS provider in tests")
+
+    monkeypatch.setattr(TTSService, "generate_speech", no_speech)
+    with TestClient(app) as client:
+        response = client.post("/api/ask/speak", json={"question": "Which slipway is closed?", "session_id": "known"})
+    assert response.status_code == 200
+    events = sse_events(response.text)
+    assert events[0] == ("sources", {"sources": [CONTEXT[0]["url"]], "session_id": "known"})
+    assert "done" in [event for event, _ in events]
+
+def test_first_token_is_relayed_while_the_provider_is_still_generating(monkeypatch):
+    tokens = ["The", " north", " slipway", " is", " closed", " until", " Friday."]
+    timings = {}
+
+    async def scenario():
+        ai_service = AIService()
+        received = []
+        try:
+            async for event, data in ai_service.stream_answer("Which slipway is closed?", "known"):
+                received.append((time.perf_counter(), event, data))
+        finally:
+            await ai_service.free_ai_service.close()
+        return received
+
+    with local_server(ollama_stream(tokens, delay=0.1, timings=timings)) as base_url:
+        monkeypatch.setattr(settings, "USE_OLLAMA", True)
+        monkeypatch.setattr(settings, "OLLAMA_BASE_URL", base_url)
+        started_at = time.perf_counter()
+        received = asyncio.run(scenario())
+
+    token_times = [at for at, event, _ in received if event == "token"]
+    assert [data["text"] for _, event, data in received if event == "token"] == tokens
+    # The provider takes 0.7s to finish; the first token must not wait for it
+    assert token_times[0] < timings["finished"] - 0.4
+    done = received[-1][2]
+    assert received[-1][1] == "done" and done["answer"] == "".join(tokens)
+    assert done["time_to_first_token_ms"] < (timings["finished"] - started_at) * 1000 - 400
@@ -0,0 +1,65 @@
+import asyncio
+import random
+import statistics
+import time
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+WORDS = ("river mountain engine protocol garden violin harbor census glacier lantern "
+         "orbit meadow quartz sonnet timber walrus cipher dynamo falcon kernel").split()
+
+def make_page(url: str, paragraphs: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    blocks = [" ".join(rng.choice(WORDS) for _ in range(120)) + "." for _ in range(paragraphs)]
+    return {"url": url, "title": url, "content": "\n\n".join(blocks), "blocks": blocks}
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def test_asks_stay_fast_while_another_session_ingests():
+    async def scenario():
+        # ~0.15s of "model" time per 64-chunk ingest batch, a few ms per query
+        service = await ready_chroma_service(HashEmbedding(call_delay=0.003, item_delay=0.002))
+        try:
+            assert await service.aadd_content("reader", [make_page("https://a.example/", 20, 1)])
+
+            async def ask(phase, count):
+                latencies = []
+                for i in range(count):
+                    started_at = time.perf_counter()
+                    results = await service.asearch_relevant_content("reader", f"{phase} {WORDS[i % len(WORDS)]} question {i}")
+                    latencies.append(time.perf_counter() - started_at)
+                    assert results
+                    await asyncio.sleep(0.01)
+                return latencies
+
+            async def loop_lag(stop: asyncio.Event):
+                worst = 0.0
+                while not stop.is_set():
+                    started_at = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    worst = max(worst, time.perf_counter() - started_at - 0.005)
+                return worst
+
+            idle = await ask("idle", 20)
+
+            stop = asyncio.Event()
+            lag = asyncio.create_task(loop_lag(stop))
+            ingest = asyncio.create_task(service.aadd_content(
+                "bulk", [make_page(f"https://b.example/{i}", 150, i + 10) for i in range(5)]
+            ))
+            busy = await ask("busy", 40)
+            ingest_running = not ingest.done()
+            assert await ingest
+            stop.set()
+            return idle, busy, ingest_running, await lag
+        finally:
+            service.shutdown()
+
+    idle, busy, ingest_running, worst_lag = asyncio.run(scenario())
+
+    assert ingest_running, "the ingest finished before the asks were measured"
+    # The event loop never blocks on the ingest, and asks don't queue behind it
+    assert worst_lag < 0.1
+    assert percentile(busy, 0.95) < max(3 * percentile(idle, 0.95), percentile(idle, 0.95) + 0.1)
+    assert statistics.median(busy) < 0.1
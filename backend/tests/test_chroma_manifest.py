@@ -0,0 +1,74 @@
+import asyncio
+from chromadb.api.models.Collection import Collection
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+def page(url: str, topic: str) -> dict:
+    blocks = [f"{topic} paragraph {i} explains the {topic} in some detail." for i in range(3)]
+    return {"url": url, "title": topic, "content": "\n\n".join(blocks), "blocks": blocks}
+
+def count_gets(monkeypatch) -> list:
+    calls = []
+    original = Collection.get
+
+    def counting_get(self, *args, **kwargs):
+        calls.append(kwargs)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, "get", counting_get)
+    return calls
+
+def test_search_uses_the_manifest_instead_of_scanning_the_session(monkeypatch):
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("s1", [page("https://a.example/", "volcano"), page("https://b.example/", "glacier")])
+            gets = count_gets(monkeypatch)
+            results = service.search_relevant_content("s1", "volcano", max_results=4)
+            return results, gets, service.get_collection_stats("s1")
+        finally:
+            service.shutdown()
+
+    results, gets, stats = asyncio.run(scenario())
+
+    # Only the text of the rows the query returned (up to 2 * max_results) is read back, by id
+    assert len(gets) == 1 and gets[0]["include"] == ["documents"]
+    assert len(gets[0]["ids"]) <= 8
+    assert {item["url"] for item in results} == {"https://a.example/", "https://b.example/"}
+    assert max(results, key=lambda item: item["relevance_score"])["url"] == "https://a.example/"
+    assert stats["urls"] == ["https://a.example/", "https://b.example/"]
+
+def test_manifest_follows_appends_and_clears():
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("s1", [page("https://a.example/", "volcano")])
+            service.add_content("s1", [page("https://b.example/", "glacier")], replace=False)
+            appended = service.get_collection_stats("s1")
+            service.clear_session_content("s1")
+            cleared = service.get_collection_stats("s1")
+            return appended, cleared, service.search_relevant_content("s1", "volcano")
+        finally:
+            service.shutdown()
+
+    appended, cleared, results = asyncio.run(scenario())
+
+    assert appended["urls"] == ["https://a.example/", "https://b.example/"]
+    assert cleared == {"total_chunks": 0, "urls": []}
+    assert results == []
+
+def test_manifest_is_rebuilt_for_sessions_persisted_before_a_restart():
+    async def scenario():
+        first = await ready_chroma_service(HashEmbedding())
+        first.add_content("s1", [page("https://a.example/", "volcano"), page("https://b.example/", "glacier")])
+        first.shutdown()
+
+        restarted = await ready_chroma_service(HashEmbedding())
+        try:
+            return restarted.get_collection_stats("s1"), restarted.search_relevant_content("s1", "glacier")
+        finally:
+            restarted.shutdown()
+
+    stats, results = asyncio.run(scenario())
+
+    assert sorted(stats["urls"]) == ["https://a.example/", "https://b.example/"]
+    assert max(results, key=lambda item: item["relevance_score"])["url"] == "https://b.example/"
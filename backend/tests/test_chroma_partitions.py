@@ -0,0 +1,68 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+def page(url: str, topic: str) -> dict:
+    blocks = [f"All about the {topic}, part {i}." for i in range(2)]
+    return {"url": url, "title": topic, "content": "\n\n".join(blocks), "blocks": blocks}
+
+@pytest.fixture(params=["shared", "sharded", "per_session"])
+def partition_mode(request, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_PARTITION_MODE", request.param)
+    monkeypatch.setattr(settings, "CHROMA_SHARD_COUNT", 4)
+    return request.param
+
+def test_sessions_only_see_their_own_chunks(partition_mode):
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            for n in range(6):
+                service.add_content(f"tenant-{n}", [page(f"https://t{n}.example/", f"topic{n}")])
+            return {
+                n: {item["url"] for item in service.search_relevant_content(f"tenant-{n}", f"topic{(n + 1) % 6}")}
+                for n in range(6)
+            }
+        finally:
+            service.shutdown()
+
+    urls = asyncio.run(scenario())
+
+    assert urls == {n: {f"https://t{n}.example/"} for n in range(6)}
+
+def test_clearing_a_session_leaves_the_others(partition_mode):
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("a", [page("https://a.example/", "volcano")])
+            service.add_content("b", [page("https://b.example/", "volcano")])
+            service.clear_session_content("a")
+            collections = {c.name for c in service.client.list_collections()}
+            return (service.search_relevant_content("a", "volcano"),
+                    service.search_relevant_content("b", "volcano"), collections)
+        finally:
+            service.shutdown()
+
+    cleared, kept, collections = asyncio.run(scenario())
+
+    assert cleared == []
+    assert {item["url"] for item in kept} == {"https://b.example/"}
+    if partition_mode == "per_session":
+        assert "session_a" not in collections and "session_b" in collections
+
+def test_stale_sessions_are_purged_but_live_ones_kept(partition_mode):
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("stale", [page("https://s.example/", "volcano")])
+            service.add_content("live", [page("https://l.example/", "volcano")])
+            purged = service.purge_stale_sessions(time.time() + 1, live_sessions={"live"}, limit=10)
+            return purged, service.search_relevant_content("live", "volcano")
+        finally:
+            service.shutdown()
+
+    purged, live_results = asyncio.run(scenario())
+
+    assert purged == ["stale"]
+    assert live_results
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.services import ai_service as ai_service_module
+from app.services import chroma_service as chroma_service_module
+from app.services.ai_service import AIService
+from app.services.chroma_service import ChromaService
+from tests.fakes import HashEmbedding
+
+PAGE = {"url": "https://example.com/harbour", "title": "Harbour notices",
+        "content": "The north slipway is closed for resurfacing until Friday."}
+
+def test_warming_becomes_ready_once_the_model_has_loaded():
+    async def scenario():
+        service = ChromaService(HashEmbedding(call_delay=0.3))
+        try:
+            service.start_warmup()
+            states = [service.state]
+            ready = await service.wait_until_ready(10)
+            return states, ready, service.get_readiness()
+        finally:
+            service.shutdown()
+
+    states, ready, readiness = asyncio.run(scenario())
+
+    assert states == ["warming"]
+    assert ready
+    assert readiness["state"] == "ready" and readiness["warmup_seconds"] >= 0.3
+
+def test_wait_until_ready_gives_up_after_its_timeout():
+    async def scenario():
+        service = ChromaService(HashEmbedding(call_delay=1.0))
+        try:
+            service.start_warmup()
+            started_at = time.perf_counter()
+            ready = await service.wait_until_ready(0.05)
+            return ready, time.perf_counter() - started_at, service.state, service.is_ready
+        finally:
+            service.shutdown()
+
+    ready, waited, state, is_ready = asyncio.run(scenario())
+
+    assert not ready and not is_ready
+    assert waited < 0.5
+    assert state == "warming"
+
+def test_failing_client_leaves_the_store_degraded(monkeypatch):
+    def broken_client(*args, **kwargs):
+        raise RuntimeError("disk unavailable")
+
+    monkeypatch.setattr(chroma_service_module.chromadb, "PersistentClient", broken_client)
+    monkeypatch.setattr(chroma_service_module.chromadb, "Client", broken_client)
+
+    async def scenario():
+        service = ChromaService(HashEmbedding())
+        try:
+            service.start_warmup()
+            ready = await service.wait_until_ready(10)
+            return ready, service.state, service.search_relevant_content("s", "slipway")
+        finally:
+            service.shutdown()
+
+    ready, state, results = asyncio.run(scenario())
+
+    assert not ready and state == "degraded"
+    assert results == []
+
+@pytest.mark.parametrize("failing", [False, True])
+def test_questions_during_warmup_use_keyword_retrieval(monkeypatch, failing):
+    def broken_model(texts):
+        raise RuntimeError("model weights missing")
+
+    monkeypatch.setattr(settings, "CHROMA_QUERY_WARMUP_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "CHROMA_INGEST_WARMUP_WAIT_SECONDS", 0.05)
+
+    async def scenario():
+        service = ChromaService(broken_model if failing else HashEmbedding(call_delay=1.0))
+        monkeypatch.setattr(ai_service_module, "chroma_service", service)
+        ai_service = AIService()
+        try:
+            service.start_warmup()
+            if failing:
+                await service.wait_until_ready(10)
+            stored_in_chroma = await ai_service.store_context("s", [PAGE])
+            started_at = time.perf_counter()
+            context = await ai_service._get_context("s", query="Which slipway is closed?")
+            return stored_in_chroma, context, time.perf_counter() - started_at, service.state
+        finally:
+            await ai_service.close()
+            service.shutdown()
+
+    stored_in_chroma, context, waited, state = asyncio.run(scenario())
+
+    assert state == ("degraded" if failing else "warming")
+    assert not stored_in_chroma
+    assert [item["url"] for item in context] == [PAGE["url"]]
+    assert waited < 0.5
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from tests.fakes import HashEmbedding, ready_chroma_service
+
+def page(url: str, topic: str) -> dict:
+    blocks = [f"{topic.title()} section {i} covers one aspect of the {topic}." for i in range(4)]
+    return {"url": url, "title": topic, "content": "\n\n".join(blocks), "blocks": blocks}
+
+def test_repeat_ingest_of_a_known_page_embeds_nothing():
+    async def scenario():
+        embedding = HashEmbedding()
+        service = await ready_chroma_service(embedding)
+        try:
+            service.add_content("first", [page("https://wiki.example/Volcano", "volcano")])
+            first = embedding.texts
+            service.add_content("repeat", [page("https://wiki.example/Volcano", "volcano")])
+            repeat = embedding.texts
+            service.add_content("mixed", [page("https://wiki.example/Volcano", "volcano"),
+                                          page("https://wiki.example/Glacier", "glacier")])
+            return (first, repeat, service.get_dedup_stats(),
+                    service.search_relevant_content("repeat", "volcano"),
+                    service.chunk_store.get(include=["documents"]),
+                    service.collection.get(include=["documents", "metadatas"]))
+        finally:
+            service.shutdown()
+
+    first, repeat, stats, results, stored, rows = asyncio.run(scenario())
+
+    assert repeat == first
+    chunks_per_page = stats["chunks_embedded"] // 2
+    assert stats["chunks_reused"] == 2 * chunks_per_page
+    assert {item["url"] for item in results} == {"https://wiki.example/Volcano"}
+    assert all(item["content"].startswith("Volcano section") for item in results)
+    # Each chunk's text is stored once; session rows only reference it
+    assert len(stored["ids"]) == 2 * chunks_per_page
+    assert all(stored["documents"])
+    assert len(rows["ids"]) == 4 * chunks_per_page
+    assert not any(rows["documents"])
+    assert {meta["chunk_hash"] for meta in rows["metadatas"]} == set(stored["ids"])
+
+def test_chunks_no_session_used_since_the_cutoff_are_purged():
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("s1", [page("https://wiki.example/Volcano", "volcano")])
+            service.add_content("s2", [page("https://wiki.example/Glacier", "glacier")])
+            recent = service.purge_stale_chunks(time.time() - 60, limit=100)
+            service.clear_session_content("s1")
+            # s2's chunks are old but still referenced, so only s1's go
+            purged = service.purge_stale_chunks(time.time() + 1, limit=100)
+            return recent, purged, service.chunk_store.count(), service.search_relevant_content("s2", "glacier")
+        finally:
+            service.shutdown()
+
+    recent, purged, remaining, results = asyncio.run(scenario())
+
+    assert recent == 0
+    assert purged == remaining > 0
+    assert results and all(item["content"].startswith("Glacier section") for item in results)
+
+def test_reusing_a_chunk_refreshes_an_old_last_use():
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        try:
+            service.add_content("s1", [page("https://wiki.example/Volcano", "volcano")])
+            ids = service.chunk_store.get(include=[])["ids"]
+            long_ago = time.time() - 7 * 86400
+            service.chunk_store.update(ids=ids, metadatas=[{"last_used_at": long_ago} for _ in ids])
+            service.add_content("s2", [page("https://wiki.example/Volcano", "volcano")])
+            return [meta["last_used_at"] for meta in service.chunk_store.get(ids=ids)["metadatas"]]
+        finally:
+            service.shutdown()
+
+    last_used = asyncio.run(scenario())
+
+    assert all(timestamp > time.time() - 60 for timestamp in last_used)
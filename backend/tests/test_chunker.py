@@ -0,0 +1,41 @@
+from app.services.chunker import BLOCK_SEPARATOR, Chunker
+from app.services.page_parser import PageParser
+from tests.corpus import load_pages
+
+def test_chunk_offsets_match_the_joined_blocks():
+    blocks = ["Pool limits", "The pool is bounded by two limits. " * 30, "Closing clients",
+              "Close a client when your application shuts down. " * 10]
+    source = BLOCK_SEPARATOR.join(blocks)
+    chunks = Chunker(max_tokens=64, overlap_tokens=8).chunk(blocks)
+    assert len(chunks) > 3
+    for chunk in chunks:
+        assert chunk.text and chunk.text == source[chunk.char_start:chunk.char_end]
+        assert chunk.tokens <= 64
+
+def test_overlong_sentence_is_split_into_consecutive_pieces():
+    # One 600-word sentence in the second block, far over the budget
+    words = [f"word{i}" for i in range(600)]
+    blocks = ["Heading", " ".join(words) + "."]
+    source = BLOCK_SEPARATOR.join(blocks)
+    chunks = Chunker(max_tokens=64, overlap_tokens=0).chunk(blocks)
+    assert all(chunk.text == source[chunk.char_start:chunk.char_end] for chunk in chunks)
+    # Every word lands in a chunk, in order, without gaps or empty pieces
+    covered = " ".join(chunk.text for chunk in chunks).replace("Heading", "").split()
+    assert covered[0] == "word0" and covered[-1] == "word599."
+    assert [word.rstrip(".") for word in covered] == words
+
+def test_heading_starts_a_new_section_once_the_chunk_is_half_full():
+    blocks = ["First section", "Alpha beta gamma delta epsilon. " * 6, "Second section", "Zeta eta theta."]
+    chunks = Chunker(max_tokens=64, overlap_tokens=8).chunk(blocks)
+    assert chunks[-1].text.startswith("Second section")
+
+def test_parsed_blocks_are_cleaned_like_the_page_text():
+    parser = PageParser("html.parser")
+    for name, url, html in load_pages():
+        result = parser.parse(url, html)
+        for block in result.blocks:
+            assert "¶" not in block and "\n" not in block, name
+            assert block.strip(" 0123456789-."), name
+    docs = next(parser.parse(url, html) for name, url, html in load_pages() if name == "docs_page")
+    # Headings survive cleaning so the chunker can use them as section breaks
+    assert any(block.startswith("Pool limits") for block in docs.blocks)
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.http import create_http_client
+from app.main import app
+from app.models.schemas import ExtractionResponse
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import GROQ_AVAILABLE, AIService
+from app.services import tts_service as tts_service_module
+from app.services.content_extractor import ContentExtractorService
+from app.services.tts_service import OPENAI_AVAILABLE, TTSService
+
+def test_services_are_shared_across_requests_and_closed_on_shutdown(monkeypatch):
+    extractors = []
+
+    async def fake_extract(self, urls):
+        extractors.append(self)
+        return ExtractionResponse(success=False, extracted_content=[], total_word_count=0)
+
+    monkeypatch.setattr(ContentExtractorService, "extract_from_urls", fake_extract)
+
+    with TestClient(app) as client:
+        services = app.state.services
+        for _ in range(3):
+            response = client.post("/api/links", json={"urls": ["https://example.com/"]})
+            assert response.status_code == 200
+
+        assert extractors == [services.content_extractor] * 3
+        assert not services.content_extractor.session.is_closed
+        assert not services.ai_service.free_ai_service.session.is_closed
+
+    assert services.content_extractor.session.is_closed
+    assert services.ai_service.free_ai_service.session.is_closed
+
+@pytest.mark.skipif(not GROQ_AVAILABLE, reason="groq SDK not installed")
+def test_provider_sdk_uses_a_pooled_http_client(monkeypatch):
+    created = []
+
+    def recording_client(*args, **kwargs):
+        created.append(create_http_client(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(ai_service_module, "create_http_client", recording_client)
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "USE_GROQ", True)
+
+    async def scenario():
+        ai_service = AIService()
+        http_client = ai_service.groq_client._client
+        await ai_service.close()
+        return http_client
+
+    http_client = asyncio.run(scenario())
+
+    assert created == [http_client]
+    assert http_client.is_closed
+
+@pytest.mark.skipif(not OPENAI_AVAILABLE, reason="openai SDK not installed")
+def test_openai_tts_uses_a_pooled_http_client(monkeypatch):
+    created = []
+
+    def recording_client(*args, **kwargs):
+        created.append(create_http_client(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(tts_service_module, "create_http_client", recording_client)
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "ELEVENLABS_API_KEY", "")
+
+    async def scenario():
+        tts_service = TTSService()
+        http_client = tts_service.openai_client._client
+        await tts_service.close()
+        return http_client
+
+    http_client = asyncio.run(scenario())
+
+    assert created == [http_client]
+    assert http_client.is_closed
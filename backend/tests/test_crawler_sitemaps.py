@@ -0,0 +1,82 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.services.content_extractor import ContentExtractorService
+from app.services.crawler import SiteCrawler
+from tests.servers import local_server, send
+
+@pytest.fixture(autouse=True)
+def inline_parsing(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+
+def urlset(urls) -> bytes:
+    entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+def sitemap_index(urls) -> bytes:
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return (f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f'{entries}</sitemapindex>').encode()
+
+def read_sitemap(url: str, **crawler_options):
+    async def scenario():
+        extractor = ContentExtractorService()
+        crawler = SiteCrawler(extractor, ai_service=None, **crawler_options)
+        try:
+            urls = await crawler._read_sitemap(url, 100)
+            return urls, crawler.sitemap_executor.get_stats()
+        finally:
+            crawler.close()
+            await extractor.close()
+    return asyncio.run(scenario())
+
+def test_sitemap_index_only_follows_same_site_children():
+    off_site_requests = []
+
+    def off_site(request):
+        off_site_requests.append(request.path)
+        send(request, body=urlset(["http://elsewhere.example/spam"]), content_type="application/xml")
+
+    with local_server(off_site) as other:
+        other_port = other.rsplit(":", 1)[1]
+
+        def handle(request):
+            base = f"http://127.0.0.1:{request.server.server_port}"
+            bodies = {
+                "/sitemap.xml": sitemap_index([f"{base}/pages-1.xml", f"{base}/pages-2.xml",
+                                               # Another host name for a server on this machine
+                                               f"http://localhost:{other_port}/sitemap.xml"]),
+                "/pages-1.xml": urlset([f"{base}/a", f"{base}/b"]),
+                "/pages-2.xml": urlset([f"{base}/c"]),
+            }
+            send(request, body=bodies[request.path], content_type="application/xml")
+
+        with local_server(handle) as base:
+            urls, parse_stats = read_sitemap(f"{base}/sitemap.xml")
+
+    assert urls == [f"{base}/a", f"{base}/b", f"{base}/c"]
+    assert off_site_requests == []
+    # Every sitemap file was parsed on the executor, not the event loop
+    assert parse_stats["completed"] == 3
+
+def test_slow_drip_sitemap_hits_the_deadline():
+    def handle(request):
+        request.send_response(200)
+        request.send_header("Content-Type", "application/xml")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+        try:
+            for _ in range(100):
+                request.wfile.write(b"5\r\n<url>\r\n")
+                request.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            request.close_connection = True
+
+    with local_server(handle) as base:
+        started_at = time.perf_counter()
+        with pytest.raises(ValueError, match="did not download within 0.5s"):
+            read_sitemap(f"{base}/sitemap.xml", sitemap_timeout=0.5)
+        assert time.perf_counter() - started_at < 2.0
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.services.content_extractor import ContentExtractorService
+from tests.servers import local_server, send
+
+MAX_BYTES = 64 * 1024
+
+@pytest.fixture(autouse=True)
+def small_limits(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTOR_MAX_PAGE_BYTES", MAX_BYTES)
+    monkeypatch.setattr(settings, "EXTRACTOR_DOWNLOAD_TIMEOUT_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+
+def big_page(paragraphs: int) -> bytes:
+    body = "".join(f"<p>Paragraph {i} of the archive describes one more ferry timetable change.</p>"
+                   for i in range(paragraphs))
+    return f"<html><head><title>Archive</title></head><body>{body}</body></html>".encode()
+
+def extract(url: str):
+    async def scenario():
+        service = ContentExtractorService()
+        try:
+            started_at = time.perf_counter()
+            result = await service.extract_url(url)
+            return result, time.perf_counter() - started_at
+        finally:
+            await service.close()
+    return asyncio.run(scenario())
+
+def write_chunked(request, parts, delay: float = 0.0, content_type: str = "text/html"):
+    """Stream parts with chunked encoding (no Content-Length); stops quietly if the client leaves"""
+    request.send_response(200)
+    request.send_header("Content-Type", content_type)
+    request.send_header("Transfer-Encoding", "chunked")
+    request.end_headers()
+    try:
+        for part in parts:
+            request.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            request.wfile.flush()
+            if delay:
+                time.sleep(delay)
+        request.wfile.write(b"0\r\n\r\n")
+    except OSError:
+        request.close_connection = True
+
+def test_declared_oversized_page_is_rejected_before_the_body():
+    page = big_page(4000)
+    assert len(page) > MAX_BYTES
+    with local_server(lambda request: send(request, body=page)) as base:
+        result, _ = extract(f"{base}/archive")
+    assert not result.success
+    assert "too large" in result.error_message
+
+def test_undeclared_oversized_page_is_rejected_once_past_the_cap():
+    page = big_page(4000)
+    # One part per 0.05s: reading the whole body would take 2s and hit the 1s deadline
+    parts = [page[i:i + 8192] for i in range(0, len(page), 8192)]
+    with local_server(lambda request: write_chunked(request, parts, delay=0.05)) as base:
+        result, elapsed = extract(f"{base}/archive")
+    assert not result.success
+    assert "too large" in result.error_message
+    assert elapsed < settings.EXTRACTOR_DOWNLOAD_TIMEOUT_SECONDS
+
+def test_undeclared_page_within_the_cap_is_read_whole():
+    page = big_page(700)
+    assert len(page) < MAX_BYTES
+    parts = [page[i:i + 8192] for i in range(0, len(page), 8192)]
+    with local_server(lambda request: write_chunked(request, parts)) as base:
+        result, _ = extract(f"{base}/archive")
+    assert result.success
+    assert "Paragraph 699 " in result.content
+
+def test_slow_drip_body_hits_the_download_deadline():
+    parts = [b"<html><body><p>"] + [b"drip " for _ in range(100)]
+    with local_server(lambda request: write_chunked(request, parts, delay=0.1)) as base:
+        result, elapsed = extract(f"{base}/slow")
+    assert not result.success
+    assert "timed out" in result.error_message
+    # The 30s client read timeout never fires: each chunk arrives well within it
+    assert elapsed < settings.EXTRACTOR_DOWNLOAD_TIMEOUT_SECONDS + 1.0
+
+@pytest.mark.parametrize("content_type", ["application/pdf", "image/png", "application/json"])
+def test_non_html_content_types_are_rejected(content_type):
+    body = b"%PDF-1.7 " + b"x" * 1024
+    with local_server(lambda request: send(request, body=body, content_type=content_type)) as base:
+        result, _ = extract(f"{base}/file")
+    assert not result.success
+    assert f"Unsupported content type '{content_type}'" in result.error_message
+
+def test_html_without_content_type_is_accepted():
+    page = big_page(10)
+
+    def handle(request):
+        request.send_response(200)
+        request.send_header("Content-Length", str(len(page)))
+        request.end_headers()
+        request.wfile.write(page)
+
+    with local_server(handle) as base:
+        result, _ = extract(f"{base}/untyped")
+    assert result.success
+    assert "Paragraph 9 " in result.content
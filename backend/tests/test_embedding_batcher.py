@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from app.core.executor import BoundedExecutor
+from app.services.embeddings import EmbeddingBatcher
+from tests.fakes import HashEmbedding
+
+def run_with_batcher(scenario, embedding=None, **kwargs):
+    async def main():
+        executor = BoundedExecutor("test-embed", 2)
+        batcher = EmbeddingBatcher(embedding or HashEmbedding(), executor, **kwargs)
+        try:
+            return await scenario(batcher)
+        finally:
+            executor.shutdown(wait=False)
+    return asyncio.run(main())
+
+def test_concurrent_queries_share_one_model_call():
+    embedding = HashEmbedding()
+    questions = [f"question number {i}" for i in range(16)]
+
+    async def scenario(batcher):
+        return await asyncio.gather(*(batcher.embed(q) for q in questions))
+
+    vectors = run_with_batcher(scenario, embedding, max_batch_size=32, max_wait_ms=20)
+
+    assert embedding.batch_sizes == [16]
+    assert vectors == [embedding.embed(q) for q in questions]
+
+def test_full_batch_flushes_without_waiting_and_duplicates_are_embedded_once():
+    embedding = HashEmbedding()
+
+    async def scenario(batcher):
+        return await asyncio.gather(*(batcher.embed(f"q{i % 3}") for i in range(8)))
+
+    # A 10s wait would time the test out if the size trigger did not flush
+    vectors = run_with_batcher(scenario, embedding, max_batch_size=4, max_wait_ms=10_000)
+
+    assert embedding.batch_sizes == [3, 3]
+    assert vectors[0] == vectors[3] == embedding.embed("q0")
+
+def test_model_failure_reaches_every_waiter():
+    def broken(texts):
+        raise RuntimeError("model crashed")
+
+    async def scenario(batcher):
+        return await asyncio.gather(*(batcher.embed(f"q{i}") for i in range(3)), return_exceptions=True)
+
+    results = run_with_batcher(scenario, broken, max_wait_ms=5)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_cancelled_caller_is_left_out_of_the_batch():
+    embedding = HashEmbedding()
+
+    async def scenario(batcher):
+        cancelled = asyncio.ensure_future(batcher.embed("abandoned"))
+        kept = asyncio.ensure_future(batcher.embed("kept"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+
+    vector = run_with_batcher(scenario, embedding, max_wait_ms=10)
+
+    assert embedding.batch_sizes == [1]
+    assert vector == embedding.embed("kept")
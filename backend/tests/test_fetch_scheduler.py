@@ -0,0 +1,80 @@
+import asyncio
+import time
+import httpx
+from app.services.fetch_scheduler import FetchScheduler
+
+def responder(*statuses, headers=None):
+    """A send() returning the given statuses in turn; records when each call started"""
+    calls = []
+
+    async def send():
+        calls.append(time.perf_counter())
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, headers=headers if status == 429 else None), None
+
+    return send, calls
+
+def test_retry_after_on_one_host_does_not_delay_other_hosts():
+    async def scenario():
+        # One global slot: before the fix the throttled host slept while holding it
+        scheduler = FetchScheduler(max_concurrency=1, per_host_concurrency=1, per_host_rate=0,
+                                   max_retries=1, backoff_base=0.01)
+        send_throttled, throttled_calls = responder(429, 200, headers={"Retry-After": "3"})
+        send_other, _ = responder(200)
+
+        throttled = asyncio.create_task(scheduler.fetch("http://throttled.example/a", send_throttled))
+        while not throttled_calls:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+
+        started_at = time.perf_counter()
+        response, _ = await scheduler.fetch("http://other.example/", send_other)
+        other_elapsed = time.perf_counter() - started_at
+
+        retried, _ = await throttled
+        return response, other_elapsed, retried, throttled_calls
+
+    response, other_elapsed, retried, throttled_calls = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert other_elapsed < 0.5
+    assert retried.status_code == 200
+    assert throttled_calls[1] - throttled_calls[0] >= 3.0
+
+def test_retry_after_pauses_other_requests_to_the_same_host():
+    async def scenario():
+        scheduler = FetchScheduler(max_concurrency=4, per_host_concurrency=4, per_host_rate=0,
+                                   max_retries=1, backoff_base=0.01)
+        send_throttled, throttled_calls = responder(429, 200, headers={"Retry-After": "1"})
+        send_sibling, sibling_calls = responder(200)
+
+        throttled = asyncio.create_task(scheduler.fetch("http://busy.example/a", send_throttled))
+        while not throttled_calls:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await scheduler.fetch("http://busy.example/b", send_sibling)
+        await throttled
+        return throttled_calls, sibling_calls
+
+    throttled_calls, sibling_calls = asyncio.run(scenario())
+    assert sibling_calls[0] - throttled_calls[0] >= 1.0
+
+def test_rate_limited_host_does_not_hold_global_slots():
+    async def scenario():
+        scheduler = FetchScheduler(max_concurrency=1, per_host_concurrency=4,
+                                   per_host_rate=2.0, per_host_burst=1)
+        send_slow_host, _ = responder(200)
+        send_other, _ = responder(200)
+
+        # Five requests at 2/s keep the host's bucket empty for ~2s
+        queued = [asyncio.create_task(scheduler.fetch("http://limited.example/", send_slow_host))
+                  for _ in range(5)]
+        await asyncio.sleep(0.05)
+        started_at = time.perf_counter()
+        await scheduler.fetch("http://other.example/", send_other)
+        other_elapsed = time.perf_counter() - started_at
+        await asyncio.gather(*queued)
+        return other_elapsed, scheduler.get_stats()
+
+    other_elapsed, stats = asyncio.run(scenario())
+    assert other_elapsed < 0.3
+    assert stats["hosts"]["limited.example"]["requests"] == 5
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.services.content_extractor import ContentExtractorService, normalize_url
+from tests.servers import local_server, send
+
+PAGE = (b"<html><head><title>Timetable</title></head><body><main>"
+        b"<p>The winter ferry timetable starts on the first Monday of November.</p>"
+        b"<p>Evening crossings are reduced to two sailings on weekdays until March.</p>"
+        b"</main></body></html>")
+
+@pytest.fixture(autouse=True)
+def inline_parsing(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+
+class SlowOrigin:
+    """Serves PAGE after a delay, so concurrent callers overlap; counts upstream fetches"""
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.paths = []
+        self.lock = threading.Lock()
+
+    def handle(self, request):
+        with self.lock:
+            self.paths.append(request.path)
+        time.sleep(self.delay)
+        send(request, body=PAGE)
+
+def run_with_service(scenario):
+    async def main():
+        service = ContentExtractorService()
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+def test_concurrent_requests_share_one_fetch():
+    origin = SlowOrigin()
+    with local_server(origin.handle) as base:
+        url = f"{base}/timetable"
+
+        async def scenario(service):
+            results = await asyncio.gather(*(service.extract_url(url) for _ in range(20)))
+            return results, service.get_inflight_stats()
+
+        results, stats = run_with_service(scenario)
+
+    assert origin.paths == ["/timetable"]
+    assert all(result.success and result.url == url for result in results)
+    assert stats["started"] == 1
+    assert stats["coalesced"] == 19
+    assert stats["in_flight"] == 0
+
+def test_spelling_variants_share_one_fetch_and_keep_their_url():
+    origin = SlowOrigin()
+    with local_server(origin.handle) as base:
+        port = base.rsplit(":", 1)[1]
+        variants = [
+            f"{base}/timetable",
+            f"HTTP://127.0.0.1:{port}/timetable",
+            f"{base}/timetable#evening",
+            f"http://127.0.0.1:{port}/timetable#winter",
+        ]
+
+        async def scenario(service):
+            return await asyncio.gather(*(service.extract_url(url) for url in variants))
+
+        results = run_with_service(scenario)
+
+    assert origin.paths == ["/timetable"]
+    assert [result.url for result in results] == variants
+    assert len({result.content for result in results}) == 1
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    origin = SlowOrigin()
+    with local_server(origin.handle) as base:
+        url = f"{base}/timetable"
+
+        async def scenario(service):
+            waiters = [asyncio.create_task(service.extract_url(url)) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            waiters[0].cancel()
+            done = await asyncio.gather(*waiters, return_exceptions=True)
+            return done
+
+        done = run_with_service(scenario)
+
+    assert origin.paths == ["/timetable"]
+    assert isinstance(done[0], asyncio.CancelledError)
+    assert all(result.success for result in done[1:])
+
+def test_extraction_abandoned_by_every_waiter_is_cancelled_and_not_joined():
+    origin = SlowOrigin()
+    with local_server(origin.handle) as base:
+        url = f"{base}/timetable"
+
+        async def scenario(service):
+            first = asyncio.create_task(service.extract_url(url))
+            await asyncio.sleep(0.1)
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+            assert service.get_inflight_stats()["in_flight"] == 0
+            # A later caller starts a fresh extraction rather than joining the cancelled one
+            return await service.extract_url(url)
+
+        result = run_with_service(scenario)
+
+    assert result.success
+    assert origin.paths == ["/timetable", "/timetable"]
+
+@pytest.mark.parametrize("variant", [
+    "https://Example.COM/docs?page=2",
+    "HTTPS://example.com/docs?page=2",
+    "https://example.com:443/docs?page=2",
+    "https://example.com/docs?page=2#install",
+    "  https://example.com/docs?page=2 ",
+])
+def test_normalize_url_spelling_variants(variant):
+    assert normalize_url(variant) == "https://example.com/docs?page=2"
+
+def test_normalize_url_keeps_what_changes_the_page():
+    assert normalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+    assert normalize_url("http://example.com/A") != normalize_url("http://example.com/a")
+    assert normalize_url("http://example.com/a?x=1") != normalize_url("http://example.com/a?x=2")
+    assert normalize_url("http://example.com") == normalize_url("http://example.com/")
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIService
+from app.services.chroma_service import ChromaService
+from app.services.content_extractor import ContentExtractorService
+from app.services.free_ai_service import FreeAIService
+from app.services.ingestion_jobs import IngestionJob
+from tests.fakes import HashEmbedding
+from tests.servers import local_server, send
+
+def article(title: str) -> bytes:
+    paragraphs = "".join(f"<p>{title} paragraph {i} says the {title.lower()} harbour opens at dawn.</p>"
+                         for i in range(5))
+    return f"<html><head><title>{title}</title></head><body><article>{paragraphs}</article></body></html>".encode()
+
+@pytest.fixture(autouse=True)
+def inline_ingestion(monkeypatch):
+    """Inline parsing, no page cache, and context kept in memory (the vector store never warms up)"""
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(ai_service_module, "chroma_service", ChromaService(HashEmbedding()))
+
+@pytest.fixture
+def release():
+    """Holds requests for /slow until set"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+@pytest.fixture
+def site(release):
+    def handle(request):
+        if request.path == "/slow":
+            release.wait(10)
+        if request.path in ("/fast", "/slow", "/gated"):
+            send(request, body=article(request.path[1:].title()))
+        else:
+            send(request, status=404, body=b"Not found")
+
+    with local_server(handle) as base:
+        yield base
+
+def wait_for_job(client, job_id: str, done, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/api/links/jobs/{job_id}").json()
+        stages = {item["url"]: item["stage"] for item in status["urls"]}
+        if done(stages) or time.monotonic() > deadline:
+            return status
+        time.sleep(0.01)
+
+def test_submit_returns_the_job_and_session_while_a_url_is_still_downloading(site, release):
+    with TestClient(app) as client:
+        started_at = time.perf_counter()
+        response = client.post("/api/links/jobs", json={"urls": [f"{site}/slow", f"{site}/fast"]})
+        elapsed = time.perf_counter() - started_at
+        submitted = response.json()
+        pending = wait_for_job(client, submitted["job_id"], lambda stages: stages[f"{site}/fast"] == "embedded")
+        release.set()
+        finished = wait_for_job(client, submitted["job_id"], lambda stages: stages[f"{site}/slow"] == "embedded")
+
+    assert response.status_code == 202
+    assert elapsed < 1
+    assert submitted["session_id"] and submitted["job_id"]
+    assert submitted["status"] == "queued"
+    assert [item["stage"] for item in submitted["urls"]] == ["queued", "queued"]
+    assert pending["status"] == "running"
+    assert {item["url"]: item["stage"] for item in pending["urls"]}[f"{site}/slow"] == "queued"
+    assert finished["status"] == "completed" and finished["embedded"] == 2
+    assert finished["session_id"] == submitted["session_id"]
+
+def test_status_reports_each_stage_of_a_url_and_failures(site, monkeypatch):
+    parse_gate, store_gate = threading.Event(), threading.Event()
+    parse, store_context = ContentExtractorService._parse, AIService.store_context
+
+    async def gated_parse(self, url, *args, **kwargs):
+        if url.endswith("/gated"):
+            await asyncio.to_thread(parse_gate.wait, 10)
+        return await parse(self, url, *args, **kwargs)
+
+    async def gated_store_context(self, session_id, extracted_content, *args, **kwargs):
+        if extracted_content[0]["url"].endswith("/gated"):
+            await asyncio.to_thread(store_gate.wait, 10)
+        return await store_context(self, session_id, extracted_content, *args, **kwargs)
+
+    monkeypatch.setattr(ContentExtractorService, "_parse", gated_parse)
+    monkeypatch.setattr(AIService, "store_context", gated_store_context)
+    gated, missing = f"{site}/gated", f"{site}/missing"
+    try:
+        with TestClient(app) as client:
+            submitted = client.post("/api/links/jobs", json={"urls": [gated, missing]}).json()
+            job_id = submitted["job_id"]
+            seen = [{item["url"]: item["stage"] for item in submitted["urls"]}]
+            seen.append(wait_for_job(client, job_id, lambda stages: stages[gated] == "fetched" and stages[missing] == "failed"))
+            parse_gate.set()
+            seen.append(wait_for_job(client, job_id, lambda stages: stages[gated] == "parsed"))
+            store_gate.set()
+            seen.append(wait_for_job(client, job_id, lambda stages: stages[gated] == "embedded"))
+    finally:
+        parse_gate.set()
+        store_gate.set()
+
+    stages = [seen[0]] + [{item["url"]: item["stage"] for item in status["urls"]} for status in seen[1:]]
+    assert [stage[gated] for stage in stages] == ["queued", "fetched", "parsed", "embedded"]
+    assert [stage[missing] for stage in stages] == ["queued", "failed", "failed", "failed"]
+    finished = seen[-1]
+    assert finished["status"] == "completed"
+    assert (finished["total"], finished["embedded"], finished["failed"]) == (2, 1, 1)
+    failure = next(item for item in finished["urls"] if item["url"] == missing)
+    assert "404" in failure["error_message"]
+    parsed = next(item for item in seen[2]["urls"] if item["url"] == gated)
+    assert parsed["title"] == "Gated" and parsed["word_count"] > 0
+
+def test_a_full_queue_rejects_the_job_with_503(site, monkeypatch):
+    monkeypatch.setattr(settings, "INGESTION_QUEUE_MAX_SIZE", 2)
+    with TestClient(app) as client:
+        response = client.post("/api/links/jobs", json={"urls": [f"{site}/a", f"{site}/b", f"{site}/c"]})
+        accepted = client.post("/api/links/jobs", json={"urls": [f"{site}/fast"]})
+        stats = app.state.services.ingestion_jobs.get_stats()
+
+    assert response.status_code == 503
+    assert "queue is full" in response.json()["detail"]
+    assert accepted.status_code == 202
+    assert stats["jobs_rejected"] == 1
+
+def test_questions_are_answered_from_urls_indexed_so_far(site, release, monkeypatch):
+    async def no_answer(self, question, context):
+        return None
+
+    monkeypatch.setattr(settings, "USE_OLLAMA", False)
+    monkeypatch.setattr(FreeAIService, "_answer_with_huggingface", no_answer)
+    with TestClient(app) as client:
+        submitted = client.post("/api/links/jobs", json={"urls": [f"{site}/slow", f"{site}/fast"]}).json()
+        pending = wait_for_job(client, submitted["job_id"], lambda stages: stages[f"{site}/fast"] == "embedded")
+        answer = client.post("/api/ask", json={"question": "When does the fast harbour open?",
+                                               "session_id": submitted["session_id"]})
+        release.set()
+
+    assert {item["url"]: item["stage"] for item in pending["urls"]}[f"{site}/slow"] == "queued"
+    assert answer.status_code == 200
+    assert answer.json()["sources"] == [f"{site}/fast"]
+    assert "dawn" in answer.json()["answer"]
+
+def test_embedded_and_failed_urls_ignore_late_stage_updates():
+    job = IngestionJob("job", "session", ["https://a.example/", "https://b.example/"])
+    job.set_stage("https://a.example/", "failed", error_message="Page not found (404).")
+    job.set_stage("https://b.example/", "parsed")
+    job.set_stage("https://b.example/", "embedded")
+
+    # A shared extraction reporting progress after these URLs have finished
+    for url in ("https://a.example/", "https://b.example/"):
+        job.set_stage(url, "fetched")
+        job.set_stage(url, "parsed")
+    job.set_stage("https://b.example/", "failed", error_message="too late")
+
+    status = job.to_status()
+    assert [(item.stage, item.error_message) for item in status.urls] == [
+        ("failed", "Page not found (404)."), ("embedded", None)]
+    assert status.status == "completed" and status.finished_at is not None
@@ -0,0 +1,27 @@
+import asyncio
+import time
+from app.services.ai_service import AIService
+from app.services.content_extractor import ContentExtractorService
+from app.services.ingestion_jobs import IngestionJobManager
+
+def test_submitted_jobs_are_known_to_the_sweeper_before_anything_is_stored():
+    async def scenario():
+        ai_service = AIService()
+        extractor = ContentExtractorService()
+        manager = IngestionJobManager(extractor, ai_service, workers=1)
+        manager.start()
+        try:
+            submitted_at = time.time()
+            job = manager.submit(["http://127.0.0.1:9/unreachable"])
+            crawl = manager.submit_crawl(seed_url="http://127.0.0.1:9/")
+            # Active now, so idle only once the cutoff is past the submission
+            active = ai_service.get_expired_sessions(submitted_at - 1, 1000)
+            idle = ai_service.get_expired_sessions(time.time() + 1, 1000)
+            return job, crawl, active, idle
+        finally:
+            await manager.stop()
+            await extractor.close()
+
+    job, crawl, active, idle = asyncio.run(scenario())
+    assert job.session_id not in active and crawl.session_id not in active
+    assert job.session_id in idle and crawl.session_id in idle
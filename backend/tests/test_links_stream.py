@@ -0,0 +1,61 @@
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services.content_extractor import ContentExtractorService
+from tests.servers import local_server, send
+
+def sse_events(body: str):
+    events = []
+    for message in body.strip().split("\n\n"):
+        event, data = message.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def article(title: str) -> bytes:
+    paragraphs = "".join(f"<p>{title} paragraph {i} has enough words in it to count as real page content.</p>"
+                         for i in range(5))
+    return f"<html><head><title>{title}</title></head><body><article>{paragraphs}</article></body></html>".encode()
+
+def handle(request):
+    if request.path == "/slow":
+        time.sleep(0.5)
+    if request.path in ("/fast", "/slow"):
+        send(request, body=article(request.path[1:].title()))
+    else:
+        send(request, status=404, body=b"Not found")
+
+@pytest.fixture(autouse=True)
+def inline_parsing(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+
+def test_results_arrive_in_completion_order_and_failures_do_not_end_the_stream(monkeypatch):
+    extract_url = ContentExtractorService.extract_url
+
+    async def sometimes_raising(self, url, *args, **kwargs):
+        if url.endswith("/crash"):
+            raise RuntimeError("parser exploded")
+        return await extract_url(self, url, *args, **kwargs)
+
+    monkeypatch.setattr(ContentExtractorService, "extract_url", sometimes_raising)
+
+    with local_server(handle) as base, TestClient(app) as client:
+        urls = [f"{base}/slow", f"{base}/missing", f"{base}/crash", f"{base}/fast"]
+        response = client.post("/api/links/stream", json={"urls": urls})
+
+    assert response.status_code == 200
+    events = sse_events(response.text)
+    results = [data["url"] for event, data in events if event == "result"]
+    errors = {data["url"]: data["detail"] for event, data in events if event == "error"}
+
+    # The slow page was requested first but its result comes after the fast one
+    assert results == [f"{base}/fast", f"{base}/slow"]
+    assert set(errors) == {f"{base}/missing", f"{base}/crash"}
+    assert "parser exploded" in errors[f"{base}/crash"]
+    summary_event, summary = events[-1]
+    assert summary_event == "summary"
+    assert summary["success"] and summary["session_id"]
+    assert set(summary["failed_urls"]) == {f"{base}/missing", f"{base}/crash"}
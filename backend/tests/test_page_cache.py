@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import pytest
+from app.core.config import settings
+from app.models.schemas import ExtractedContent
+from app.services.content_extractor import ContentExtractorService
+from app.services.page_cache import PageCache
+from tests.servers import local_server, send
+
+class Origin:
+    """A page with validators that answers conditional GETs like a real origin"""
+
+    def __init__(self, etag=None, last_modified=None):
+        self.version = 1
+        self.etag = etag
+        self.last_modified = last_modified
+        self.requests = []
+
+    def body(self) -> bytes:
+        return (f"<html><head><title>Release notes v{self.version}</title></head><body><main>"
+                f"<p>Version {self.version} ships a faster parser and a smaller cache.</p>"
+                f"<p>Upgrade notes for version {self.version} follow below in detail.</p>"
+                f"</main></body></html>").encode()
+
+    def handle(self, request):
+        self.requests.append(dict(request.headers))
+        validators = {}
+        if self.etag:
+            validators["ETag"] = f'"{self.etag}-{self.version}"'
+        if self.last_modified:
+            validators["Last-Modified"] = self.last_modified[self.version - 1]
+        not_modified = (
+            (self.etag and request.headers.get("If-None-Match") == validators["ETag"])
+            or (not self.etag and self.last_modified
+                and request.headers.get("If-Modified-Since") == validators["Last-Modified"])
+        )
+        if not_modified:
+            request.send_response(304)
+            for name, value in validators.items():
+                request.send_header(name, value)
+            request.end_headers()
+            return
+        send(request, body=self.body(), headers=validators)
+
+@pytest.fixture(autouse=True)
+def inline_parsing(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTOR_PARSE_WORKERS", 0)
+
+def extract_repeatedly(url: str, times: int, between=None):
+    async def scenario():
+        extractor = ContentExtractorService()
+        parses = []
+        original_parse = extractor._parse
+
+        async def counting_parse(*args, **kwargs):
+            parses.append(args[0])
+            return await original_parse(*args, **kwargs)
+
+        extractor._parse = counting_parse
+        results = []
+        try:
+            for i in range(times):
+                results.append(await extractor.extract_url(url))
+                if between:
+                    between(i)
+            return results, parses, extractor.page_cache.get_stats()
+        finally:
+            await extractor.close()
+    return asyncio.run(scenario())
+
+def test_unchanged_page_is_revalidated_with_etag_and_not_reparsed():
+    origin = Origin(etag="abc")
+    with local_server(origin.handle) as base_url:
+        results, parses, stats = extract_repeatedly(f"{base_url}/notes", 3)
+
+    assert [r.success for r in results] == [True, True, True]
+    assert results[0].title == results[2].title == "Release notes v1"
+    assert results[2].content == results[0].content
+    assert len(parses) == 1
+    assert "If-None-Match" not in origin.requests[0]
+    assert origin.requests[1]["If-None-Match"] == '"abc-1"'
+    assert stats["revalidated"] == 2 and stats["stores"] == 1
+
+def test_changed_page_is_fetched_and_parsed_again():
+    origin = Origin(etag="abc")
+
+    def publish_new_version(i):
+        origin.version = 2
+
+    with local_server(origin.handle) as base_url:
+        results, parses, stats = extract_repeatedly(f"{base_url}/notes", 3, between=publish_new_version)
+
+    assert [r.title for r in results] == ["Release notes v1", "Release notes v2", "Release notes v2"]
+    assert len(parses) == 2
+    assert stats["stale"] == 1 and stats["revalidated"] == 1
+
+def test_last_modified_is_used_when_there_is_no_etag():
+    origin = Origin(last_modified=["Mon, 05 Oct 2026 10:00:00 GMT", "Tue, 06 Oct 2026 10:00:00 GMT"])
+    with local_server(origin.handle) as base_url:
+        results, parses, stats = extract_repeatedly(f"{base_url}/notes", 2)
+
+    assert origin.requests[1]["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert len(parses) == 1 and stats["revalidated"] == 1
+
+def test_pages_without_validators_are_not_cached():
+    origin = Origin()
+    with local_server(origin.handle) as base_url:
+        results, parses, stats = extract_repeatedly(f"{base_url}/notes", 2)
+
+    assert len(parses) == 2 and stats["entries"] == 0
+
+def test_cache_file_io_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original_get = PageCache.get
+
+    def recording_get(self, url):
+        threads.append(threading.current_thread())
+        return original_get(self, url)
+
+    monkeypatch.setattr(PageCache, "get", recording_get)
+    with local_server(Origin(etag="abc").handle) as base_url:
+        extract_repeatedly(f"{base_url}/notes", 2)
+
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+
+def test_least_recently_used_pages_are_evicted_at_the_byte_limit(tmp_path):
+    def page(n):
+        return ExtractedContent(url=f"https://e.example/{n}", title=str(n), content="x" * 400, success=True)
+
+    cache = PageCache(str(tmp_path / "cache"), max_bytes=2500)
+    for n in range(3):
+        cache.put(f"https://e.example/{n}", page(n), etag=f'"{n}"', last_modified=None)
+    assert cache.get("https://e.example/0") is not None  # Now most recently used
+    cache.put("https://e.example/3", page(3), etag='"3"', last_modified=None)
+
+    assert cache.get("https://e.example/1") is None
+    assert cache.get("https://e.example/0") is not None
+    assert cache.current_bytes <= 2500
+    # A fresh instance picks the entries back up from disk
+    reopened = PageCache(str(tmp_path / "cache"), max_bytes=2500)
+    assert reopened.get("https://e.example/3").etag == '"3"'
@@ -0,0 +1,53 @@
+import random
+import time
+import pytest
+from bs4 import BeautifulSoup
+from app.services.page_parser import PageParser
+from tests.corpus import load_pages
+from tests.legacy import legacy_clean_text
+
+PAGES = load_pages()
+
+# Pieces that exercise every cleaning step: clutter words, repeated tokens,
+# infobox fields, special characters, punctuation runs and numeric lines
+FUZZ_PIECES = [
+    "Menu", "Skip to content", "home", "About us", "View history", "MammoottyMammootty", "abab", "aaaa",
+    "xyzxyzxyz", "lalala", "Born: 1815", "Died - 1852", "Alma mater", "wikipedia.org", "C++", "€5",
+    "«quoted»", "...", "?!", ",,", ". . .", "—", "2026-10-17", "3.14", "\n", "\n\n", "  ", "\t",
+    "The harbour opens at dawn", "Engines were analytical", "Sentence one.", "Sentence one.",
+    "(in brackets)", "it's", "x", "12 34", "ÉcoleÉcole", "naïve", "日本日本",
+]
+
+def fuzz_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(1, 40)))
+
+@pytest.mark.parametrize("name,url,html", PAGES, ids=[page[0] for page in PAGES])
+def test_matches_the_regex_cascade_on_saved_pages(name, url, html):
+    parser = PageParser("html.parser")
+    content = parser._extract_content(BeautifulSoup(html, "html.parser"), url)
+
+    assert content
+    assert parser._clean_text(content) == legacy_clean_text(content)
+
+def test_matches_the_regex_cascade_on_fuzzed_text():
+    parser = PageParser("html.parser")
+    rng = random.Random(14)
+    for _ in range(3000):
+        text = fuzz_text(rng)
+        assert parser._clean_text(text) == legacy_clean_text(text), text
+
+@pytest.mark.parametrize("token", [
+    "a" * 1_000_000,
+    "ab" * 500_000 + "a",  # Nearly periodic: the worst case for the old backtracking pattern
+    "".join(random.Random(3).choice("abc") for _ in range(1_000_000)),
+], ids=["repeated", "near_periodic", "random"])
+def test_megabyte_single_token_is_cleaned_in_bounded_time(token):
+    parser = PageParser("html.parser")
+
+    started_at = time.perf_counter()
+    cleaned = parser._clean_text(token)
+    elapsed = time.perf_counter() - started_at
+
+    # Linear work takes well under a second; the old pattern needed minutes
+    assert elapsed < 5
+    assert cleaned.endswith(".")
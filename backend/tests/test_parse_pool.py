@@ -0,0 +1,31 @@
+import asyncio
+import pytest
+from app.core.executor import BoundedExecutor
+from app.services.page_parser import PageParser, parse_page
+from tests.corpus import load_pages
+
+PAGES = load_pages()
+
+def test_process_pool_matches_inline_parse():
+    async def scenario():
+        pool = BoundedExecutor("parse-test", 2, use_processes=True)
+        try:
+            return await asyncio.gather(*(
+                pool.run(parse_page, url, html, True) for _, url, html in PAGES
+            ))
+        finally:
+            pool.shutdown()
+
+    pooled = asyncio.run(scenario())
+    parser = PageParser()
+    for (name, url, html), result in zip(PAGES, pooled):
+        inline = parser.parse(url, html, collect_links=True)
+        assert result.model_dump() == inline.model_dump(), name
+        assert result.success, name
+
+@pytest.mark.parametrize("name,url,html", PAGES, ids=[page[0] for page in PAGES])
+def test_every_saved_page_yields_content(name, url, html):
+    result = PageParser().parse(url, html)
+    assert result.success
+    assert result.word_count > 100
+    assert result.blocks
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+import httpx
+import pytest
+from app.services.provider_router import ProviderRouter
+from tests.servers import local_server, send
+
+@contextmanager
+def fake_openai_server(delay: float = 0.0, status: int = 200):
+    """An OpenAI-compatible /v1/chat/completions endpoint that answers after delay seconds"""
+    def handle(request):
+        request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        time.sleep(delay)
+        if status != 200:
+            body = {"error": {"message": "upstream unavailable", "type": "server_error"}}
+        else:
+            body = {"object": "chat.completion", "model": "fake",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": f"answered after {delay}s"}}]}
+        try:
+            send(request, status=status, body=json.dumps(body).encode(), content_type="application/json")
+        except OSError:
+            # The router cancelled this call and the client went away
+            request.close_connection = True
+
+    with local_server(handle) as base:
+        yield base
+
+def chat_attempt(client: httpx.AsyncClient, base: str):
+    async def attempt() -> str:
+        response = await client.post(f"{base}/v1/chat/completions", json={
+            "model": "fake", "messages": [{"role": "user", "content": "Which slipway is closed?"}]
+        })
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+    return lambda: attempt()
+
+def route(router: ProviderRouter, servers: dict, calls: int):
+    """Make calls through the router; returns [(winner, seconds)]"""
+    async def scenario():
+        results = []
+        async with httpx.AsyncClient() as client:
+            attempts = {name: chat_attempt(client, base) for name, base in servers.items()}
+            for _ in range(calls):
+                started_at = time.perf_counter()
+                name, _ = await router.call(attempts)
+                results.append((name, time.perf_counter() - started_at))
+        return results
+    return asyncio.run(scenario())
+
+def test_backend_that_loses_hedge_races_gets_measured_and_demoted():
+    router = ProviderRouter(["slow", "fast"], hedge_min_delay=0.05, hedge_max_delay=0.5)
+    with fake_openai_server(delay=3.0) as slow, fake_openai_server(delay=0.01) as fast:
+        results = route(router, {"slow": slow, "fast": fast}, calls=4)
+
+    # First call: slow was untried, so it went first and lost the race to the hedge
+    assert results[0][0] == "fast" and router.hedge_wins == 1
+    # Its cancelled attempt is a latency sample, so it no longer ranks first
+    assert router.health["slow"].hedge_losses == 1
+    assert router.health["slow"].score() >= 0.5
+    assert router.ranked() == ["fast", "slow"]
+    assert [name for name, _ in results[1:]] == ["fast"] * 3
+    assert all(seconds < 0.5 for _, seconds in results[1:])
+    assert router.hedges == 1
+
+def test_backend_that_only_failed_ranks_after_a_measured_one():
+    router = ProviderRouter(["broken", "ok"], hedge_enabled=False)
+    with fake_openai_server(status=503) as broken, fake_openai_server(delay=0.01) as ok:
+        results = route(router, {"broken": broken, "ok": ok}, calls=2)
+
+    assert [name for name, _ in results] == ["ok", "ok"]
+    # One failure leaves the breaker closed, but broken is no longer tried first
+    assert router.health["broken"].state == "closed"
+    assert router.health["broken"].failures == 1 and router.fallbacks == 1
+    assert router.ranked() == ["ok", "broken"]
+
+def test_untried_backends_are_measured_first():
+    router = ProviderRouter(["first", "second"], hedge_enabled=False)
+    with fake_openai_server(delay=0.3) as first, fake_openai_server(delay=0.01) as second:
+        route(router, {"first": first}, calls=1)
+        assert router.ranked() == ["second", "first"]
+        results = route(router, {"first": first, "second": second}, calls=2)
+
+    assert [name for name, _ in results] == ["second", "second"]
+    assert router.health["first"].score() > router.health["second"].score() > 0
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    router = ProviderRouter(["recovering", "steady"], failure_threshold=1, cooldown_seconds=0.05,
+                            hedge_enabled=False)
+    for _ in range(5):
+        router.health["recovering"].record_success(0.01)
+        router.health["steady"].record_success(0.5)
+    router.health["recovering"].record_failure()
+    assert router.health["recovering"].state == "open"
+    time.sleep(0.06)
+    calls = {"recovering": 0, "steady": 0}
+
+    def attempt(name: str, seconds: float):
+        async def run() -> str:
+            calls[name] += 1
+            await asyncio.sleep(seconds)
+            return name
+        return run
+
+    async def burst():
+        return await asyncio.gather(*(
+            router.call({"recovering": attempt("recovering", 0.1), "steady": attempt("steady", 0.01)})
+            for _ in range(5)
+        ))
+
+    winners = [name for name, _ in asyncio.run(burst())]
+
+    # One probe while half-open; the rest of the burst went to the healthy backend
+    assert calls == {"recovering": 1, "steady": 4}
+    assert sorted(winners) == ["recovering"] + ["steady"] * 4
+    assert router.health["recovering"].state == "closed"
+    assert router.ranked()[0] == "recovering"
+
+def test_failed_probe_reopens_the_breaker_and_frees_the_probe():
+    router = ProviderRouter(["flaky"], failure_threshold=1, cooldown_seconds=0.05, hedge_enabled=False)
+    health = router.health["flaky"]
+    health.record_failure()
+    time.sleep(0.06)
+
+    async def failing() -> str:
+        raise RuntimeError("still down")
+
+    async def probe():
+        with pytest.raises(ValueError):
+            await router.call({"flaky": failing})
+
+    asyncio.run(probe())
+
+    assert health.state == "open" and not health.probe_in_flight
+    assert health.breaker_trips == 2
+
+def test_attempts_cancelled_by_the_caller_are_not_hedge_losses():
+    router = ProviderRouter(["slow", "slower"], hedge_min_delay=0.01, hedge_max_delay=0.02)
+
+    async def hang() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    async def cancelled_call():
+        task = asyncio.create_task(router.call({"slow": hang, "slower": hang}))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_call())
+
+    # Both were in flight (one as a hedge), but neither lost to a winner
+    assert router.hedges == 1
+    assert router.health["slow"].hedge_losses == 0 and router.health["slower"].hedge_losses == 0
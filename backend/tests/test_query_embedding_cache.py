@@ -0,0 +1,61 @@
+from array import array
+from app.services.embeddings import QueryEmbeddingCache, normalize_query
+from tests.fakes import HashEmbedding
+
+MODEL = "test-model"
+
+def make_cache(**kwargs) -> QueryEmbeddingCache:
+    options = {"max_bytes": 1_000_000, "max_entries": 1000, "ttl_seconds": 600}
+    options.update(kwargs)
+    return QueryEmbeddingCache(**options)
+
+def test_repeated_question_hits_after_one_miss():
+    cache = make_cache()
+    vector = HashEmbedding().embed("summarize the page")
+
+    assert cache.get(MODEL, "Summarize the page?") is None
+    cache.put(MODEL, "Summarize the page?", vector)
+    cached = cache.get(MODEL, "  summarize   THE page ")
+
+    assert cached == array("f", vector).tolist()
+    assert cache.get("other-model", "summarize the page") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.333)
+
+def test_questions_that_differ_only_in_symbols_do_not_share_a_vector():
+    embedding = HashEmbedding()
+    cache = make_cache()
+    cache.put(MODEL, "What is C?", embedding.embed("what is c"))
+    cache.put(MODEL, "is it 2+2 or 2-2", embedding.embed("addition and subtraction"))
+
+    assert normalize_query("What is C++?") != normalize_query("What is C?") != normalize_query("what is C#")
+    assert cache.get(MODEL, "What is C++?") is None
+    assert cache.get(MODEL, "what is C#") is None
+    assert cache.get(MODEL, "is it 2*2 or 2/2") is None
+    assert cache.get(MODEL, "what is c") is not None
+
+def test_byte_bound_evicts_least_recently_used_entries():
+    embedding = HashEmbedding()
+    probe = make_cache()
+    probe.put(MODEL, "question 0", embedding.embed("question 0"))
+    entry_bytes = probe.current_bytes
+
+    # Room for three entries; the fourth pushes out the least recently used one
+    cache = make_cache(max_bytes=entry_bytes * 3 + entry_bytes // 2)
+    for i in range(3):
+        cache.put(MODEL, f"question {i}", embedding.embed(f"question {i}"))
+    cache.get(MODEL, "question 0")
+    cache.put(MODEL, "question 3", embedding.embed("question 3"))
+
+    assert cache.get(MODEL, "question 1") is None
+    assert all(cache.get(MODEL, f"question {i}") is not None for i in (0, 2, 3))
+    stats = cache.get_stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+
+def test_entry_larger_than_the_byte_bound_is_not_cached():
+    cache = make_cache(max_bytes=100)
+
+    cache.put(MODEL, "question", HashEmbedding().embed("question"))
+
+    assert cache.get_stats()["entries"] == 0 and cache.current_bytes == 0
@@ -0,0 +1,202 @@
+import asyncio
+import time
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIService
+from app.services.chroma_service import ChromaService
+from app.services.session_sweeper import SessionSweeper
+from tests.fakes import FakeRedis, HashEmbedding, ready_chroma_service
+
+PAGE = {"url": "https://example.com/", "title": "Example", "content": "Harbour notices for the week."}
+
+def stored_chunk_ids(service: ChromaService, session_id: str) -> list:
+    """Chunk ids in the collection itself, bypassing the session manifest"""
+    collection = service._get_collection(session_id)
+    return collection.get(where={"session_id": session_id}, include=[])["ids"] if collection else []
+
+def test_sweep_evicts_idle_sessions_and_reports_them(monkeypatch):
+    async def scenario():
+        ai_service = AIService()
+        session_id = f"idle-{uuid.uuid4().hex[:8]}"
+        await ai_service.store_context(session_id, [PAGE])
+        # A never-warmed ChromaService: the sweep skips the vector store purge
+        sweeper = SessionSweeper(ai_service, ChromaService(HashEmbedding()))
+        before = sweeper.get_stats()
+        tracked_before = session_id in ai_service.tracked_sessions()
+
+        monkeypatch.setattr(settings, "SESSION_TTL_SECONDS", -1)
+        monkeypatch.setattr(settings, "SESSION_SWEEP_BATCH_SIZE", 10_000)
+        result = await sweeper.sweep()
+        return session_id, tracked_before, before, result, sweeper.get_stats(), ai_service.tracked_sessions()
+
+    session_id, tracked_before, before, result, after, tracked_after = asyncio.run(scenario())
+    assert tracked_before and before["memory_context_sessions"] >= 1
+    assert session_id in result["evicted"]
+    assert session_id not in tracked_after
+    assert after["tracked_sessions"] == len(tracked_after)
+    assert after["sessions_evicted"] == len(result["evicted"])
+
+def test_eviction_deletes_chroma_rows_and_redis_keys(monkeypatch):
+    monkeypatch.setattr(AIService, "_last_access", {})
+    monkeypatch.setattr(AIService, "_context_storage", {})
+    monkeypatch.setattr(AIService, "_qa_storage", {})
+
+    async def scenario():
+        service = await ready_chroma_service(HashEmbedding())
+        monkeypatch.setattr(ai_service_module, "chroma_service", service)
+        ai_service = AIService()
+        ai_service.redis_client = redis = FakeRedis()
+        idle, live = "idle-session", "live-session"
+        try:
+            for session_id in (idle, live):
+                await ai_service.store_context(session_id, [PAGE])
+                await ai_service._store_qa(session_id, "What is posted?", "Harbour notices.")
+            stored = {sid: (len(stored_chunk_ids(service, sid)), sorted(k for k in redis.data if sid in k))
+                      for sid in (idle, live)}
+
+            ai_service._last_access[idle] -= 3600
+            monkeypatch.setattr(settings, "SESSION_TTL_SECONDS", 60)
+            # The sweeper gets a never-warmed store, so only evict_session can delete the rows
+            result = await SessionSweeper(ai_service, ChromaService(HashEmbedding())).sweep()
+            remaining = {sid: (len(stored_chunk_ids(service, sid)), sorted(k for k in redis.data if sid in k))
+                         for sid in (idle, live)}
+            return result, stored, remaining, service.get_collection_stats(idle)
+        finally:
+            await ai_service.close()
+            service.shutdown()
+
+    result, stored, remaining, idle_stats = asyncio.run(scenario())
+
+    assert result["evicted"] == ["idle-session"]
+    for session_id in ("idle-session", "live-session"):
+        chunks, keys = stored[session_id]
+        assert chunks > 0
+        assert keys == [f"context:{session_id}", f"qa:{session_id}"]
+    assert remaining["idle-session"] == (0, [])
+    assert remaining["live-session"] == stored["live-session"]
+    assert idle_stats == {"total_chunks": 0, "urls": []}
+
+def test_eviction_runs_in_batches_oldest_first(monkeypatch):
+    monkeypatch.setattr(AIService, "_last_access", {})
+    monkeypatch.setattr(AIService, "_context_storage", {})
+    monkeypatch.setattr(AIService, "_qa_storage", {})
+    monkeypatch.setattr(settings, "SESSION_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "SESSION_SWEEP_BATCH_SIZE", 2)
+
+    async def scenario():
+        ai_service = AIService()
+        ai_service.redis_client = FakeRedis()
+        evicted = []
+        original_evict = ai_service.evict_session
+
+        async def recording_evict(session_id):
+            evicted.append(session_id)
+            await original_evict(session_id)
+
+        ai_service.evict_session = recording_evict
+        for age, session_id in enumerate(f"s{i}" for i in range(5)):
+            await ai_service.store_context(session_id, [PAGE])
+            ai_service._last_access[session_id] -= 3600 + (5 - age)
+        sweeper = SessionSweeper(ai_service, ChromaService(HashEmbedding()))
+        batches = [(await sweeper.sweep())["evicted"] for _ in range(4)]
+        await ai_service.close()
+        return batches, evicted, sweeper.get_stats()
+
+    batches, evicted, stats = asyncio.run(scenario())
+
+    assert batches == [["s0", "s1"], ["s2", "s3"], ["s4"], []]
+    assert evicted == ["s0", "s1", "s2", "s3", "s4"]
+    assert stats["sessions_evicted"] == 5 and stats["tracked_sessions"] == 0
+
+def test_session_endpoint_reports_crawled_and_evicted_sessions(monkeypatch):
+    monkeypatch.setattr(AIService, "_last_access", {})
+    monkeypatch.setattr(AIService, "_context_storage", {})
+    monkeypatch.setattr(AIService, "_qa_storage", {})
+
+    async def crawl():
+        service = await ready_chroma_service(HashEmbedding())
+        monkeypatch.setattr(ai_service_module, "chroma_service", service)
+        ai_service = AIService()
+        # Crawled pages only go to ChromaDB
+        await ai_service.store_context("crawled", [PAGE], fallback_only=True)
+        await ai_service.store_context("idle", [PAGE], fallback_only=True)
+        await ai_service.evict_session("idle")
+        # As after a restart: nothing in memory, the chunks are still in ChromaDB
+        ai_service._last_access.pop("crawled")
+        await ai_service.close()
+        return service
+
+    service = asyncio.run(crawl())
+    try:
+        with TestClient(app) as client:
+            crawled = client.get("/api/sessions/crawled").json()
+            idle = client.get("/api/sessions/idle").json()
+    finally:
+        service.shutdown()
+
+    assert crawled["status"] == "active"
+    assert crawled["sources"] == 1 and crawled["chunks"] > 0
+    assert crawled["source_info"][0]["url"] == PAGE["url"]
+    assert idle["status"] == "not_found"
+    assert idle["available_sessions"] == []
+
+def test_questions_for_unknown_sessions_do_not_track_them(monkeypatch):
+    monkeypatch.setattr(AIService, "_last_access", {})
+    monkeypatch.setattr(AIService, "_context_storage", {})
+    monkeypatch.setattr(AIService, "_qa_storage", {})
+    monkeypatch.setattr(ai_service_module, "chroma_service", ChromaService(HashEmbedding()))
+
+    async def scenario():
+        ai_service = AIService()
+        await ai_service.store_context("known", [PAGE])
+        await ai_service.evict_session("known")
+        contexts = [await ai_service._get_context(session_id, query="harbour") for session_id in ("made-up", "known")]
+        return contexts, ai_service.tracked_sessions()
+
+    contexts, tracked = asyncio.run(scenario())
+
+    assert contexts == [None, None]
+    assert tracked == set()
+
+@pytest.mark.parametrize("partition_mode", ["shared", "per_session"])
+def test_sessions_queried_after_a_restart_are_not_purged(monkeypatch, partition_mode):
+    monkeypatch.setattr(settings, "CHROMA_PARTITION_MODE", partition_mode)
+    monkeypatch.setattr(AIService, "_last_access", {})
+    long_ago = time.time() - 7 * 86400
+
+    def backdate(service: ChromaService, session_id: str):
+        collection = service._get_collection(session_id)
+        if partition_mode == "per_session":
+            collection.modify(metadata={**collection.metadata, "created_at": long_ago, "last_access_at": long_ago})
+        else:
+            ids = stored_chunk_ids(service, session_id)
+            collection.update(ids=ids, metadatas=[{"ingested_at": long_ago, "last_access_at": long_ago} for _ in ids])
+
+    async def scenario():
+        before_restart = await ready_chroma_service(HashEmbedding())
+        for session_id in ("queried", "idle"):
+            before_restart.add_content(session_id, [PAGE])
+            backdate(before_restart, session_id)
+        before_restart.shutdown()
+
+        # A new process: no manifests, no tracked sessions
+        service = await ready_chroma_service(HashEmbedding())
+        monkeypatch.setattr(ai_service_module, "chroma_service", service)
+        ai_service = AIService()
+        try:
+            context = await ai_service._get_context("queried", query="harbour notices")
+            purged = service.purge_stale_sessions(time.time() - 3600, live_sessions=set(), limit=10)
+            return context, purged, len(stored_chunk_ids(service, "queried")), len(stored_chunk_ids(service, "idle"))
+        finally:
+            await ai_service.close()
+            service.shutdown()
+
+    context, purged, queried_chunks, idle_chunks = asyncio.run(scenario())
+
+    assert [item["url"] for item in context] == [PAGE["url"]]
+    assert purged == ["idle"]
+    assert queried_chunks > 0 and idle_chunks == 0
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from app.models.schemas import TTSResponse
+from app.services.speech_pipeline import SentenceSplitter, SpeechPipeline
+
+ANSWER = ("Dr. Smith opened the harbour office at 9.30 today. It closes at 5 p.m. on Fridays, e.g. this week. "
+          "Mr. J. Jones confirmed the new hours! The slipway stays closed until the resurfacing ends")
+SENTENCES = [
+    "Dr. Smith opened the harbour office at 9.30 today.",
+    "It closes at 5 p.m. on Fridays, e.g. this week.",
+    "Mr. J. Jones confirmed the new hours!",
+    "The slipway stays closed until the resurfacing ends",
+]
+
+class FakeTTS:
+    """Synthesizes after a per-sentence delay and records how many calls overlap"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.finished = []
+
+    async def generate_speech(self, text, voice_id=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays(text))
+        finally:
+            self.in_flight -= 1
+        self.finished.append(text)
+        return TTSResponse(audio_url=f"/audio/{len(self.finished)}.mp3", duration=1.0)
+
+async def answer_events(text, chunk_size=3):
+    yield "sources", {"sources": ["https://example.com/harbour"], "session_id": "s"}
+    for start in range(0, len(text), chunk_size):
+        yield "token", {"text": text[start:start + chunk_size]}
+        await asyncio.sleep(0)
+    yield "done", {"answer": text}
+
+def speak(tts, text, max_parallel=3):
+    async def scenario():
+        pipeline = SpeechPipeline(tts, max_parallel=max_parallel)
+        return [item async for item in pipeline.speak(answer_events(text))]
+    return asyncio.run(scenario())
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(ANSWER)])
+def test_splitter_keeps_abbreviations_and_decimals_and_flushes_the_tail(chunk_size):
+    splitter = SentenceSplitter(min_chars=20, max_chars=300)
+    sentences = []
+    for start in range(0, len(ANSWER), chunk_size):
+        sentences += splitter.feed(ANSWER[start:start + chunk_size])
+
+    assert sentences == SENTENCES[:3]
+    assert splitter.flush() == SENTENCES[3:]
+    assert splitter.flush() == []
+
+def test_splitter_merges_short_sentences_and_cuts_run_ons():
+    splitter = SentenceSplitter(min_chars=20, max_chars=40)
+
+    assert splitter.feed("Yes. The north slipway is closed. ") == ["Yes. The north slipway is closed."]
+    run_on = splitter.feed("the barrier, the lock gates and the old ferry steps are all shut for works ")
+    assert run_on[0] == "the barrier,"
+    assert all(len(sentence) <= 40 for sentence in run_on)
+
+def test_audio_is_emitted_in_sentence_order_when_later_segments_finish_first():
+    # The first sentence is the slowest to synthesize, the last the fastest
+    tts = FakeTTS(lambda text: {0: 0.3, 1: 0.2, 2: 0.1, 3: 0.0}[SENTENCES.index(text)])
+
+    events = speak(tts, ANSWER)
+
+    assert tts.finished[0] != SENTENCES[0]
+    audio = [data for event, data in events if event == "audio"]
+    assert [segment["index"] for segment in audio] == [0, 1, 2, 3]
+    assert [segment["text"] for segment in audio] == SENTENCES
+    # Every segment is spoken before the answer is announced as done
+    assert [event for event, _ in events][-1] == "done"
+
+@pytest.mark.parametrize("max_parallel", [1, 2])
+def test_parallel_synthesis_never_exceeds_the_limit(max_parallel):
+    text = " ".join(f"Sentence number {i} is long enough to be spoken." for i in range(8))
+    tts = FakeTTS(lambda text: 0.02 * (1 + len(text) % 3))
+
+    events = speak(tts, text, max_parallel=max_parallel)
+
+    assert len([event for event, _ in events if event == "audio"]) == 8
+    assert tts.max_in_flight == max_parallel